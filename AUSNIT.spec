@@ -4,7 +4,8 @@ a = Analysis(
     ['ui/boot.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets', 'assets'), ('data', 'data')],
+    # Из assets — только шрифт и варианты картинок точного размера (python -m ui.assets), без исходников
+    datas=[('assets/Quartell VF.ttf', 'assets'), ('assets/baked', 'assets/baked'), ('data', 'data')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,2 @@
+# ausnit/__init__.py
+""" Консольный запуск AUSNIT без интерфейса: python -m ausnit --help """
@@ -0,0 +1,6 @@
+# ausnit/__main__.py
+import sys
+
+from ausnit.cli import main
+
+sys.exit(main())
@@ -0,0 +1,153 @@
+# ausnit/cli.py
+"""
+Установка без интерфейса — для сценариев развёртывания и первого входа в систему.
+
+    python -m ausnit presets
+    python -m ausnit install --preset Работа --preset Игры 7zip.7zip --dry-run
+    python -m ausnit install --preset Минимум --max-downloads 4
+
+Пресет — набор из data/profiles.json; элементы пресетов и аргументы — winget ID
+или названия из каталога (programs.json / индекс backend.catalog).  План
+дедуплицируется и идёт в тот же конвейер backend.install, что и у вкладки
+программ.  В stdout — по JSON-объекту на строку: {"state": "plan", ...},
+события установки (backend/batch.py) и итоговый {"state": "result", ...};
+служебный вывод бэкенда уходит в stderr.  Модули ui не импортируются.
+
+Код выхода: 0 — всё установлено (или --dry-run), 1 — были ошибки, 2 — неизвестный
+пресет, 130 — прервано.
+"""
+import argparse
+import contextlib
+import json
+import os
+import queue
+import sys
+import threading
+from typing import Dict, List, Optional, TextIO
+
+from backend.batch import dedupe
+
+def resource_path(rel_path: str) -> str:
+    base = getattr(sys, "_MEIPASS", None) or os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    return os.path.join(base, rel_path)
+
+def load_json(rel_path: str) -> dict:
+    try:
+        with open(resource_path(rel_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def load_presets() -> Dict[str, List[str]]:
+    return load_json("data/profiles.json")
+
+def _catalog_names() -> Dict[str, str]:
+    """ {название или ID в нижнем регистре: ID} по programs.json и, если собран, индексу каталога. """
+    names: Dict[str, str] = {}
+    sources = [load_json("data/programs.json")]
+    from backend import catalog  # sqlite — только если план надо разрешать
+    index = catalog.open_default()
+    if index is not None:
+        try: sources.insert(0, index.as_catalog())
+        finally: index.close()
+    for data in sources:
+        for items in data.values():
+            for name, pkg_id in items.items():
+                names[name.lower()] = pkg_id; names[pkg_id.lower()] = pkg_id
+    return names
+
+def resolve(items: List[str], names: Dict[str, str]) -> Dict[str, object]:
+    """
+    Элемент -> winget ID: точное совпадение ID или названия, иначе единственное
+    название/ID, начинающееся с элемента («VLC» -> VideoLAN.VLC).  Неразрешённые
+    остаются как есть — winget может знать их и без каталога.
+    """
+    ids, unresolved = [], []
+    for item in items:
+        key = item.lower()
+        found = names.get(key)
+        if found is None:
+            prefixed = {pkg_id for name, pkg_id in names.items() if name.startswith(key) or name.split(".")[-1].startswith(key)}
+            found = prefixed.pop() if len(prefixed) == 1 else None
+        if found is None: unresolved.append(item); found = item
+        ids.append(found)
+    return {"ids": dedupe(ids), "unresolved": unresolved}
+
+def build_plan(presets: List[str], items: List[str]) -> Dict[str, object]:
+    known = load_presets()
+    missing = [p for p in presets if p not in known]
+    if missing:
+        raise KeyError(", ".join(missing))
+    requested = [item for name in presets for item in known[name]] + list(items)
+    plan = resolve(requested, _catalog_names() if requested else {})
+    return {"state": "plan", "presets": presets, "requested": len(requested), **plan}
+
+class _JsonOut:
+    """ Строки JSON в настоящий stdout; всё, что печатает бэкенд, — в stderr. """
+    def __init__(self, stream: TextIO):
+        self.stream = stream; self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        with self._lock:
+            self.stream.write(json.dumps(event, ensure_ascii=False) + "\n"); self.stream.flush()
+
+def _install(plan: dict, emit: _JsonOut, args) -> int:
+    from backend import installcache
+    from backend.install import install_pipeline
+    cancel_event = threading.Event(); results: Dict[str, bool] = {}
+    cache = None if args.no_cache else installcache.default_cache()
+    # Конвейер — в своём (не daemon) потоке, события — через очередь: Ctrl+C приходит
+    # в главный поток, а после отмены события дочитываются из очереди до конца
+    events: "queue.Queue" = queue.Queue(); errors = []
+    def run():
+        try: install_pipeline(plan["ids"], cancel_event=cancel_event, on_event=events.put, max_downloads=args.max_downloads, cache=cache)
+        except Exception as e: errors.append(e)
+        finally: events.put(None)
+    def drain():
+        while True:
+            try: event = events.get(timeout=0.5)  # с таймаутом — иначе на Windows Ctrl+C ждёт следующего события
+            except queue.Empty: continue
+            if event is None: return
+            emit(event)
+            if event.get("state") in ("done", "failed"): results[event["id"]] = event["ok"]
+    worker = threading.Thread(target=run, name="ausnit-install"); worker.start()
+    cancelled = False
+    try: drain()
+    except KeyboardInterrupt:
+        cancelled = True; cancel_event.set()
+        while True:  # дождаться, пока конвейер остановит установщик и уберёт временную папку
+            try: drain(); break
+            except KeyboardInterrupt: continue  # повторный Ctrl+C — отмена уже идёт
+    worker.join()
+    if errors: raise errors[0]
+    if cancelled:
+        emit({"state": "result", "ok": False, "cancelled": True, "results": results})
+        return 130
+    ok = len(results) == len(plan["ids"]) and all(results.values())
+    emit({"state": "result", "ok": ok, "cancelled": False, "results": results})
+    return 0 if ok else 1
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m ausnit", description="AUSNIT без интерфейса")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("presets", help="список пресетов")
+    install = commands.add_parser("install", help="установить пресеты и/или пакеты")
+    install.add_argument("items", nargs="*", help="winget ID или названия из каталога")
+    install.add_argument("--preset", action="append", default=[], help="пресет из data/profiles.json (можно несколько)")
+    install.add_argument("--dry-run", action="store_true", help="только вывести план")
+    install.add_argument("--max-downloads", type=int, default=3)
+    install.add_argument("--no-cache", action="store_true", help="не использовать кэш установщиков")
+    args = parser.parse_args(argv)
+
+    emit = _JsonOut(sys.stdout)
+    with contextlib.redirect_stdout(sys.stderr):
+        if args.command == "presets":
+            for name, items in load_presets().items(): emit({"state": "preset", "name": name, "items": items})
+            return 0
+        try: plan = build_plan(args.preset, args.items)
+        except KeyError as e:
+            emit({"state": "error", "error": f"неизвестный пресет: {e.args[0]}", "presets": list(load_presets())}); return 2
+        emit(plan)
+        if args.dry_run or not plan["ids"]:
+            return 0
+        return _install(plan, emit, args)
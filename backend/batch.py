@@ -0,0 +1,54 @@
+# backend/batch.py
+"""
+Общий «пакетный» слой для установки программ и драйверов.
+Вместо dict-результата по окончании всей пачки бэкенд отдаёт поток событий:
+
+    {"id": ..., "state": "queued" | "downloading" | "installing" | "done" | "failed", ...}
+    {"state": "summary", ...}   # последнее событие пачки, без "id"
+
+У "done"/"failed" есть "ok" и "duration" (секунды), у программ ещё "status"
+из backend/procs.py ("reboot", "already", "timeout", ...).
+"""
+import queue
+import threading
+from typing import Callable, Dict, Iterator, List
+
+_END = object()
+
+def dedupe(ids: List[str]) -> List[str]:
+    """
+    Убирает повторы, сохраняя порядок. Сравнение без учёта регистра:
+    winget ID регистронезависимы, а в programs.json «MS Office 2016»
+    и «MS Office 2019» указывают на один и тот же Microsoft.Office.
+    """
+    seen = set(); result = []
+    for item_id in ids:
+        key = item_id.lower()
+        if key not in seen:
+            seen.add(key); result.append(item_id)
+    return result
+
+def stream(run: Callable[..., Dict[str, bool]], ids: List[str], cancel_event=None, **kwargs) -> Iterator[dict]:
+    """
+    Запускает run(ids, cancel_event=..., on_event=...) в фоновом потоке
+    и отдаёт его события генератором по мере появления.
+    """
+    events: "queue.Queue" = queue.Queue()
+    errors = []
+
+    def worker():
+        try:
+            run(ids, cancel_event=cancel_event, on_event=events.put, **kwargs)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            events.put(_END)
+
+    threading.Thread(target=worker, daemon=True).start()
+    while True:
+        event = events.get()
+        if event is _END:
+            if errors:
+                raise errors[0]
+            return
+        yield event
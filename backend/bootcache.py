@@ -0,0 +1,82 @@
+# backend/bootcache.py
+"""
+Постоянный кэш данных загрузки (stale-while-revalidate).
+
+Приложение стартует сразу с данными прошлого запуска, а preload обновляет
+в фоне только устаревшие секции. Кэш сбрасывается целиком, если сменилась
+версия формата или «отпечаток» машины (кэш скопирован на другой ПК,
+заменили процессор/память, переустановили ОС).
+"""
+import functools
+import hashlib
+import json
+import os
+import platform
+import tempfile
+import time
+
+CACHE_VERSION = 2
+
+# Срок годности секций (секунды): железо меняется редко, список программ — часто
+SECTION_TTL = {
+    "specs": 7 * 24 * 3600,
+    "installed": 10 * 60,
+}
+
+def app_data_dir():
+    """ Папка для постоянных данных AUSNIT (кэши, индексы) вне каталога программы. """
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or tempfile.gettempdir()
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "AUSNIT")
+
+def default_path():
+    return os.path.join(app_data_dir(), "ausnit_boot_cache.json")
+
+@functools.lru_cache(maxsize=1)
+def fingerprint():
+    import psutil  # нужен только здесь; консольному запуску (python -m ausnit) не грузим его зря
+    parts = [platform.node(), platform.machine(), platform.system(), platform.version(),
+             platform.processor(), str(psutil.virtual_memory().total)]
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()
+
+def _read(path):
+    """ Сырой кэш, если он нашей версии и с этой машины, иначе пустой. """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+    except Exception:
+        return {}
+    if raw.get("version") != CACHE_VERSION or raw.get("fingerprint") != fingerprint():
+        return {}
+    return raw
+
+def load(path):
+    """ Данные секций в формате preload.RESULT: {"specs": {...}, "installed": {...}}. """
+    return {name: section["data"] for name, section in _read(path).get("sections", {}).items()}
+
+def stale_sections(path, now=None):
+    """ Секции, которые нужно пересобрать: отсутствующие и просроченные. """
+    now = now or time.time()
+    sections = _read(path).get("sections", {})
+    return [name for name, ttl in SECTION_TTL.items()
+            if name not in sections or now - sections[name].get("saved_at", 0) > ttl]
+
+def save(path, result, sections):
+    """
+    Обновляет в кэше только перечисленные секции, остальные оставляет как есть.
+    Запись атомарная: сначала во временный файл, потом os.replace.
+    """
+    raw = _read(path)
+    stored = raw.get("sections", {})
+    now = time.time()
+    for name in sections:
+        if name in result:
+            stored[name] = {"saved_at": now, "data": result[name]}
+    raw = {"version": CACHE_VERSION, "fingerprint": fingerprint(), "sections": stored}
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(raw, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
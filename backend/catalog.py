@@ -0,0 +1,269 @@
+# backend/catalog.py
+"""
+Локальный полнотекстовый индекс каталога winget (SQLite + FTS5).
+
+Индекс собирается из манифестов winget-pkgs (*.yaml) и/или сохранённого
+вывода `winget search`, плюс курируемого data/programs.json. Повторный
+импорт манифестов перечитывает только изменённые файлы (по размеру и mtime).
+При запуске база открывается с mmap, а не парсится целиком, как JSON.
+
+Пакет в packages один на ID, а строки programs.json лежат отдельно в curated
+по (категория, название): несколько названий на один ID («MS Office 2016» и
+«MS Office 2019» -> Microsoft.Office) переживают импорт, и as_catalog отдаёт
+programs.json без изменений.
+
+Сборка:  python -m backend.catalog --manifests <winget-pkgs/manifests> --search-output <файл> --json data/programs.json
+"""
+import argparse
+import json
+import os
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+from backend.bootcache import app_data_dir
+from backend.winget import parse_table
+
+MMAP_SIZE = 256 * 1024 * 1024
+WINGET_CATEGORY = "winget"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS packages (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL UNIQUE COLLATE NOCASE,
+    name TEXT NOT NULL DEFAULT '',
+    publisher TEXT NOT NULL DEFAULT '',
+    version TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    category TEXT NOT NULL DEFAULT 'winget'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS packages_fts USING fts5(
+    id, name, tags, publisher, description,
+    content='packages', content_rowid='rowid',
+    tokenize="unicode61 tokenchars '.+-'", prefix='2 3'
+);
+CREATE TRIGGER IF NOT EXISTS packages_ai AFTER INSERT ON packages BEGIN
+    INSERT INTO packages_fts(rowid, id, name, tags, publisher, description)
+    VALUES (new.rowid, new.id, new.name, new.tags, new.publisher, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS packages_ad AFTER DELETE ON packages BEGIN
+    INSERT INTO packages_fts(packages_fts, rowid, id, name, tags, publisher, description)
+    VALUES ('delete', old.rowid, old.id, old.name, old.tags, old.publisher, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS packages_au AFTER UPDATE ON packages BEGIN
+    INSERT INTO packages_fts(packages_fts, rowid, id, name, tags, publisher, description)
+    VALUES ('delete', old.rowid, old.id, old.name, old.tags, old.publisher, old.description);
+    INSERT INTO packages_fts(rowid, id, name, tags, publisher, description)
+    VALUES (new.rowid, new.id, new.name, new.tags, new.publisher, new.description);
+END;
+CREATE TABLE IF NOT EXISTS curated (
+    rowid INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    package_id TEXT NOT NULL COLLATE NOCASE,
+    UNIQUE(category, name)
+);
+CREATE TABLE IF NOT EXISTS manifests (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    package_id TEXT NOT NULL COLLATE NOCASE
+);
+"""
+
+# Веса bm25 по колонкам FTS: id, name, tags, publisher, description
+_RANK = "bm25(packages_fts, 8.0, 10.0, 4.0, 2.0, 1.0)"
+
+_MANIFEST_KEYS = {
+    "PackageIdentifier": "id", "PackageVersion": "version", "PackageName": "name",
+    "Publisher": "publisher", "ShortDescription": "description",
+}
+
+def default_path():
+    return os.path.join(app_data_dir(), "catalog.sqlite")
+
+def parse_manifest(text: str) -> Dict[str, str]:
+    """
+    Достаёт из YAML-манифеста winget нужные поля верхнего уровня и список Tags.
+    Полный YAML-парсер не нужен: все поля однострочные.
+    """
+    fields: Dict[str, str] = {}; tags: List[str] = []; in_tags = False
+    for line in text.splitlines():
+        if in_tags:
+            m = re.match(r"\s*-\s*(.+?)\s*$", line)
+            if m: tags.append(m.group(1).strip("'\"")); continue
+            in_tags = False
+        m = re.match(r"(\w+):\s*(.*?)\s*$", line)
+        if not m: continue
+        key, value = m.groups()
+        if key == "Tags" and not value: in_tags = True
+        elif key in _MANIFEST_KEYS and value: fields[_MANIFEST_KEYS[key]] = value.strip("'\"")
+    if tags: fields["tags"] = " ".join(tags)
+    return fields
+
+def _version_key(version: str):
+    return [int(p) if p.isdigit() else p for p in re.split(r"[.\-+]", version or "0")]
+
+def _newer_or_same(new: str, old: str) -> bool:
+    try: return _version_key(new) >= _version_key(old)
+    except TypeError: return new >= old  # смесь чисел и строк — сравниваем как строки
+
+class CatalogIndex:
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or default_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT count(*) FROM packages").fetchone()[0]
+
+    # --- Импорт ---
+    def _upsert(self, fields: Dict[str, str], category: Optional[str] = None):
+        """ Добавляет пакет или дополняет его; поля более старой версии не затирают новые. """
+        row = self.db.execute("SELECT * FROM packages WHERE id = ?", (fields["id"],)).fetchone()
+        if row is None:
+            values = {k: fields.get(k, "") for k in ("id", "name", "publisher", "version", "tags", "description")}
+            values["name"] = values["name"] or values["id"]
+            values["category"] = category or WINGET_CATEGORY
+            self.db.execute("INSERT INTO packages(id, name, publisher, version, tags, description, category) VALUES (:id, :name, :publisher, :version, :tags, :description, :category)", values)
+            return
+        if fields.get("version") and row["version"] and not _newer_or_same(fields["version"], row["version"]):
+            return
+        updates = {k: v for k, v in fields.items() if v and k != "id"}
+        if row["category"] != WINGET_CATEGORY: updates.pop("name", None)  # название из programs.json главнее
+        if category and row["category"] == WINGET_CATEGORY: updates["category"] = category
+        if updates:
+            assignments = ", ".join(f"{k} = :{k}" for k in updates)
+            self.db.execute(f"UPDATE packages SET {assignments} WHERE rowid = :rowid", {**updates, "rowid": row["rowid"]})
+
+    def import_catalog_json(self, data: Dict[str, Dict[str, str]]):
+        """
+        Курируемый каталог (programs.json): категория и название из него главнее winget.
+        Строки заменяют прежние целиком; у пакета в поиске — все его названия через « / ».
+        """
+        by_id: Dict[str, list] = {}
+        with self.db:
+            self.db.execute("DELETE FROM curated")
+            for category, items in data.items():
+                for name, pkg_id in items.items():
+                    self.db.execute("INSERT OR REPLACE INTO curated(category, name, package_id) VALUES (?, ?, ?)", (category, name, pkg_id))
+                    by_id.setdefault(pkg_id.lower(), [pkg_id, category, []])[2].append(name)
+            # Выпавшие из programs.json пакеты возвращаются в общий winget
+            self.db.execute("UPDATE packages SET category = ? WHERE category != ? AND id NOT IN (SELECT package_id FROM curated)", (WINGET_CATEGORY, WINGET_CATEGORY))
+            for pkg_id, category, names in by_id.values():
+                self._upsert({"id": pkg_id}, category)
+                self.db.execute("UPDATE packages SET name = ?, category = ? WHERE id = ?", (" / ".join(dict.fromkeys(names)), category, pkg_id))
+
+    def import_search_output(self, text: str):
+        """ Сохранённый вывод `winget search`/`winget list` (таблица с колонками Name/Id/Version). """
+        rows = parse_table(text)
+        with self.db:
+            for row in rows:
+                self._upsert({"id": row["id"], "name": row.get("name", ""), "version": row.get("version", "")})
+        return len(rows)
+
+    def import_manifests(self, root: str) -> Dict[str, int]:
+        """
+        Инкрементальный импорт дерева манифестов: читаются только новые и
+        изменённые файлы; пакеты, у которых не осталось ни одного файла, удаляются.
+        """
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        known = {r["path"]: (r["size"], r["mtime_ns"]) for r in self.db.execute("SELECT path, size, mtime_ns FROM manifests")}
+        seen = set()
+        with self.db:
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    if not filename.lower().endswith(".yaml"): continue
+                    path = os.path.abspath(os.path.join(dirpath, filename)); seen.add(path)
+                    st = os.stat(path); signature = (st.st_size, st.st_mtime_ns)
+                    if known.get(path) == signature:
+                        stats["unchanged"] += 1; continue
+                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                        fields = parse_manifest(f.read())
+                    if "id" not in fields: continue
+                    self._upsert(fields)
+                    self.db.execute("INSERT OR REPLACE INTO manifests(path, size, mtime_ns, package_id) VALUES (?, ?, ?, ?)", (path, *signature, fields["id"]))
+                    stats["updated" if path in known else "added"] += 1
+            root_prefix = os.path.abspath(root) + os.sep
+            gone = [p for p in known if p.startswith(root_prefix) and p not in seen]
+            for path in gone:
+                pkg_id = self.db.execute("SELECT package_id FROM manifests WHERE path = ?", (path,)).fetchone()[0]
+                self.db.execute("DELETE FROM manifests WHERE path = ?", (path,))
+                if not self.db.execute("SELECT 1 FROM manifests WHERE package_id = ? LIMIT 1", (pkg_id,)).fetchone():
+                    self.db.execute("DELETE FROM packages WHERE id = ? AND category = ?", (pkg_id, WINGET_CATEGORY))
+                stats["removed"] += 1
+        return stats
+
+    # --- Поиск ---
+    @staticmethod
+    def _fts_query(query: str) -> str:
+        terms = [t for t in re.split(r"[^\w.+\-]+", query.lower()) if t]
+        return " AND ".join('"' + t.replace('"', '""') + '"*' for t in terms)
+
+    def search(self, query: str, limit: Optional[int] = 50) -> List[Dict[str, str]]:
+        """ Ранжированный поиск по ID, названию, тегам, издателю и описанию (префиксы слов). """
+        fts = self._fts_query(query)
+        if not fts:
+            return []
+        sql = f"""SELECT p.id, p.name, p.publisher, p.version, p.tags, p.category
+                  FROM packages_fts JOIN packages p ON p.rowid = packages_fts.rowid
+                  WHERE packages_fts MATCH ? ORDER BY {_RANK}"""
+        params: list = [fts]
+        if limit is not None:
+            sql += " LIMIT ?"; params.append(limit)
+        return [dict(r) for r in self.db.execute(sql, params)]
+
+    def search_ids(self, query: str, limit: Optional[int] = None) -> List[str]:
+        return [r["id"] for r in self.search(query, limit)]
+
+    def as_catalog(self, categories: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, str]]:
+        """ Каталог в формате programs.json: {категория: {название: id}} — сначала курируемые строки, потом остальные пакеты. """
+        where, params = "", []
+        if categories is not None:
+            categories = list(categories)
+            where = f" AND category IN ({', '.join('?' * len(categories))})"; params = categories
+        catalog: Dict[str, Dict[str, str]] = {}
+        for r in self.db.execute(f"SELECT category, name, package_id AS id FROM curated WHERE 1{where} ORDER BY rowid", params):
+            catalog.setdefault(r["category"], {})[r["name"]] = r["id"]
+        for r in self.db.execute(f"SELECT category, name, id FROM packages WHERE id NOT IN (SELECT package_id FROM curated){where} ORDER BY rowid", params):
+            catalog.setdefault(r["category"], {})[r["name"]] = r["id"]
+        return catalog
+
+def open_default() -> Optional[CatalogIndex]:
+    """ Индекс из папки данных AUSNIT, если его уже собирали; иначе None. """
+    path = default_path()
+    return CatalogIndex(path) if os.path.exists(path) else None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сборка локального индекса каталога winget")
+    parser.add_argument("--db", default=default_path())
+    parser.add_argument("--manifests", help="папка winget-pkgs/manifests (или её часть)")
+    parser.add_argument("--search-output", action="append", default=[], help="файл с сохранённым выводом winget search")
+    parser.add_argument("--json", help="курируемый каталог в формате data/programs.json")
+    parser.add_argument("--query", help="проверочный поиск после сборки")
+    args = parser.parse_args(argv)
+    index = CatalogIndex(args.db)
+    if args.json:
+        with open(args.json, "r", encoding="utf-8") as f:
+            index.import_catalog_json(json.load(f))
+    for path in args.search_output:
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            print(f"{path}: {index.import_search_output(f.read())} пакетов")
+    if args.manifests:
+        print(f"манифесты: {index.import_manifests(args.manifests)}")
+    print(f"в индексе {len(index)} пакетов: {index.path}")
+    if args.query:
+        for r in index.search(args.query, limit=10):
+            print(f"  {r['id']:40} {r['name']}")
+    index.close()
+
+if __name__ == "__main__":
+    main()
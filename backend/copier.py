@@ -0,0 +1,313 @@
+# backend/copier.py
+"""
+Конвейер копирования файлов на флешку.
+
+Поток чтения заранее вычитывает данные (read-ahead) в ограниченную очередь,
+пока поток записи пишет предыдущие куски на носитель: чтение образа и запись
+на медленный USB идут одновременно.  Мелкие файлы вставляются между
+крупными, чтобы их накладные расходы (создание файла, запись в таблицу ФС)
+размазывались по всему прогону, а не копились в хвосте.  Хэши блоков
+считаются по ходу чтения, так что проверка записи перечитывает только цель,
+параллельно несколькими потоками.
+
+Проверка читает носитель, а не кэш ОС: с verify каждый файл перед закрытием
+сбрасывается на устройство (fsync), а перечитывается мимо кэша — на Windows
+с FILE_FLAG_NO_BUFFERING, на POSIX после posix_fadvise(DONTNEED).  Где это
+не вышло, чтение может прийти из кэша, и проверка ловит только ошибки самого
+копирования.
+"""
+import hashlib
+import mmap
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+READ_AHEAD = 64 * 1024 * 1024   # сколько байт может ждать записи
+QUEUE_CHUNK = 1024 * 1024       # под такие куски считается длина очереди
+SMALL_FILE = 1024 * 1024
+VERIFY_BLOCK = 8 * 1024 * 1024
+VERIFY_WORKERS = 4
+PROGRESS_INTERVAL = 0.25
+WRITE_BUFFER = 1024 * 1024
+PAGE = 4096
+
+class CopyError(Exception):
+    pass
+
+class CopyJob:
+    """ Файл для копирования: chunks() отдаёт содержимое кусками (bytes/memoryview). """
+    __slots__ = ("path", "size", "mtime", "chunks")
+
+    def __init__(self, path: str, size: int, chunks: Callable[[], Iterable], mtime: Optional[float] = None):
+        self.path = path; self.size = size; self.chunks = chunks; self.mtime = mtime
+
+class _BlockHasher:
+    """ sha256 по блокам VERIFY_BLOCK логического смещения, как бы ни были нарезаны куски. """
+    def __init__(self, block: int = VERIFY_BLOCK):
+        self.block = block; self.digests: List[bytes] = []
+        self._hash = hashlib.sha256(); self._filled = 0
+
+    def update(self, data):
+        view = memoryview(data)
+        while len(view):
+            take = min(self.block - self._filled, len(view))
+            self._hash.update(view[:take]); self._filled += take; view = view[take:]
+            if self._filled == self.block:
+                self.digests.append(self._hash.digest()); self._hash = hashlib.sha256(); self._filled = 0
+
+    def finish(self) -> List[bytes]:
+        if self._filled or not self.digests:
+            self.digests.append(self._hash.digest())
+        return self.digests
+
+def plan_order(jobs: List[CopyJob], small_limit: int = SMALL_FILE) -> List[CopyJob]:
+    """
+    Крупные файлы по убыванию размера, между ними — пачки мелких, пропорционально
+    уже записанным байтам, чтобы мелкие закончились вместе с крупными.
+    """
+    large = sorted((j for j in jobs if j.size >= small_limit), key=lambda j: -j.size)
+    small = [j for j in jobs if j.size < small_limit]
+    if not large or not small:
+        return large + small
+    large_total = sum(j.size for j in large)
+    per_byte = len(small) / large_total
+    order: List[CopyJob] = []; sent = 0; taken = 0
+    for job in large:
+        order.append(job); sent += job.size
+        while taken < len(small) and (taken < int(sent * per_byte) or sent >= large_total):
+            order.append(small[taken]); taken += 1
+    return order + small[taken:]
+
+class _Progress:
+    def __init__(self, total: int, on_event):
+        self.total = total; self.on_event = on_event; self.done = 0
+        self.start = time.perf_counter(); self._last = 0.0
+        self._window = [(self.start, 0)]  # (время, байт) за последние секунды — для скорости
+
+    def advance(self, n: int, path: str, force: bool = False):
+        self.done += n
+        now = time.perf_counter()
+        if not self.on_event or (not force and now - self._last < PROGRESS_INTERVAL): return
+        self._last = now
+        self._window.append((now, self.done))
+        while len(self._window) > 2 and now - self._window[0][0] > 5: self._window.pop(0)
+        t0, d0 = self._window[0]
+        rate = (self.done - d0) / (now - t0) if now > t0 else 0.0
+        eta = (self.total - self.done) / rate if rate else None
+        self.on_event({"state": "copying", "done": self.done, "total": self.total, "rate": rate, "eta": eta, "path": path})
+
+class _Writer:
+    """ Раскладывает куски (job, data) по файлам цели; data=None закрывает файл задания (с sync — после fsync). """
+    def __init__(self, target: str, progress: _Progress, sync: bool = False):
+        self.target = target; self.progress = progress; self.sync = sync; self.files = 0
+        self._current = None; self._out = None
+
+    def feed(self, items):
+        for job, data in items:
+            if job is not self._current:
+                dest = os.path.join(self.target, *job.path.split("/"))
+                self._out = open(dest, "wb", buffering=WRITE_BUFFER); self._current = job
+            if data is not None:
+                self._out.write(data); self.progress.advance(len(data), job.path); continue
+            if self.sync: self._out.flush(); os.fsync(self._out.fileno())
+            self._out.close(); self._out = None
+            if job.mtime: os.utime(os.path.join(self.target, *job.path.split("/")), (job.mtime, job.mtime))
+            self.files += 1
+
+    def close(self):
+        if self._out is not None: self._out.close(); self._out = None
+
+class _Lane:
+    """ Одна цель веерной записи: своя очередь, поток записи, прогресс и ошибка. """
+    def __init__(self, target: str, wanted, total: int, on_event, maxsize: int, sync: bool = False):
+        self.target = target; self.wanted = wanted; self.error: Optional[BaseException] = None
+        def emit(event):
+            # Ошибка обработчика (интерфейса) не должна обрывать запись и помечать цель отказавшей
+            try: on_event({**event, "target": target})
+            except Exception as e: print(f"Ошибка в обработчике событий копирования ({target}): {e}")
+        self.emit = emit if on_event else None; self.writer = _Writer(target, _Progress(total, self.emit), sync)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=maxsize); self.thread: Optional[threading.Thread] = None
+
+def copy_to_many(jobs: List[CopyJob], targets: Iterable[str], dirs: Iterable[str] = (), select: Optional[Dict[str, set]] = None, verify: bool = False,
+                 on_event=None, cancel_event=None, read_ahead: int = READ_AHEAD, order: bool = True, hash_files: bool = False) -> Dict[str, Dict[str, object]]:
+    """
+    Веерная запись: jobs читаются один раз, куски (общие, без копирования) раздаются
+    потокам записи — по одному на цель.  select[цель] — набор путей, нужных этой цели
+    (нет ключа — все).  Отказ одной цели (вытащили флешку, ошибка записи) её и
+    останавливает, остальные дописываются.  События как у copy_files, с ключом target.
+    Возвращает {цель: статистика}, в статистике error — текст ошибки или None.
+    """
+    jobs = plan_order(jobs) if order else list(jobs)
+    select = select or {}
+    maxsize = max(2, read_ahead // QUEUE_CHUNK)
+    lanes = [_Lane(t, select.get(t), sum(j.size for j in jobs if select.get(t) is None or j.path in select[t]), on_event, maxsize, sync=verify) for t in targets]
+    jobs = [j for j in jobs if any(lane.wanted is None or j.path in lane.wanted for lane in lanes)]
+    stop = threading.Event()
+    digests: Dict[str, List[bytes]] = {}
+    file_hashes: Dict[str, list] = {}
+
+    def put(lane, item):
+        while not stop.is_set() and lane.error is None:
+            try: lane.queue.put(item, timeout=0.1); return
+            except queue.Full: continue
+
+    def send(batch):
+        # Пачка делится по целям: каждой — только её файлы
+        for lane in lanes:
+            if lane.error is not None: continue
+            items = batch if lane.wanted is None else [item for item in batch if item[0].path in lane.wanted]
+            if items: put(lane, items)
+        return any(lane.error is None for lane in lanes)
+
+    def reader():
+        # Куски мелких файлов едут пачками до QUEUE_CHUNK: меньше передач между потоками и борьбы за GIL
+        batch = []; batch_bytes = 0
+        try:
+            for job in jobs:
+                if cancel_event is not None and cancel_event.is_set(): break
+                hasher = _BlockHasher() if verify else None
+                whole = hashlib.sha256() if hash_files else None
+                for chunk in job.chunks():
+                    if hasher: hasher.update(chunk)
+                    if whole: whole.update(chunk)
+                    if not (hasher or whole) and isinstance(chunk, memoryview): chunk[::PAGE].tobytes()
+                    # ^ срез mmap: касаемся каждой страницы, чтобы подкачка с диска шла здесь, а не у писателя; данные не копируются
+                    batch.append((job, chunk)); batch_bytes += len(chunk)
+                    if batch_bytes >= QUEUE_CHUNK:
+                        if not send(batch): return
+                        batch = []; batch_bytes = 0
+                if hasher: digests[job.path] = hasher.finish()
+                if whole: file_hashes[job.path] = [job.size, whole.hexdigest()]
+                batch.append((job, None))
+            if batch and not send(batch): return
+            for lane in lanes: put(lane, None)
+        except BaseException as e:
+            for lane in lanes: put(lane, e)
+
+    def writer(lane):
+        try:
+            paths = [j.path for j in jobs if lane.wanted is None or j.path in lane.wanted]
+            for d in {*dirs, *(p.rsplit("/", 1)[0] for p in paths if "/" in p), ""}:
+                os.makedirs(os.path.join(lane.target, *d.split("/")), exist_ok=True)
+            while True:
+                items = lane.queue.get()
+                if items is None: break
+                if isinstance(items, BaseException): raise CopyError(f"ошибка чтения: {items}") from items
+                lane.writer.feed(items)
+        except BaseException as e:
+            lane.error = e
+        finally:
+            lane.writer.close()
+
+    for lane in lanes:
+        lane.thread = threading.Thread(target=writer, args=(lane,), daemon=True, name=f"copy-writer-{lane.target}"); lane.thread.start()
+    thread = threading.Thread(target=reader, daemon=True, name="copy-reader"); thread.start()
+    try:
+        for lane in lanes: lane.thread.join()
+    finally:
+        stop.set(); thread.join()
+        for lane in lanes:  # отказавшие цели могли не выбрать свою очередь — отпускаем ссылки на буферы образа
+            while not lane.queue.empty(): lane.queue.get_nowait()
+    cancelled = cancel_event is not None and cancel_event.is_set()
+    results = {}
+    for lane in lanes:
+        progress = lane.writer.progress
+        progress.advance(0, "", force=True)
+        seconds = time.perf_counter() - progress.start
+        stats = {"files": lane.writer.files, "bytes": progress.done, "total": progress.total, "seconds": seconds,
+                 "mb_per_s": progress.done / 1024 / 1024 / seconds if seconds else 0.0, "verified": False, "mismatched": [],
+                 "error": None if lane.error is None else str(lane.error)}
+        if hash_files: stats["hashes"] = file_hashes
+        results[lane.target] = stats
+    checked = [lane for lane in lanes if lane.error is None] if verify and not cancelled else []
+    if checked:
+        # Цели — разные носители, проверяются одновременно
+        def check(lane):
+            t0 = time.perf_counter()
+            wanted = {p: d for p, d in digests.items() if lane.wanted is None or p in lane.wanted}
+            results[lane.target]["mismatched"] = verify_files(lane.target, wanted, on_event=lane.emit)
+            results[lane.target].update(verified=True, verify_seconds=time.perf_counter() - t0)
+        with ThreadPoolExecutor(max_workers=len(checked)) as pool:
+            list(pool.map(check, checked))
+    return results
+
+def copy_files(jobs: List[CopyJob], target: str, dirs: Iterable[str] = (), verify: bool = False, on_event=None, cancel_event=None,
+               read_ahead: int = READ_AHEAD, order: bool = True, hash_files: bool = False) -> Dict[str, object]:
+    """
+    Копирует jobs в папку target (пути через «/»).  События on_event:
+    {"state": "copying", done, total, rate (байт/с), eta (с), path} не чаще раза в PROGRESS_INTERVAL,
+    {"state": "verifying", done, total}.  Возвращает статистику с mismatched — списком путей,
+    не прошедших проверку; при hash_files ещё hashes — {путь: [размер, sha256]} записанного.
+    """
+    emit = (lambda event: on_event({k: v for k, v in event.items() if k != "target"})) if on_event else None
+    stats = copy_to_many(jobs, [target], dirs=dirs, verify=verify, on_event=emit, cancel_event=cancel_event,
+                         read_ahead=read_ahead, order=order, hash_files=hash_files)[target]
+    error = stats.pop("error")
+    if error is not None:
+        raise CopyError(error)
+    return stats
+
+def _open_uncached(path: str):
+    """
+    Файл для чтения мимо кэша ОС (бинарный, без буфера Python).  Windows:
+    FILE_FLAG_NO_BUFFERING — смещения и размеры чтения кратны сектору, буфер
+    выровнен (см. _read_block); POSIX: страницы файла выбрасываются из кэша
+    (после fsync они чистые).  Не вышло — обычное открытие.
+    """
+    if os.name == "nt":
+        import ctypes, msvcrt
+        from ctypes import wintypes
+        create = ctypes.windll.kernel32.CreateFileW
+        create.restype = wintypes.HANDLE
+        create.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, wintypes.LPVOID, wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+        GENERIC_READ, FILE_SHARE_READ, OPEN_EXISTING, FILE_FLAG_NO_BUFFERING = 0x80000000, 0x1, 3, 0x20000000
+        handle = create(path, GENERIC_READ, FILE_SHARE_READ, None, OPEN_EXISTING, FILE_FLAG_NO_BUFFERING, None)
+        if handle and handle != wintypes.HANDLE(-1).value:
+            return open(msvcrt.open_osfhandle(handle, os.O_RDONLY | os.O_BINARY), "rb", buffering=0)
+        return open(path, "rb", buffering=0)
+    f = open(path, "rb", buffering=0)
+    if hasattr(os, "posix_fadvise"):
+        try: os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError: pass
+    return f
+
+def _read_block(f, offset: int, block: int, buf) -> memoryview:
+    """
+    До block байт с offset в выровненный буфер buf (mmap — выровнен по странице, block кратен сектору).
+    Одно чтение: короткий ответ — конец файла.  Дочитывать нельзя — с FILE_FLAG_NO_BUFFERING
+    второй readinto пошёл бы с невыровненного смещения в невыровненный буфер (ERROR_INVALID_PARAMETER).
+    """
+    f.seek(offset)
+    view = memoryview(buf)
+    return view[:f.readinto(view[:block]) or 0]
+
+def verify_files(target: str, digests: Dict[str, List[bytes]], block: int = VERIFY_BLOCK, workers: int = VERIFY_WORKERS, on_event=None) -> List[str]:
+    """
+    Перечитывает записанные файлы блоками в несколько потоков мимо кэша ОС (см.
+    _open_uncached) и сверяет sha256; возвращает несовпавшие пути.
+    """
+    tasks = [(path, i) for path, blocks in digests.items() for i in range(len(blocks))]
+    total = len(tasks); done = 0; lock = threading.Lock()
+    buffers = threading.local()
+
+    def check(task):
+        nonlocal done
+        path, i = task
+        if getattr(buffers, "buf", None) is None: buffers.buf = mmap.mmap(-1, block)
+        try:
+            with _open_uncached(os.path.join(target, *path.split("/"))) as f:
+                ok = hashlib.sha256(_read_block(f, i * block, block, buffers.buf)).digest() == digests[path][i]
+                if ok and i == len(digests[path]) - 1: ok = os.fstat(f.fileno()).st_size <= (i + 1) * block  # лишний хвост — тоже ошибка
+        except OSError:
+            ok = False
+        with lock:
+            done += 1
+            if on_event and (done == total or done % 32 == 0): on_event({"state": "verifying", "done": done, "total": total})
+        return path, ok
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        bad = {path for path, ok in pool.map(check, tasks) if not ok}
+    return sorted(bad)
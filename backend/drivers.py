@@ -1,21 +1,49 @@
 # backend/drivers.py
-import time
 import random
-from typing import List, Dict
+import time
+from typing import List, Dict, Iterator
+
+from backend import procs
+from backend.batch import dedupe, stream
+
+PNPUTIL_TIMEOUT = 600  # секунд; установка драйвера на устройство может ждать само устройство
 
-def install_drivers(ids: List[str]) -> Dict[str, bool]:
+def _pnputil(inf_path: str, cancel_event=None) -> bool:
+    """ Добавляет пакет в хранилище драйверов Windows и ставит его на подходящие устройства. """
+    result = procs.run(["pnputil", "/add-driver", inf_path, "/install"], timeout=PNPUTIL_TIMEOUT, cancel_event=cancel_event, codes=procs.PNPUTIL_CODES)
+    if result.status == "error": print(f"pnputil не запустился для {inf_path}: {result.tail}")
+    return result.ok
+
+def _simulate(drv_id: str) -> bool:
+    # Позиции data/drivers.json — названия производителей без пакетов драйверов:
+    # для них установка по-прежнему только изображается
+    print(f"Simulating installation of {drv_id}...")
+    time.sleep(random.randint(2, 5)) # Пауза от 2 до 5 секунд
+    return True
+
+def install_drivers(ids: List[str], cancel_event=None, on_event=None) -> Dict[str, bool]:
     """
-    Симулирует установку драйверов.
-    Делает паузу для имитации процесса и возвращает успех.
+    Устанавливает драйверы.  ID, оканчивающийся на .inf, — путь к пакету из хранилища
+    (подобран backend.driverstore по hardware ID) и ставится через pnputil;
+    остальные ID — позиции каталога data/drivers.json, установка для них симулируется.
     """
+    ids = dedupe(ids)
+    emit = on_event or (lambda event: None)
+    for drv_id in ids:
+        emit({"id": drv_id, "state": "queued"})
     results: Dict[str, bool] = {}
+    started = time.perf_counter()
     for drv_id in ids:
-        # Имитируем бурную деятельность
-        print(f"Simulating installation of {drv_id}...")
-        time.sleep(random.randint(2, 5)) # Пауза от 2 до 5 секунд
-        
-        # В дипломной работе можно рассказать, что здесь мог бы быть
-        # вызов DISM, PnPUtil или запуск скачанного инсталлятора.
-        results[drv_id] = True # Всегда возвращаем успех для демонстрации
+        if cancel_event is not None and cancel_event.is_set():
+            break
+        emit({"id": drv_id, "state": "installing"})
+        t0 = time.perf_counter()
+        ok = _pnputil(drv_id, cancel_event) if drv_id.lower().endswith(".inf") else _simulate(drv_id)
+        results[drv_id] = ok
+        emit({"id": drv_id, "state": "done" if ok else "failed", "ok": ok, "duration": time.perf_counter() - t0})
+
+    emit({"state": "summary", "wall": time.perf_counter() - started})
+    return results
 
-    return results
\ No newline at end of file
+def iter_install_drivers(ids: List[str], cancel_event=None) -> Iterator[dict]:
+    return stream(install_drivers, ids, cancel_event=cancel_event)
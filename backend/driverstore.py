@@ -0,0 +1,284 @@
+# backend/driverstore.py
+"""
+Хранилище драйверов: разбор INF-файлов в индекс по hardware/compatible ID
+и подбор лучшего драйвера для каждого устройства компьютера.
+
+Индекс — SQLite в папке данных AUSNIT: повторная индексация перечитывает
+только новые и изменённые INF (по размеру и mtime), так что тысячи файлов
+разбираются один раз.  Подбор — один запрос по индексу ID на устройство.
+
+Ранжирование повторяет схему Windows (меньше — лучше):
+  подпись      0x00FF0000, если в [Version] нет CatalogFile (пакет не подписан);
+  тип совпадения: hardware ID устройства = hardware ID в INF      0x0000 + i,
+                  hardware ID устройства = compatible ID в INF     0x1000 + 0x100*j + i,
+                  compatible ID устройства = hardware ID в INF     0x2000 + k,
+                  compatible ID устройства = compatible ID в INF   0x3000 + 0x100*j + k,
+  где i/k — позиция ID в списке устройства, j — позиция ID в строке модели INF.
+При равном ранге выигрывает более новый DriverVer (дата, затем версия).
+
+Индексация:  python -m backend.driverstore --store <папка с INF> [--devices devices.json]
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from backend.bootcache import app_data_dir
+
+MMAP_SIZE = 64 * 1024 * 1024
+UNSIGNED_PENALTY = 0x00FF0000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS infs (
+    rowid INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    class TEXT NOT NULL DEFAULT '',
+    provider TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL DEFAULT '',
+    version TEXT NOT NULL DEFAULT '',
+    signed INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS ids (
+    hwid TEXT NOT NULL,
+    inf INTEGER NOT NULL REFERENCES infs(rowid) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    section TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS ids_hwid ON ids(hwid);
+CREATE INDEX IF NOT EXISTS ids_inf ON ids(inf);
+"""
+
+def default_path():
+    return os.path.join(app_data_dir(), "drivers.sqlite")
+
+def default_store():
+    """ Папка с распакованными пакетами драйверов: AUSNIT_DRIVER_STORE или drivers рядом с данными AUSNIT. """
+    return os.environ.get("AUSNIT_DRIVER_STORE") or os.path.join(app_data_dir(), "drivers")
+
+def machine_arch() -> str:
+    """ Декорация платформы INF для этой машины (NTamd64, NTarm64, NTx86). """
+    arch = (os.environ.get("PROCESSOR_ARCHITECTURE") or platform.machine()).lower()
+    return {"x86_64": "amd64", "aarch64": "arm64", "arm64": "arm64", "i386": "x86", "i686": "x86"}.get(arch, arch or "amd64")
+
+# --- Разбор INF ---
+def _decode(raw: bytes) -> str:
+    if raw.startswith(b"\xff\xfe") or raw.startswith(b"\xfe\xff"): return raw.decode("utf-16")
+    if raw.startswith(b"\xef\xbb\xbf"): return raw[3:].decode("utf-8", "replace")
+    try: return raw.decode("utf-8")
+    except UnicodeDecodeError: return raw.decode("cp1252", "replace")  # ANSI-INF старых пакетов
+
+def _strip_comment(line: str) -> str:
+    """ ';' начинает комментарий, если он не внутри кавычек. """
+    quoted = False
+    for i, ch in enumerate(line):
+        if ch == '"': quoted = not quoted
+        elif ch == ";" and not quoted: return line[:i]
+    return line
+
+def read_sections(text: str) -> Dict[str, List[str]]:
+    """ {имя секции в нижнем регистре: строки без комментариев}; продолжение строки — '\\' в конце. """
+    sections: Dict[str, List[str]] = {}; current = None; pending = ""
+    for raw in text.splitlines():
+        line = _strip_comment(raw).strip()
+        if pending: line = pending + line; pending = ""
+        if line.endswith("\\"): pending = line[:-1]; continue
+        if not line: continue
+        if line.startswith("[") and "]" in line:
+            current = sections.setdefault(line[1:line.index("]")].strip().lower(), []); continue
+        if current is not None: current.append(line)
+    return sections
+
+def _split_values(value: str) -> List[str]:
+    return [v.strip().strip('"').strip() for v in value.split(",")]
+
+def _key_value(line: str) -> Tuple[str, str]:
+    key, _, value = line.partition("=")
+    return key.strip(), value.strip()
+
+def _parse_driver_ver(value: str) -> Tuple[str, str]:
+    """ 'mm/dd/yyyy,1.2.3.4' -> ('yyyy-mm-dd', '1.2.3.4'). """
+    date, _, version = (v.strip() for v in value.partition(","))
+    m = re.match(r"(\d{1,2})[/-](\d{1,2})[/-](\d{4})", date)
+    return (f"{m.group(3)}-{int(m.group(1)):02}-{int(m.group(2)):02}" if m else ""), version
+
+def parse_inf(text: str, arch: Optional[str] = None) -> dict:
+    """
+    Поля [Version] и модели для платформы arch: {"class", "provider", "date", "version",
+    "signed", "models": [(описание, секция установки, [hardware ID, compatible ID...])]}.
+    Секции моделей выбираются по декорациям из [Manufacturer] (NTamd64, NTamd64.10.0...);
+    без декораций берётся сама секция.  Версии ОС в декорациях не проверяются.
+    """
+    arch = (arch or machine_arch()).lower()
+    sections = read_sections(text)
+    strings: Dict[str, str] = {}
+    for name in sorted(s for s in sections if s == "strings" or s.startswith("strings.")):
+        for line in sections[name]:
+            key, value = _key_value(line)
+            strings.setdefault(key.lower(), value.strip('"'))
+    expand = lambda value: re.sub(r"%([^%]+)%", lambda m: strings.get(m.group(1).lower(), m.group(0)), value)
+    version = {k.lower(): expand(v.strip('"')) for k, v in map(_key_value, sections.get("version", []))}
+    date, driver_version = _parse_driver_ver(version.get("driverver", ""))
+    models = []
+    for line in sections.get("manufacturer", []):
+        _, value = _key_value(line) if "=" in line else ("", line)
+        base, *decorations = _split_values(value)
+        names = [f"{base}.{d}" for d in decorations if d.lower().split(".")[0] in ("nt", f"nt{arch}")] if decorations else [base]
+        for name in names:
+            for model in sections.get(name.lower(), []):
+                desc, values = _key_value(model)
+                install, *ids = _split_values(values)
+                ids = [i.upper() for i in ids if i]
+                if ids: models.append((expand(desc).strip('"'), install, ids))
+    return {"class": version.get("class", ""), "provider": version.get("provider", ""), "date": date, "version": driver_version,
+            "signed": any(k.startswith("catalogfile") for k in version), "models": models}
+
+def read_inf(path: str, arch: Optional[str] = None) -> dict:
+    with open(path, "rb") as f:
+        return parse_inf(_decode(f.read()), arch)
+
+def _version_key(version: str):
+    return [int(p) if p.isdigit() else 0 for p in version.split(".")]
+
+def rank(device_pos: int, compatible: bool, inf_pos: int, signed: bool) -> int:
+    score = (0x2000 if compatible else 0) + (0x1000 + 0x100 * min(inf_pos, 0xF) if inf_pos else 0) + min(device_pos, 0xFF)
+    return score + (0 if signed else UNSIGNED_PENALTY)
+
+# --- Индекс ---
+class DriverIndex:
+    def __init__(self, path: Optional[str] = None, arch: Optional[str] = None):
+        self.path = path or default_path(); self.arch = arch or machine_arch()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA foreign_keys=ON")
+        self.db.executescript(_SCHEMA)
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT count(*) FROM infs").fetchone()[0]
+
+    def _add(self, path: str, signature: Tuple[int, int], info: dict):
+        self.db.execute("DELETE FROM infs WHERE path = ?", (path,))
+        cur = self.db.execute("INSERT INTO infs(path, size, mtime_ns, class, provider, date, version, signed) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                              (path, *signature, info["class"], info["provider"], info["date"], info["version"], int(info["signed"])))
+        self.db.executemany("INSERT INTO ids(hwid, inf, position, description, section) VALUES (?, ?, ?, ?, ?)",
+                            [(hwid, cur.lastrowid, pos, desc, section) for desc, section, ids in info["models"] for pos, hwid in enumerate(ids)])
+
+    def scan(self, root: str) -> Dict[str, int]:
+        """
+        Инкрементальная индексация папки: разбираются только новые и изменённые INF,
+        исчезнувшие удаляются из индекса.  Нечитаемые INF пропускаются (stats["failed"]).
+        """
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0, "failed": 0}
+        known = {r["path"]: (r["size"], r["mtime_ns"]) for r in self.db.execute("SELECT path, size, mtime_ns FROM infs")}
+        seen = set()
+        with self.db:
+            for dirpath, _, filenames in os.walk(root):
+                for filename in filenames:
+                    if not filename.lower().endswith(".inf"): continue
+                    path = os.path.abspath(os.path.join(dirpath, filename)); seen.add(path)
+                    try:
+                        st = os.stat(path); signature = (st.st_size, st.st_mtime_ns)
+                        if known.get(path) == signature:
+                            stats["unchanged"] += 1; continue
+                        self._add(path, signature, read_inf(path, self.arch))
+                    except (OSError, ValueError) as e:
+                        print(f"INF пропущен: {path}: {e}"); stats["failed"] += 1; continue
+                    stats["updated" if path in known else "added"] += 1
+            root_prefix = os.path.abspath(root) + os.sep
+            gone = [p for p in known if p.startswith(root_prefix) and p not in seen]
+            self.db.executemany("DELETE FROM infs WHERE path = ?", [(p,) for p in gone])
+            stats["removed"] = len(gone)
+        return stats
+
+    def candidates(self, device: dict) -> List[dict]:
+        """ Все подходящие драйверы устройства, лучший первым. """
+        hardware = [i.upper() for i in device.get("hardware_ids") or []]
+        compatible = [i.upper() for i in device.get("compatible_ids") or []]
+        positions: Dict[str, Tuple[int, bool]] = {}
+        for is_compatible, ids in ((False, hardware), (True, compatible)):
+            for pos, hwid in enumerate(ids): positions.setdefault(hwid, (pos, is_compatible))
+        if not positions:
+            return []
+        rows = self.db.execute(f"""SELECT ids.hwid, ids.position, ids.description, ids.section, infs.path, infs.class, infs.provider, infs.date, infs.version, infs.signed
+                                   FROM ids JOIN infs ON infs.rowid = ids.inf WHERE ids.hwid IN ({', '.join('?' * len(positions))})""", list(positions))
+        best: Dict[Tuple[str, str], dict] = {}
+        for r in rows:
+            device_pos, is_compatible = positions[r["hwid"]]
+            found = {"inf": r["path"], "description": r["description"], "section": r["section"], "matched_id": r["hwid"], "class": r["class"],
+                     "provider": r["provider"], "date": r["date"], "version": r["version"], "rank": rank(device_pos, is_compatible, r["position"], bool(r["signed"]))}
+            key = (r["path"], r["section"])
+            if key not in best or found["rank"] < best[key]["rank"]: best[key] = found
+        # Меньший ранг лучше; при равенстве — новее дата, затем версия (сортировка устойчивая)
+        found = sorted(best.values(), key=lambda m: (m["date"], _version_key(m["version"])), reverse=True)
+        return sorted(found, key=lambda m: m["rank"])
+
+    def match(self, devices: Iterable[dict]) -> Dict[str, dict]:
+        """ {ID экземпляра устройства: лучший драйвер} — только для устройств, у которых что-то нашлось. """
+        result = {}
+        for device in devices:
+            found = self.candidates(device)
+            if found: result[device.get("id") or found[0]["matched_id"]] = {**found[0], "device": device.get("name", "")}
+        return result
+
+def open_default() -> Optional[DriverIndex]:
+    """ Индекс из папки данных AUSNIT, если его уже собирали; иначе None. """
+    path = default_path()
+    return DriverIndex(path) if os.path.exists(path) else None
+
+# --- Устройства компьютера ---
+def _as_list(value) -> List[str]:
+    if not value: return []
+    return [value] if isinstance(value, str) else [v for v in value if v]
+
+def parse_devices(text: str) -> List[dict]:
+    """
+    Вывод PowerShell `Get-CimInstance Win32_PnPEntity | ConvertTo-Json` (или фикстура
+    в том же виде) -> [{"id", "name", "hardware_ids", "compatible_ids"}].
+    """
+    try: raw = json.loads(text) if text.strip() else []
+    except ValueError: return []
+    return devices_from_rows([raw] if isinstance(raw, dict) else raw)
+
+def devices_from_rows(raw: List[dict]) -> List[dict]:
+    """ Экземпляры Win32_PnPEntity (DEVICE_PROPERTIES) -> устройства, как у parse_devices. """
+    devices = []
+    for item in raw:
+        get = lambda *keys: next((item[k] for k in keys if item.get(k)), None)
+        devices.append({"id": get("DeviceID", "id") or "", "name": get("Name", "name") or "",
+                        "hardware_ids": _as_list(get("HardwareID", "hardware_ids")), "compatible_ids": _as_list(get("CompatibleID", "compatible_ids"))})
+    return [d for d in devices if d["hardware_ids"] or d["compatible_ids"]]
+
+DEVICE_PROPERTIES = ["DeviceID", "Name", "HardwareID", "CompatibleID"]
+DEVICES_COMMAND = f'powershell -NoProfile -Command "Get-CimInstance Win32_PnPEntity | Select-Object {",".join(DEVICE_PROPERTIES)} | ConvertTo-Json -Compress"'
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Индексация хранилища драйверов и подбор по ID устройств")
+    parser.add_argument("--db", default=default_path())
+    parser.add_argument("--store", default=default_store(), help="папка с INF-файлами")
+    parser.add_argument("--arch", default=None, help="платформа INF: amd64, x86, arm64")
+    parser.add_argument("--devices", help="JSON со списком устройств (вывод Win32_PnPEntity или фикстура)")
+    args = parser.parse_args(argv)
+    index = DriverIndex(args.db, args.arch)
+    if os.path.isdir(args.store):
+        print(f"{args.store}: {index.scan(args.store)}")
+    print(f"в индексе {len(index)} INF: {index.path}")
+    if args.devices:
+        with open(args.devices, "r", encoding="utf-8-sig") as f:
+            devices = parse_devices(f.read())
+        for device_id, found in index.match(devices).items():
+            print(f"  {found['device'] or device_id}: {found['description']} ({found['provider']} {found['version']}, {found['matched_id']}, ранг {found['rank']:#x}) -> {found['inf']}")
+    index.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,165 @@
 # backend/install.py
-import subprocess
-from typing import List, Dict
+import os
+import re
+import shlex
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Iterator, Optional
 
-CREATE_NO_WINDOW = 0x08000000  # не показывать чёрное окно
+from backend import installcache, procs
+from backend.batch import dedupe, stream
 
-def _run(cmd: list[str]) -> bool:
+MAX_DOWNLOADS = 3  # сколько `winget download` качают одновременно
+
+# Сроки в секундах (см. backend/procs.py): установщик, ждущий ответа на скрытый
+# вопрос, иначе держал бы поток вечно.  winget download всё время пишет прогресс,
+# так что долгая тишина значит зависание; установщики молчат законно.
+INSTALL_TIMEOUT = float(os.environ.get("AUSNIT_INSTALL_TIMEOUT", "1800"))
+DOWNLOAD_IDLE_TIMEOUT = float(os.environ.get("AUSNIT_DOWNLOAD_IDLE_TIMEOUT", "300"))
+
+_AGREEMENTS = ["--accept-package-agreements", "--accept-source-agreements"]
+
+# Тихие ключи по типу установщика — те же, что winget подставляет сам,
+# если в манифесте нет InstallerSwitches.Silent
+_SILENT_SWITCHES = {
+    "inno": ["/VERYSILENT", "/SUPPRESSMSGBOXES", "/NORESTART", "/SP-"],
+    "nullsoft": ["/S"],
+    "burn": ["/quiet", "/norestart"],
+}
+
+def _run(cmd: list[str], cancel_event=None, timeout: Optional[float] = INSTALL_TIMEOUT, idle_timeout: Optional[float] = None) -> procs.ProcResult:
+    result = procs.run(cmd, timeout=timeout, idle_timeout=idle_timeout, cancel_event=cancel_event, codes=procs.INSTALL_CODES)
+    if not result.ok and result.status != "cancelled":
+        last = result.tail.splitlines()[-1:] or [""]
+        print(f"{cmd[0]}: {result.status} (код {result.returncode}) {last[0]}".rstrip())
+    return result
+
+def _install_cmd(pkg: str) -> list[str]:
+    return ["winget", "install", "-e", "--silent", *_AGREEMENTS, "--id", pkg]
+
+def _download_cmd(pkg: str, dest: str) -> list[str]:
+    return ["winget", "download", "-e", *_AGREEMENTS, "--id", pkg, "--download-directory", dest]
+
+def _read_manifest(folder: str) -> Dict[str, str]:
+    """
+    Достаёт из манифеста, который кладёт `winget download`, тип установщика
+    и тихие ключи. Полноценный YAML не нужен — хватает двух полей.
+    """
+    info: Dict[str, str] = {}
+    for name in os.listdir(folder):
+        if not name.lower().endswith(".yaml"):
+            continue
+        with open(os.path.join(folder, name), "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                m = re.match(r"\s*-?\s*(InstallerType|Silent):\s*(.*?)\s*$", line)
+                if m and m.group(1) not in info:
+                    info[m.group(1)] = m.group(2).strip("'\"")
+    return info
+
+def _local_install_cmd(folder: str) -> Optional[list[str]]:
+    """
+    Собирает команду тихой установки уже скачанного установщика.
+    None — формат не поддерживается, ставим обычным `winget install`.
+    """
     try:
-        p = subprocess.run(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            creationflags=CREATE_NO_WINDOW,
-            shell=False
-        )
-        return p.returncode == 0
-    except Exception:
-        return False
+        files = [n for n in sorted(os.listdir(folder)) if not n.lower().endswith(".yaml")]
+        manifest = _read_manifest(folder)
+    except OSError:
+        return None
+    if not files:
+        return None
+    installer = os.path.join(folder, files[0])
+    kind = manifest.get("InstallerType", "").lower()
+    silent = manifest.get("Silent")
+    if kind in ("msi", "wix"):
+        return ["msiexec", "/i", installer, "/qn", "/norestart"]
+    if silent:
+        return [installer, *shlex.split(silent, posix=False)]
+    if kind in _SILENT_SWITCHES:
+        return [installer, *_SILENT_SWITCHES[kind]]
+    return None  # msix, zip, portable и exe без ключей
 
-def install_programs(ids: List[str]) -> Dict[str, bool]:
+def install_sequential(ids: List[str]) -> Dict[str, bool]:
+    """ Старый путь: один `winget install` за другим, без предзагрузки. """
     results: Dict[str, bool] = {}
     for pkg in ids:
-        cmd = [
-            "winget", "install", "-e",
-            "--silent",
-            "--accept-package-agreements",
-            "--accept-source-agreements",
-            "--id", pkg
-        ]
-        results[pkg] = _run(cmd)
+        results[pkg] = _run(_install_cmd(pkg)).ok
     return results
+
+def install_pipeline(ids: List[str], max_downloads: int = MAX_DOWNLOADS, cancel_event=None, on_event=None, workdir: Optional[str] = None,
+                     cache: Optional[installcache.InstallerCache] = None, peers: Optional[List[str]] = None) -> Dict[str, bool]:
+    """
+    Конвейер установки: до `max_downloads` пакетов качаются параллельно
+    (`winget download`), а единственная «линия установщика» ставит их строго
+    по порядку. Пока идёт установка (MSI всё равно не ставятся параллельно),
+    сеть занята следующими пакетами.
+    С cache установщик сперва ищется в кэше (backend.installcache), затем у
+    соседей peers, и только потом скачивается; скачанное кладётся в кэш.
+
+    on_event получает словари {"id", "state", ...}; в конце приходит
+    событие "summary" с выигрышем по времени относительно последовательного пути.
+    """
+    ids = dedupe(ids)
+    emit = on_event or (lambda event: None)
+    for pkg in ids:
+        emit({"id": pkg, "state": "queued"})
+    own_workdir = workdir is None
+    workdir = workdir or tempfile.mkdtemp(prefix="ausnit_dl_")
+    results: Dict[str, bool] = {}
+    totals = {"download": 0.0, "install": 0.0}
+    started = time.perf_counter()
+
+    def download(index, pkg):
+        if cancel_event is not None and cancel_event.is_set():
+            return None, 0.0
+        emit({"id": pkg, "state": "downloading"})
+        dest = os.path.join(workdir, f"{index:03d}_{re.sub(r'[^A-Za-z0-9._-]', '_', pkg)}")
+        t0 = time.perf_counter()
+        source = cache.restore_or_fetch(pkg, dest, peers) if cache is not None else None
+        ok = source is not None or _run(_download_cmd(pkg, dest), cancel_event, idle_timeout=DOWNLOAD_IDLE_TIMEOUT).ok
+        if ok and source is None and cache is not None:
+            try: cache.store(pkg, dest)
+            except OSError as e: print(f"Кэш установщиков: {pkg} не сохранён: {e}")
+        if source: emit({"id": pkg, "state": "downloading", "cached": source})
+        return (dest if ok else None), time.perf_counter() - t0
+
+    pool = ThreadPoolExecutor(max_workers=max(1, max_downloads), thread_name_prefix="winget-dl")
+    try:
+        futures = [pool.submit(download, i, pkg) for i, pkg in enumerate(ids)]
+        for pkg, future in zip(ids, futures):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            folder, dl_time = future.result()
+            totals["download"] += dl_time
+            if cancel_event is not None and cancel_event.is_set():
+                break
+            cmd = _local_install_cmd(folder) if folder else None
+            emit({"id": pkg, "state": "installing", "download_time": dl_time, "local": cmd is not None})
+            t0 = time.perf_counter()
+            result = _run(cmd or _install_cmd(pkg), cancel_event)
+            inst_time = time.perf_counter() - t0
+            totals["install"] += inst_time
+            results[pkg] = result.ok
+            emit({"id": pkg, "state": "done" if result.ok else "failed", "ok": result.ok, "status": result.status, "duration": dl_time + inst_time})
+            if folder:
+                shutil.rmtree(folder, ignore_errors=True)
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+        if own_workdir:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    wall = time.perf_counter() - started
+    sequential = totals["download"] + totals["install"]
+    summary = {"state": "summary", "wall": wall, "sequential": sequential, "saved": sequential - wall, **totals}
+    print(f"Pipeline: {len(results)} пакетов за {wall:.1f} с (последовательно ~{sequential:.1f} с, выигрыш {sequential - wall:.1f} с)")
+    emit(summary)
+    return results
+
+def install_programs(ids: List[str]) -> Dict[str, bool]:
+    return install_pipeline(ids, cache=installcache.default_cache())
+
+def iter_install_programs(ids: List[str], cancel_event=None) -> Iterator[dict]:
+    """ Пакетная установка всей выборки сразу; события — см. backend/batch.py. """
+    return stream(install_pipeline, ids, cancel_event=cancel_event, cache=installcache.default_cache())
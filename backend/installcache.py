@@ -0,0 +1,328 @@
+# backend/installcache.py
+"""
+Локальный кэш установщиков, адресуемый по содержимому.
+
+Папка, которую кладёт `winget download` (установщик + манифест), сохраняется
+как запись {ID пакета, версия, файлы по sha256}; сами файлы лежат в objects/
+под своим хэшем, так что одинаковые установщики разных записей хранятся один
+раз.  Кэш ограничен по размеру: при переполнении выселяются давно не
+использованные записи (LRU) и файлы, на которые больше никто не ссылается.
+
+Версия пакета до скачивания неизвестна, поэтому запись без явной версии
+считается свежей MAX_AGE секунд — за это время партия машин ставится из кэша.
+
+Другие экземпляры AUSNIT в сети могут брать установщики у этого по HTTP:
+  GET /entries/<ID пакета>   -> JSON записи (самой свежей)
+  GET /objects/<sha256>      -> содержимое файла
+Раздача:  python -m backend.installcache --serve 8765 [--host 0.0.0.0]
+Соседи:   AUSNIT_CACHE_PEERS=http://host:8765,http://host2:8765
+
+Раздача без авторизации и по умолчанию слушает только 127.0.0.1.  Соседу
+не верим: установщик от него принимается, только если его sha256 совпал с
+InstallerSha256 из манифеста winget (`winget show`) или с файлом своей записи
+этого пакета; манифест соседа не берётся — он пишется заново по `winget show`.
+Иначе пакет качается обычным `winget download`.
+"""
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import quote, unquote
+
+from backend import procs
+from backend.bootcache import app_data_dir
+
+DEFAULT_LIMIT = 20 * 1024 ** 3
+MAX_AGE = 24 * 3600
+PEER_TIMEOUT = 5
+SHOW_TIMEOUT = 60  # `winget show` — источник доверенного хэша для установщиков соседей
+COPY_CHUNK = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    rowid INTEGER PRIMARY KEY,
+    package_id TEXT NOT NULL COLLATE NOCASE,
+    version TEXT NOT NULL DEFAULT '',
+    files TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    UNIQUE(package_id, version, files)
+);
+CREATE INDEX IF NOT EXISTS entries_package ON entries(package_id, stored_at);
+CREATE TABLE IF NOT EXISTS objects (
+    sha256 TEXT PRIMARY KEY,
+    size INTEGER NOT NULL
+);
+"""
+
+def default_root():
+    return os.environ.get("AUSNIT_CACHE_DIR") or os.path.join(app_data_dir(), "installers")
+
+def default_peers() -> List[str]:
+    return [p.strip().rstrip("/") for p in os.environ.get("AUSNIT_CACHE_PEERS", "").split(",") if p.strip()]
+
+def _manifest_version(folder: str) -> str:
+    for name in os.listdir(folder):
+        if name.lower().endswith(".yaml"):
+            with open(os.path.join(folder, name), "r", encoding="utf-8", errors="ignore") as f:
+                for line in f:
+                    if line.startswith("PackageVersion:"): return line.split(":", 1)[1].strip().strip("'\"")
+    return ""
+
+def _plain_name(name) -> bool:
+    """ Имя файла записи — только имя, без пути: оно приходит и от соседей. """
+    return isinstance(name, str) and name not in ("", ".", "..") and not any(c in name for c in "/\\:\0")
+
+def winget_show(package_id: str, timeout: float = SHOW_TIMEOUT) -> Dict[str, str]:
+    """ Версия, тип установщика и InstallerSha256 из `winget show`; пустой словарь, если не вышло. """
+    result = procs.run(["winget", "show", "-e", "--id", package_id, "--accept-source-agreements"], timeout=timeout, capture=True)
+    if not result.ok: return {}
+    info = {}
+    for line in result.stdout.splitlines():
+        m = re.match(r"\s*(Version|Installer Type|Installer SHA256):\s*(\S+)", line)
+        if m and m.group(1) not in info: info[m.group(1)] = m.group(2)
+    sha256 = info.get("Installer SHA256", "").lower()
+    if not re.fullmatch(r"[0-9a-f]{64}", sha256): return {}
+    return {"version": info.get("Version", ""), "type": info.get("Installer Type", ""), "sha256": sha256}
+
+class InstallerCache:
+    def __init__(self, root: Optional[str] = None, limit: int = DEFAULT_LIMIT, max_age: float = MAX_AGE):
+        self.root = root or default_root(); self.limit = limit; self.max_age = max_age
+        self.objects = os.path.join(self.root, "objects")
+        os.makedirs(self.objects, exist_ok=True)
+        self.db = sqlite3.connect(os.path.join(self.root, "index.sqlite"), check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.executescript(_SCHEMA)
+        self._lock = threading.Lock()  # загрузки идут в нескольких потоках
+
+    def close(self):
+        self.db.close()
+
+    def object_path(self, sha256: str) -> str:
+        return os.path.join(self.objects, sha256[:2], sha256)
+
+    @property
+    def size(self) -> int:
+        with self._lock:
+            return self.db.execute("SELECT coalesce(sum(size), 0) FROM objects").fetchone()[0]
+
+    # --- Запись ---
+    def _put_object(self, src) -> Dict[str, object]:
+        """ Копирует поток src в objects/, считая sha256 по ходу; одинаковое содержимое хранится один раз. """
+        tmp_path = os.path.join(self.objects, f"tmp-{threading.get_ident()}-{time.monotonic_ns()}")
+        digest = hashlib.sha256(); size = 0
+        try:
+            with open(tmp_path, "wb") as out:
+                for block in iter(lambda: src.read(COPY_CHUNK), b""):
+                    digest.update(block); out.write(block); size += len(block)
+            sha256 = digest.hexdigest(); final = self.object_path(sha256)
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(tmp_path, final)
+        finally:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+        with self._lock, self.db:
+            self.db.execute("INSERT OR IGNORE INTO objects(sha256, size) VALUES (?, ?)", (sha256, size))
+        return {"sha256": sha256, "size": size}
+
+    def _add_entry(self, package_id: str, version: str, files: List[dict]) -> dict:
+        files = sorted(files, key=lambda f: f["name"]); now = time.time()
+        encoded = json.dumps(files, sort_keys=True)
+        with self._lock, self.db:
+            self.db.execute("""INSERT INTO entries(package_id, version, files, size, stored_at, last_used) VALUES (?, ?, ?, ?, ?, ?)
+                               ON CONFLICT(package_id, version, files) DO UPDATE SET stored_at = excluded.stored_at, last_used = excluded.last_used""",
+                            (package_id, version, encoded, sum(f["size"] for f in files), now, now))
+        self.evict()
+        return {"package_id": package_id, "version": version, "files": files}
+
+    def store(self, package_id: str, folder: str) -> dict:
+        """ Кладёт в кэш папку `winget download` (все файлы верхнего уровня). """
+        files = []
+        for name in sorted(os.listdir(folder)):
+            path = os.path.join(folder, name)
+            if not os.path.isfile(path): continue
+            with open(path, "rb") as src:
+                files.append({"name": name, **self._put_object(src)})
+        return self._add_entry(package_id, _manifest_version(folder), files)
+
+    # --- Чтение ---
+    def lookup(self, package_id: str, version: Optional[str] = None) -> Optional[dict]:
+        """ Запись с точной версией или, без версии, самая свежая не старше max_age. """
+        with self._lock:
+            if version:
+                row = self.db.execute("SELECT * FROM entries WHERE package_id = ? AND version = ? ORDER BY stored_at DESC LIMIT 1", (package_id, version)).fetchone()
+            else:
+                row = self.db.execute("SELECT * FROM entries WHERE package_id = ? AND stored_at >= ? ORDER BY stored_at DESC LIMIT 1",
+                                      (package_id, time.time() - self.max_age)).fetchone()
+        if row is None: return None
+        entry = {"package_id": row["package_id"], "version": row["version"], "files": json.loads(row["files"]), "rowid": row["rowid"]}
+        if not all(os.path.exists(self.object_path(f["sha256"])) for f in entry["files"]):
+            return None  # файлы удалили мимо кэша
+        return entry
+
+    def restore(self, package_id: str, dest: str, version: Optional[str] = None) -> bool:
+        """ Раскладывает запись в папку dest (жёсткие ссылки, если можно, иначе копия). True — попадание. """
+        entry = self.lookup(package_id, version)
+        if entry is None: return False
+        if not all(_plain_name(f["name"]) for f in entry["files"]):
+            print(f"Кэш установщиков: запись {package_id} с недопустимым именем файла пропущена"); return False
+        os.makedirs(dest, exist_ok=True)
+        for f in entry["files"]:
+            src, target = self.object_path(f["sha256"]), os.path.join(dest, f["name"])
+            try: os.link(src, target)
+            except OSError: shutil.copyfile(src, target)
+            os.chmod(target, 0o755)
+        with self._lock, self.db:
+            self.db.execute("UPDATE entries SET last_used = ? WHERE rowid = ?", (time.time(), entry["rowid"]))
+        return True
+
+    def evict(self, limit: Optional[int] = None) -> int:
+        """ Выселяет давно не использованные записи, пока файлы не влезут в limit; возвращает освобождённые байты. """
+        limit = self.limit if limit is None else limit; freed = 0
+        with self._lock, self.db:
+            total = self.db.execute("SELECT coalesce(sum(size), 0) FROM objects").fetchone()[0]
+            if total <= limit: return 0
+            refs: Dict[str, int] = {}
+            entries = [(row["rowid"], json.loads(row["files"])) for row in self.db.execute("SELECT rowid, files FROM entries ORDER BY last_used")]
+            for _, files in entries:
+                for f in files: refs[f["sha256"]] = refs.get(f["sha256"], 0) + 1
+            sizes = {row["sha256"]: row["size"] for row in self.db.execute("SELECT sha256, size FROM objects")}
+            for rowid, files in entries:
+                if total <= limit: break
+                self.db.execute("DELETE FROM entries WHERE rowid = ?", (rowid,))
+                for f in files:
+                    refs[f["sha256"]] -= 1
+                    if refs[f["sha256"]] or f["sha256"] not in sizes: continue
+                    try: os.remove(self.object_path(f["sha256"]))
+                    except FileNotFoundError: pass
+                    self.db.execute("DELETE FROM objects WHERE sha256 = ?", (f["sha256"],))
+                    size = sizes.pop(f["sha256"]); total -= size; freed += size
+        return freed
+
+    # --- Соседи по сети ---
+    def _known_hashes(self, package_id: str) -> set:
+        """ sha256 файлов своих записей пакета — им можно верить без `winget show`. """
+        with self._lock:
+            rows = self.db.execute("SELECT files FROM entries WHERE package_id = ?", (package_id,)).fetchall()
+        return {f["sha256"] for row in rows for f in json.loads(row["files"]) if not f["name"].lower().endswith(".yaml")}
+
+    def fetch(self, peer: str, package_id: str, trusted: Optional[Dict[str, str]] = None, timeout: float = PEER_TIMEOUT) -> Optional[dict]:
+        """
+        Берёт установщик у другого экземпляра AUSNIT.  Принимается только файл с
+        sha256 из trusted (`winget show`, см. winget_show) или из своих записей
+        пакета; манифест пишется по trusted.  None — у соседа нет или ему не верим.
+        """
+        trusted = trusted or {}
+        allowed = self._known_hashes(package_id) | ({trusted["sha256"]} if trusted.get("sha256") else set())
+        if not allowed: return None
+        try:
+            with urllib.request.urlopen(f"{peer}/entries/{quote(package_id, safe='')}", timeout=timeout) as r:
+                entry = json.loads(r.read().decode("utf-8"))
+            installers = [f for f in entry["files"] if not str(f.get("name", "")).lower().endswith(".yaml")]
+            if len(installers) != 1: raise ValueError(f"ожидался один установщик, а не {len(installers)}")
+            f = installers[0]
+            if not _plain_name(f["name"]): raise ValueError(f"недопустимое имя файла {f['name']!r}")
+            if f["sha256"] not in allowed: raise ValueError(f"{f['name']}: хэш не совпал с манифестом winget")
+            with urllib.request.urlopen(f"{peer}/objects/{f['sha256']}", timeout=timeout) as r:
+                got = self._put_object(r)
+            if got["sha256"] != f["sha256"]:
+                raise ValueError(f"{f['name']}: хэш не совпал")
+        except Exception as e:
+            print(f"Кэш {peer}: {package_id} не получен: {e}")
+            return None
+        # Манифест соседа (тип установщика, тихие ключи) не проверить — пишем свой по `winget show`
+        version = trusted.get("version", "")
+        manifest = f"PackageIdentifier: {package_id}\nPackageVersion: {version}\nInstallers:\n- InstallerType: {trusted.get('type', '')}\n"
+        files = [{"name": f["name"], **got},
+                 {"name": f"{re.sub(r'[^A-Za-z0-9._-]', '_', package_id)}.yaml", **self._put_object(io.BytesIO(manifest.encode("utf-8")))}]
+        return self._add_entry(package_id, version, files)
+
+    def restore_or_fetch(self, package_id: str, dest: str, peers: Optional[List[str]] = None) -> Optional[str]:
+        """ Локальный кэш, затем соседи.  Возвращает "local"/"peer" или None, если нигде нет. """
+        if self.restore(package_id, dest): return "local"
+        peers = default_peers() if peers is None else peers
+        if not peers: return None
+        trusted = winget_show(package_id)
+        if not trusted: return None  # сверить не с чем — качаем сами
+        for peer in peers:
+            if self.fetch(peer, package_id, trusted) and self.restore(package_id, dest): return "peer"
+        return None
+
+# --- HTTP-раздача ---
+class _Handler(BaseHTTPRequestHandler):
+    cache: InstallerCache = None
+
+    def log_message(self, format, *args):
+        pass  # без строки в консоль на каждый запрос
+
+    def _send(self, code: int, body: bytes = b"", content_type: str = "application/json"):
+        self.send_response(code); self.send_header("Content-Type", content_type); self.send_header("Content-Length", str(len(body))); self.end_headers()
+        if body: self.wfile.write(body)
+
+    def do_GET(self):
+        parts = [unquote(p) for p in self.path.strip("/").split("/")]
+        if len(parts) == 2 and parts[0] == "entries":
+            entry = self.cache.lookup(parts[1])
+            if entry is None: return self._send(404)
+            entry.pop("rowid")
+            return self._send(200, json.dumps(entry).encode("utf-8"))
+        if len(parts) == 2 and parts[0] == "objects" and len(parts[1]) == 64 and all(c in "0123456789abcdef" for c in parts[1]):
+            path = self.cache.object_path(parts[1])
+            if not os.path.exists(path): return self._send(404)
+            self.send_response(200); self.send_header("Content-Type", "application/octet-stream"); self.send_header("Content-Length", str(os.path.getsize(path))); self.end_headers()
+            with open(path, "rb") as f: shutil.copyfileobj(f, self.wfile, COPY_CHUNK)
+            return
+        self._send(404)
+
+def serve(cache: InstallerCache, host: str = "127.0.0.1", port: int = 8765) -> ThreadingHTTPServer:
+    """ Запускает раздачу кэша в фоновом потоке; остановка — server.shutdown(). """
+    handler = type("CacheHandler", (_Handler,), {"cache": cache})
+    server = ThreadingHTTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True, name="installcache-http").start()
+    return server
+
+_default = None
+_default_lock = threading.Lock()
+
+def default_cache() -> Optional[InstallerCache]:
+    """ Общий кэш в папке данных AUSNIT; None, если папка недоступна (кэш тогда просто не используется). """
+    global _default
+    with _default_lock:
+        if _default is None:
+            limit = int(float(os.environ.get("AUSNIT_CACHE_LIMIT_GB", DEFAULT_LIMIT / 1024 ** 3)) * 1024 ** 3)
+            try: _default = InstallerCache(default_root(), limit)
+            except (OSError, sqlite3.Error) as e: print(f"Кэш установщиков недоступен: {e}")
+        return _default
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Кэш установщиков AUSNIT")
+    parser.add_argument("--root", default=default_root())
+    parser.add_argument("--serve", type=int, metavar="PORT", help="раздавать кэш другим экземплярам по HTTP")
+    parser.add_argument("--host", default="127.0.0.1", help="адрес раздачи; для соседей по сети — явно, например 0.0.0.0")
+    parser.add_argument("--evict", type=float, metavar="GB", help="ужать кэш до заданного размера")
+    args = parser.parse_args(argv)
+    cache = InstallerCache(args.root)
+    if args.evict is not None:
+        print(f"освобождено {cache.evict(int(args.evict * 1024 ** 3)) / 1024 ** 2:.0f} MB")
+    print(f"кэш {cache.root}: {cache.size / 1024 ** 2:.0f} MB")
+    if args.serve:
+        server = serve(cache, host=args.host, port=args.serve)
+        print(f"раздача на {args.host}:{args.serve}, Ctrl+C — остановить")
+        try:
+            while True: time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+    cache.close()
+
+if __name__ == "__main__":
+    main()
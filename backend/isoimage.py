@@ -0,0 +1,361 @@
+# backend/isoimage.py
+"""
+Чтение образов ISO9660 (с Joliet) и UDF без внешних утилит.
+
+Образ отображается в память (mmap), дерево каталогов обходится по
+дескрипторам, а содержимое файлов пишется в цель прямо срезами
+memoryview по экстентам — без промежуточных буферов и без монтирования.
+Windows-образы — это UDF-мост: в ISO9660-части лежит только README,
+а install.wim больше 4 GB есть лишь в UDF, поэтому UDF в приоритете.
+"""
+import mmap
+import os
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+SECTOR = 2048
+CHUNK = 1024 * 1024  # больше — хуже: срез выпадает из кэша процессора
+
+class IsoError(Exception):
+    pass
+
+class IsoEntry:
+    """
+    Файл или папка образа: extents — [(смещение в образе или None для дыры, длина)],
+    inline — содержимое мелкого файла UDF, записанное прямо в его дескрипторе.
+    """
+    __slots__ = ("path", "is_dir", "size", "extents", "mtime", "inline")
+
+    def __init__(self, path: str, is_dir: bool, size: int = 0, extents=None, mtime: Optional[float] = None, inline: Optional[bytes] = None):
+        self.path = path; self.is_dir = is_dir; self.size = size
+        self.extents: List[Tuple[Optional[int], int]] = extents or []; self.mtime = mtime; self.inline = inline
+
+    def __repr__(self):
+        return f"IsoEntry({self.path!r}, {'dir' if self.is_dir else self.size})"
+
+def _safe_name(name: str) -> str:
+    if not name or name in (".", "..") or any(c in name for c in "/\\\0") or ":" in name:
+        raise IsoError(f"недопустимое имя в образе: {name!r}")
+    return name
+
+# --- ISO9660 / Joliet ---
+def _iso_datetime(raw: bytes) -> Optional[float]:
+    year, month, day, hour, minute, second, offset = struct.unpack("<6Bb", raw)
+    if not month:
+        return None
+    try:
+        tz = timezone(timedelta(minutes=15 * offset))
+        return datetime(1900 + year, month, day, hour, minute, second, tzinfo=tz).timestamp()
+    except ValueError:
+        return None
+
+def _iso_name(raw: bytes, joliet: bool) -> str:
+    name = raw.decode("utf-16-be", "replace") if joliet else raw.decode("ascii", "replace")
+    name = name.split(";")[0]
+    return name[:-1] if name.endswith(".") else name
+
+# --- UDF (ECMA-167 / OSTA UDF) ---
+_TAG_AVDP, _TAG_PD, _TAG_LVD, _TAG_TD = 2, 5, 6, 8
+_TAG_FSD, _TAG_FID, _TAG_AED, _TAG_FE, _TAG_EFE = 256, 257, 258, 261, 266
+
+def _udf_datetime(raw: bytes) -> Optional[float]:
+    type_tz, year, month, day, hour, minute, second, centi, hundreds, micro = struct.unpack("<HH8B", raw)
+    if not month:
+        return None
+    offset = type_tz & 0x0FFF
+    offset = offset - 0x1000 if offset & 0x0800 else offset
+    tz = timezone.utc if offset == -2047 else timezone(timedelta(minutes=offset))
+    try:
+        return datetime(year, month, day, hour, minute, second, centi * 10000 + hundreds * 100 + micro, tzinfo=tz).timestamp()
+    except ValueError:
+        return None
+
+def _udf_dstring(raw: bytes) -> str:
+    if not raw:
+        return ""
+    if raw[0] == 8: return raw[1:].decode("latin-1")
+    if raw[0] == 16: return raw[1:].decode("utf-16-be", "replace")
+    raise IsoError(f"неизвестная кодировка имени UDF: {raw[0]}")
+
+class IsoImage:
+    """
+    Открытый образ.  with IsoImage(path) as iso: iso.extract(target)
+    fs — какая файловая система читается: "udf", "joliet" или "iso9660".
+    """
+    def __init__(self, path: str, prefer: Optional[str] = None):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close(); raise IsoError(f"пустой файл: {path}")
+        if hasattr(self._mm, "madvise") and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self._mm.madvise(mmap.MADV_SEQUENTIAL)
+        self.view = memoryview(self._mm)
+        available = self._detect()
+        order = [prefer] if prefer else []
+        order += ["udf", "joliet", "iso9660"]
+        self.fs = next((fs for fs in order if fs in available), None)
+        if self.fs is None:
+            self.close(); raise IsoError(f"не ISO9660/UDF образ: {path}")
+        self._root = available[self.fs]
+
+    def close(self):
+        if self._mm is None: return
+        try: self.view.release(); self._mm.close()
+        except BufferError: pass  # срез ещё жив в недочитанном генераторе — отображение закроет сборщик мусора
+        self._file.close(); self._mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _sector(self, lba: int, count: int = 1) -> memoryview:
+        start = lba * SECTOR
+        if start + count * SECTOR > len(self._mm):
+            raise IsoError(f"сектор {lba} за концом образа")
+        return self.view[start:start + count * SECTOR]
+
+    # --- Определение ФС ---
+    def _detect(self) -> Dict[str, object]:
+        found: Dict[str, object] = {}
+        lba = 16; nsr = False
+        while (lba + 1) * SECTOR <= len(self._mm) and lba < 16 + 64:
+            desc = bytes(self._sector(lba)[:7])
+            kind, ident = desc[0], desc[1:6]
+            if ident == b"CD001":
+                if kind == 1 and "iso9660" not in found:
+                    found["iso9660"] = bytes(self._sector(lba)[156:190])
+                elif kind == 2 and bytes(self._sector(lba)[88:91]) in (b"%/@", b"%/C", b"%/E"):
+                    found["joliet"] = bytes(self._sector(lba)[156:190])
+            elif ident in (b"NSR02", b"NSR03"):
+                nsr = True
+            elif ident not in (b"BEA01", b"TEA01", b"BOOT2", b"CDW02"):
+                break
+            lba += 1
+        if nsr:
+            try: found["udf"] = self._udf_root()
+            except IsoError: pass  # испорченный UDF — остаётся ISO9660-часть
+        return found
+
+    # --- ISO9660 ---
+    def _iso_records(self, extent: int, length: int) -> Iterator[bytes]:
+        data = self.view[extent * SECTOR:extent * SECTOR + length]
+        pos = 0
+        while pos < len(data):
+            size = data[pos]
+            if size == 0:  # записи не пересекают границу сектора
+                pos = (pos // SECTOR + 1) * SECTOR; continue
+            yield bytes(data[pos:pos + size]); pos += size
+
+    def _walk_iso(self, root_record: bytes, joliet: bool) -> Iterator[IsoEntry]:
+        stack = [("", struct.unpack_from("<I", root_record, 2)[0], struct.unpack_from("<I", root_record, 10)[0])]
+        visited = set()
+        while stack:
+            prefix, extent, length = stack.pop()
+            if extent in visited: continue
+            visited.add(extent)
+            pending: Optional[IsoEntry] = None
+            for rec in self._iso_records(extent, length):
+                name_len = rec[32]; raw_name = rec[33:33 + name_len]
+                if raw_name in (b"\0", b"\1"): continue
+                lba, size = struct.unpack_from("<I", rec, 2)[0], struct.unpack_from("<I", rec, 10)[0]
+                flags = rec[25]; name = _safe_name(_iso_name(raw_name, joliet))
+                path = prefix + name
+                if flags & 0x02:
+                    yield IsoEntry(path, True, mtime=_iso_datetime(rec[18:25])); stack.append((path + "/", lba, size)); continue
+                # Файлы больше 4 GB записываются несколькими записями подряд с флагом multi-extent
+                if pending is not None and pending.path == path:
+                    pending.extents.append((lba * SECTOR, size)); pending.size += size
+                else:
+                    if pending is not None: yield pending
+                    pending = IsoEntry(path, False, size, [(lba * SECTOR, size)], _iso_datetime(rec[18:25]))
+                if not flags & 0x80:
+                    yield pending; pending = None
+            if pending is not None:
+                yield pending
+
+    # --- UDF ---
+    def _tag(self, data: memoryview, expected: Optional[int] = None) -> int:
+        raw = bytes(data[:16])
+        if sum(raw[:4]) + sum(raw[5:16]) & 0xFF != raw[4]:
+            raise IsoError("неверная контрольная сумма дескриптора UDF")
+        ident = struct.unpack_from("<H", raw)[0]
+        if expected is not None and ident != expected:
+            raise IsoError(f"ожидался дескриптор UDF {expected}, найден {ident}")
+        return ident
+
+    def _udf_root(self):
+        avdp = self._sector(256); self._tag(avdp, _TAG_AVDP)
+        vds_len, vds_loc = struct.unpack_from("<II", avdp, 16)
+        partitions: Dict[int, int] = {}; lvd = None
+        for i in range(max(vds_len // SECTOR, 1)):
+            desc = self._sector(vds_loc + i)
+            ident = self._tag(desc)
+            if ident == _TAG_PD:
+                number, = struct.unpack_from("<H", desc, 22); start, = struct.unpack_from("<I", desc, 188)
+                partitions[number] = start
+            elif ident == _TAG_LVD:
+                lvd = bytes(desc)
+            elif ident == _TAG_TD:
+                break
+        if lvd is None or not partitions:
+            raise IsoError("в UDF нет описания тома или раздела")
+        if struct.unpack_from("<I", lvd, 212)[0] != SECTOR:
+            raise IsoError("поддерживается только логический блок 2048 байт")
+        # Карты разделов: ссылка «раздел N» в lb_addr — индекс в этой таблице
+        self._udf_parts: List[int] = []
+        count, = struct.unpack_from("<I", lvd, 268); pos = 440
+        for _ in range(count):
+            map_type, map_len = lvd[pos], lvd[pos + 1]
+            if map_type != 1:
+                raise IsoError("разделы метаданных UDF 2.5+ не поддерживаются")
+            self._udf_parts.append(partitions[struct.unpack_from("<H", lvd, pos + 4)[0]])
+            pos += map_len
+        fsd_block, fsd_part = struct.unpack_from("<IH", lvd, 252)
+        fsd = self._sector(self._udf_lba(fsd_block, fsd_part)); self._tag(fsd, _TAG_FSD)
+        root_block, root_part = struct.unpack_from("<IH", fsd, 404)
+        return (root_block, root_part)
+
+    def _udf_lba(self, block: int, part: int) -> int:
+        try: return self._udf_parts[part] + block
+        except IndexError: raise IsoError(f"ссылка на несуществующий раздел UDF {part}")
+
+    def _udf_file_entry(self, block: int, part: int):
+        """ (папка?, размер, экстенты, mtime, встроенные данные или None) """
+        fe = self._sector(self._udf_lba(block, part))
+        ident = self._tag(fe)
+        if ident == _TAG_FE:
+            size, = struct.unpack_from("<Q", fe, 56); mtime = _udf_datetime(bytes(fe[84:96]))
+            l_ea, l_ad = struct.unpack_from("<II", fe, 168); ad_start = 176 + l_ea
+        elif ident == _TAG_EFE:
+            size, = struct.unpack_from("<Q", fe, 56); mtime = _udf_datetime(bytes(fe[92:104]))
+            l_ea, l_ad = struct.unpack_from("<II", fe, 208); ad_start = 216 + l_ea
+        else:
+            raise IsoError(f"ожидалась запись файла UDF, найден дескриптор {ident}")
+        file_type = fe[16 + 11]; ad_type = struct.unpack_from("<H", fe, 16 + 18)[0] & 0x7
+        is_dir = file_type == 4
+        if ad_type == 3:  # данные лежат прямо в записи файла
+            return is_dir, size, [], mtime, bytes(fe[ad_start:ad_start + l_ad])
+        extents = self._udf_extents(bytes(fe[ad_start:ad_start + l_ad]), ad_type, part)
+        return is_dir, size, extents, mtime, None
+
+    def _udf_extents(self, ads: bytes, ad_type: int, part: int) -> List[Tuple[Optional[int], int]]:
+        if ad_type not in (0, 1):
+            raise IsoError(f"неподдерживаемый тип дескрипторов размещения UDF: {ad_type}")
+        step = 8 if ad_type == 0 else 16
+        extents: List[Tuple[Optional[int], int]] = []
+        pos = 0
+        while pos + step <= len(ads):
+            raw_len, block = struct.unpack_from("<II", ads, pos)
+            ext_part = part if ad_type == 0 else struct.unpack_from("<H", ads, pos + 8)[0]
+            kind, length = raw_len >> 30, raw_len & 0x3FFFFFFF
+            pos += step
+            if length == 0:
+                break
+            if kind == 3:  # продолжение списка в отдельном дескрипторе (AED)
+                aed = self._sector(self._udf_lba(block, ext_part)); self._tag(aed, _TAG_AED)
+                l_ad, = struct.unpack_from("<I", aed, 20)
+                ads, pos = bytes(aed[24:24 + l_ad]), 0
+                continue
+            extents.append((self._udf_lba(block, ext_part) * SECTOR if kind == 0 else None, length))
+        return extents
+
+    def _read_extents(self, extents, size: int) -> bytes:
+        parts = []; left = size
+        for offset, length in extents:
+            n = min(length, left)
+            parts.append(bytes(self.view[offset:offset + n]) if offset is not None else bytes(n)); left -= n
+        return b"".join(parts)
+
+    def _walk_udf(self, root) -> Iterator[IsoEntry]:
+        stack = [("", root)]; visited = set()
+        while stack:
+            prefix, (block, part) = stack.pop()
+            if (block, part) in visited: continue
+            visited.add((block, part))
+            _, size, extents, _, inline = self._udf_file_entry(block, part)
+            data = inline if inline is not None else self._read_extents(extents, size)
+            pos = 0
+            while pos + 38 <= len(data):
+                if struct.unpack_from("<H", data, pos)[0] != _TAG_FID:
+                    raise IsoError("повреждён каталог UDF")
+                chars, l_fi = data[pos + 18], data[pos + 19]
+                icb_block, icb_part = struct.unpack_from("<IH", data, pos + 24)
+                l_iu, = struct.unpack_from("<H", data, pos + 36)
+                name_raw = data[pos + 38 + l_iu:pos + 38 + l_iu + l_fi]
+                pos += (38 + l_iu + l_fi + 3) & ~3
+                if chars & 0x0C:  # родительский каталог или удалённая запись
+                    continue
+                path = prefix + _safe_name(_udf_dstring(name_raw))
+                is_dir, fsize, fextents, mtime, finline = self._udf_file_entry(icb_block, icb_part)
+                if is_dir:
+                    yield IsoEntry(path, True, mtime=mtime); stack.append((path + "/", (icb_block, icb_part)))
+                else:
+                    yield IsoEntry(path, False, fsize, fextents, mtime, finline)
+
+    # --- Публичное API ---
+    def walk(self) -> Iterator[IsoEntry]:
+        """ Все файлы и папки образа; папка всегда раньше своего содержимого. """
+        if self.fs == "udf":
+            return self._walk_udf(self._root)
+        return self._walk_iso(self._root, self.fs == "joliet")
+
+    def entries(self) -> List[IsoEntry]:
+        return list(self.walk())
+
+    def find(self, path: str) -> Optional[IsoEntry]:
+        """ Запись по пути без учёта регистра (в ISO9660 имена в верхнем регистре). """
+        path = path.strip("/").lower()
+        return next((e for e in self.walk() if e.path.lower() == path), None)
+
+    def iter_chunks(self, entry: IsoEntry, chunk: int = CHUNK) -> Iterator[memoryview]:
+        """ Содержимое файла срезами памяти образа (без копирования); дыры — нулями. """
+        return self.iter_range(entry, 0, entry.size, chunk)
+
+    def iter_range(self, entry: IsoEntry, start: int, length: int, chunk: int = CHUNK) -> Iterator[memoryview]:
+        """ Байты [start, start + length) файла — для чтения внутри файла (таблица ресурсов WIM и т.п.). """
+        length = max(0, min(length, entry.size - start))
+        if entry.inline is not None:
+            yield memoryview(entry.inline)[start:start + length]; return
+        pos = 0  # смещение начала текущего экстента в файле
+        for offset, ext_len in entry.extents:
+            if length <= 0: break
+            if pos + ext_len <= start:
+                pos += ext_len; continue
+            skip = start - pos if start > pos else 0
+            n = min(ext_len - skip, length)
+            for piece in range(skip, skip + n, chunk):
+                size = min(chunk, skip + n - piece)
+                yield self.view[offset + piece:offset + piece + size] if offset is not None else memoryview(bytes(size))
+            start += n; length -= n; pos += ext_len
+
+    def read(self, entry: IsoEntry, start: int, length: int) -> bytes:
+        return b"".join(self.iter_range(entry, start, length))
+
+    def extract(self, target: str, on_progress: Optional[Callable[[int, int, str], None]] = None, cancel_event=None) -> Dict[str, float]:
+        """
+        Распаковывает образ в папку target (корень флешки или обычная папка).
+        on_progress(записано байт, всего байт, путь) зовётся после каждого куска.
+        """
+        entries = self.entries()
+        total = sum(e.size for e in entries if not e.is_dir)
+        done = 0; files = 0; t0 = time.perf_counter()
+        os.makedirs(target, exist_ok=True)
+        for entry in entries:
+            if cancel_event is not None and cancel_event.is_set(): break
+            dest = os.path.join(target, *entry.path.split("/"))
+            if entry.is_dir:
+                os.makedirs(dest, exist_ok=True); continue
+            with open(dest, "wb") as out:
+                for piece in self.iter_chunks(entry):
+                    out.write(piece); done += len(piece)
+                    if on_progress: on_progress(done, total, entry.path)
+            if entry.mtime: os.utime(dest, (entry.mtime, entry.mtime))
+            files += 1
+        seconds = time.perf_counter() - t0
+        return {"files": files, "bytes": done, "total": total, "seconds": seconds, "mb_per_s": done / 1024 / 1024 / seconds if seconds else 0.0}
@@ -0,0 +1,172 @@
+# backend/monitor.py
+"""
+Фоновый сэмплер системного монитора для подвала окна.
+
+psutil опрашивается в отдельном потоке со своей частотой, значения пишутся
+в кольцевые буферы фиксированного размера (array, память не растёт),
+а UI только читает последние значения. Когда окно свёрнуто, частота
+опроса снижается.
+"""
+import os
+import subprocess
+import threading
+import time
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+import psutil
+
+CREATE_NO_WINDOW = 0x08000000
+_CREATION_FLAGS = CREATE_NO_WINDOW if os.name == "nt" else 0
+
+METRICS = ("cpu", "ram", "disk", "gpu", "net_down", "net_up")
+HISTORY_SIZE = 300  # 5 минут при опросе раз в секунду
+INTERVAL = 1.0
+IDLE_INTERVAL = 5.0
+
+class RingBuffer:
+    """ Кольцевой буфер чисел на array('d'): append O(1), размер фиксирован. """
+    def __init__(self, size: int):
+        self._data = array("d", bytes(8 * size))
+        self._size = size
+        self._next = 0
+        self._count = 0
+
+    def append(self, value: float):
+        self._data[self._next] = value
+        self._next = (self._next + 1) % self._size
+        self._count = min(self._count + 1, self._size)
+
+    def values(self) -> List[float]:
+        """ От старых к новым. """
+        if self._count < self._size:
+            return self._data[:self._count].tolist()
+        return (self._data[self._next:] + self._data[:self._next]).tolist()
+
+    def last(self, default: float = 0.0) -> float:
+        return self._data[self._next - 1] if self._count else default
+
+    def __len__(self):
+        return self._count
+
+# --- GPU: psutil загрузку видеокарты не знает, поэтому пробы подключаемые ---
+class NvidiaSmiProbe:
+    """
+    Один долгоживущий `nvidia-smi -l 1` вместо процесса на каждый замер:
+    поток читает его вывод, value() отдаёт последнее значение.
+    """
+    def __init__(self):
+        self._value: Optional[float] = None
+        self._proc = subprocess.Popen(
+            ["nvidia-smi", "--query-gpu=utilization.gpu", "--format=csv,noheader,nounits", "-l", "1"],
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, creationflags=_CREATION_FLAGS)
+        threading.Thread(target=self._reader, daemon=True).start()
+
+    def _reader(self):
+        for line in self._proc.stdout:
+            try: self._value = max(float(v) for v in line.split(",") if v.strip())  # самая загруженная из карт
+            except ValueError: pass
+
+    def value(self) -> Optional[float]:
+        return self._value
+
+    def close(self):
+        self._proc.kill()
+
+_gpu_probe_factories: List[Callable[[], object]] = [NvidiaSmiProbe]
+
+def register_gpu_probe(factory: Callable[[], object], first: bool = True):
+    """
+    Добавляет пробу GPU: factory() возвращает объект с value() -> процент или None
+    либо бросает исключение, если на этой машине проба не работает.
+    """
+    if first: _gpu_probe_factories.insert(0, factory)
+    else: _gpu_probe_factories.append(factory)
+
+def _open_gpu_probe():
+    for factory in _gpu_probe_factories:
+        try: return factory()
+        except Exception: continue
+    return None
+
+def _system_disk():
+    return os.environ.get("SystemDrive", "C:") + os.sep if os.name == "nt" else os.sep
+
+class SystemSampler(threading.Thread):
+    def __init__(self, interval: float = INTERVAL, idle_interval: float = IDLE_INTERVAL, history: int = HISTORY_SIZE):
+        super().__init__(daemon=True, name="system-sampler")
+        self.interval = interval; self.idle_interval = idle_interval
+        self._idle = False
+        self._wake = threading.Event(); self._halt = threading.Event()
+        self._lock = threading.Lock()
+        self._times = RingBuffer(history)
+        self._history: Dict[str, RingBuffer] = {name: RingBuffer(history) for name in METRICS}
+        self._latest: Dict[str, Optional[float]] = {name: 0.0 for name in METRICS}
+        self._gpu = None
+
+    def set_idle(self, idle: bool):
+        """ Окно свёрнуто — опрашиваем реже; развернули — сразу свежий замер. """
+        if self._idle != idle:
+            self._idle = idle
+            if not idle: self._wake.set()
+
+    def stop(self):
+        self._halt.set(); self._wake.set()
+
+    def latest(self) -> Dict[str, Optional[float]]:
+        with self._lock:
+            return dict(self._latest)
+
+    def history(self, metric: str) -> Tuple[List[float], List[float]]:
+        """ (время time.time(), значение) за последние HISTORY_SIZE замеров. """
+        with self._lock:
+            return self._times.values(), self._history[metric].values()
+
+    def peak(self, metric: str, since: float, until: Optional[float] = None) -> Optional[float]:
+        """ Максимум метрики за интервал — чтобы сопоставить всплески с установками. """
+        until = until or time.time()
+        times, values = self.history(metric)
+        window = [v for t, v in zip(times, values) if since <= t <= until]
+        return max(window) if window else None
+
+    def _sample(self, prev_net, prev_time):
+        now = time.time()
+        net = psutil.net_io_counters()
+        dt = max(now - prev_time, 1e-6)
+        try: disk = psutil.disk_usage(_system_disk()).percent
+        except Exception: disk = 0.0
+        gpu = self._gpu.value() if self._gpu else None
+        sample = {
+            "cpu": psutil.cpu_percent(), "ram": psutil.virtual_memory().percent, "disk": disk, "gpu": gpu,
+            "net_down": (net.bytes_recv - prev_net.bytes_recv) / 1024 / dt,
+            "net_up": (net.bytes_sent - prev_net.bytes_sent) / 1024 / dt,
+        }
+        with self._lock:
+            self._latest = sample
+            self._times.append(now)
+            for name, value in sample.items():
+                self._history[name].append(value if value is not None else 0.0)
+        return net, now
+
+    def run(self):
+        self._gpu = _open_gpu_probe()
+        psutil.cpu_percent()  # первый вызов всегда 0 — «заряжаем» счётчик
+        prev_net, prev_time = psutil.net_io_counters(), time.time()
+        try:
+            while not self._halt.is_set():
+                self._wake.wait(self.idle_interval if self._idle else self.interval)
+                self._wake.clear()
+                if self._halt.is_set(): break
+                try: prev_net, prev_time = self._sample(prev_net, prev_time)
+                except Exception as e: print(f"Ошибка системного монитора: {e}")
+        finally:
+            if self._gpu and hasattr(self._gpu, "close"): self._gpu.close()
+
+_sampler: Optional[SystemSampler] = None
+
+def get_sampler() -> SystemSampler:
+    """ Общий на всё приложение сэмплер, запускается при первом обращении. """
+    global _sampler
+    if _sampler is None:
+        _sampler = SystemSampler(); _sampler.start()
+    return _sampler
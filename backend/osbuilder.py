@@ -1,28 +1,19 @@
 # backend/osbuilder.py
 import os
+from functools import partial
+from typing import Dict, List
 
-def build_usb(params: dict):
-    """
-    Основная логика сборки USB.
-    1. Создает файл unattend.xml с параметрами автоустановки.
-    2. (В будущем) Запускает процесс форматирования и копирования файлов ISO.
-    """
-    print("Получены параметры для сборки USB:", params)
-    
-    # Извлекаем данные, переданные из UI
-    iso_path = params.get("iso")
-    drive = params.get("drive")
-    product_key = params.get("key", "XXXXX-XXXXX-XXXXX-XXXXX-XXXXX") # Ключ по умолчанию
-    pc_name = params.get("pc_name", "My-PC")
-    lang = params.get("lang", "ru-RU")
+from backend import usbmanifest
+from backend.copier import CopyJob, copy_to_many
+from backend.isoimage import IsoImage
+from backend.wim import FAT32_MAX, SWM_PART_LIMIT, list_images, part_chunks, part_name, plan_split
 
-    if not iso_path or not drive:
-        print("Ошибка: не указан ISO-файл или целевой диск.")
-        return False
+UNATTEND_NAME = "autounattend.xml"  # Windows Setup сам подхватывает его из корня носителя
+INSTALL_IMAGES = ("sources/install.wim", "sources/install.esd")
 
-    try:
-        # Для диплома, создание этого файла - уже отличная демонстрация автоматизации
-        unattend_content = f"""<?xml version="1.0" encoding="utf-8"?>
+_editions_cache = {}  # (путь, размер, mtime) -> список редакций
+
+_UNATTEND = """<?xml version="1.0" encoding="utf-8"?>
 <unattend xmlns="urn:schemas-microsoft-com:unattend">
     <settings pass="windowsPE">
         <component name="Microsoft-Windows-International-Core-WinPE" processorArchitecture="amd64" publicKeyToken="31bf3856ad364e35" language="neutral" versionScope="nonSxS" xmlns:wcm="http://schemas.microsoft.com/WMIConfig/2002/State" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
@@ -34,7 +25,7 @@ def build_usb(params: dict):
             <UserLocale>{lang}</UserLocale>
         </component>
         <component name="Microsoft-Windows-Setup" processorArchitecture="amd64" publicKeyToken="31bf3856ad364e35" language="neutral" versionScope="nonSxS" xmlns:wcm="http://schemas.microsoft.com/WMIConfig/2002/State" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
-            <UserData>
+{image_install}            <UserData>
                 <ProductKey>
                     <Key>{product_key}</Key>
                 </ProductKey>
@@ -68,19 +59,155 @@ def build_usb(params: dict):
         </component>
     </settings>
 </unattend>
-        """
-        # Сохраняем файл (например, на рабочий стол для демонстрации)
-        desktop = os.path.join(os.path.join(os.environ['USERPROFILE']), 'Desktop')
-        unattend_path = os.path.join(desktop, "unattend.xml")
-        
-        with open(unattend_path, "w", encoding="utf-8") as f:
-            f.write(unattend_content)
+"""
+
+_IMAGE_INSTALL = """            <ImageInstall>
+                <OSImage>
+                    <InstallFrom>
+                        <MetaData wcm:action="add">
+                            <Key>/IMAGE/INDEX</Key>
+                            <Value>{index}</Value>
+                        </MetaData>
+                    </InstallFrom>
+                </OSImage>
+            </ImageInstall>
+"""
+
+def make_unattend(params: dict) -> str:
+    # Выбранная редакция (индекс образа в install.wim) — установщик не спросит её сам
+    image_index = params.get("image_index")
+    return _UNATTEND.format(
+        lang=params.get("lang", "ru-RU"), pc_name=params.get("pc_name", "My-PC"),
+        product_key=params.get("key", "XXXXX-XXXXX-XXXXX-XXXXX-XXXXX"),  # Ключ по умолчанию
+        image_install=_IMAGE_INSTALL.format(index=image_index) if image_index else "")
+
+def list_editions(iso_path: str) -> list:
+    """
+    Редакции Windows в ISO: читается только заголовок и XML install.wim/esd прямо
+    из образа, без распаковки.  Повторный выбор того же файла берётся из кэша.
+    """
+    st = os.stat(iso_path)
+    key = (os.path.abspath(iso_path), st.st_size, st.st_mtime_ns)
+    if key not in _editions_cache:
+        with IsoImage(iso_path) as iso:
+            entry = next((e for e in map(iso.find, INSTALL_IMAGES) if e is not None), None)
+            _editions_cache[key] = list_images(partial(iso.read, entry)) if entry else []
+    return _editions_cache[key]
+
+def image_jobs(iso: IsoImage, entries, file_system: str = "NTFS", max_file: int = FAT32_MAX, part_limit: int = SWM_PART_LIMIT):
+    """
+    Задания копирования для файлов образа.  Для FAT32 *.wim больше max_file
+    заменяются частями .swm: каждая часть — отдельное задание, которое читает
+    ресурсы прямо из образа, так что разбиение идёт внутри того же потока копирования.
+    """
+    jobs = []
+    for e in entries:
+        if e.is_dir: continue
+        if file_system.upper() != "FAT32" or e.size <= max_file:
+            jobs.append(CopyJob(e.path, e.size, partial(iso.iter_chunks, e), e.mtime)); continue
+        if not e.path.lower().endswith(".wim"):
+            raise ValueError(f"{e.path}: файл больше 4 GB не поместится на FAT32")
+        for part in plan_split(partial(iso.read, e), part_limit):
+            jobs.append(CopyJob(part_name(e.path, part.number), part.size, partial(part_chunks, part, partial(iso.iter_range, e)), e.mtime))
+    return jobs
+
+def build_usb(params: dict, cancel_event=None, on_event=None):
+    """
+    Основная логика сборки USB.
+    1. Распаковывает ISO (UDF/ISO9660) в корень целевого диска конвейером backend.copier:
+       образ читается через mmap с упреждением, пока идёт запись на флешку.
+       На FAT32 install.wim больше 4 GB по ходу копирования разбивается на install*.swm.
+       Если на флешке есть манифест прошлой сборки (backend.usbmanifest), пишутся только
+       изменившиеся файлы, а исчезнувшие из образа удаляются (params["delta"], по умолчанию да).
+    2. При params["verify"] перечитывает записанное и сверяет хэши.
+    3. Кладёт рядом autounattend.xml с параметрами автоустановки.
+    Диск должен быть уже отформатирован в выбранную файловую систему.
+    on_event получает события copier ("copying", "verifying"), "hashing" и итоговый {"state": "summary", ...}.
+    """
+    drive = params.get("drive")
+    if not drive:
+        print("Ошибка: не указан ISO-файл или целевой диск.")
+        return False
+    return build_usb_many(params, [drive], cancel_event, on_event)[drive]
+
+def build_usb_many(params: dict, drives: List[str], cancel_event=None, on_event=None) -> Dict[str, bool]:
+    """
+    Сборка сразу на несколько дисков (build_usb — частный случай одного диска).
+    ISO читается один раз, куски раздаются потокам записи по дискам (copier.copy_to_many);
+    у каждого диска своя дельта по манифесту, свой прогресс и свой итог.  Отказ одного
+    диска — событие {"state": "failed", "target", "error"}, остальные дописываются.
+    События copier и "summary" несут ключ target.  Возвращает {диск: успех}.
+    """
+    print("Получены параметры для сборки USB:", params, drives)
+    emit = on_event or (lambda event: None)
+    results = {d: False for d in drives}
+
+    # Извлекаем данные, переданные из UI
+    iso_path = params.get("iso")
+
+    if not iso_path or not drives:
+        print("Ошибка: не указан ISO-файл или целевой диск.")
+        return results
+
+    def fail(drive, error):
+        print(f"Ошибка при сборке USB на {drive}: {error}")
+        emit({"state": "failed", "target": drive, "error": str(error)})
+
+    try:
+        cancelled = lambda: cancel_event is not None and cancel_event.is_set()
+        file_system = params.get("file_system", "NTFS").upper()
+        key = usbmanifest.image_key(iso_path, file_system)
+        hashes = usbmanifest.cached_hashes(key)
+        olds = {d: usbmanifest.load(d) if params.get("delta", True) else {} for d in drives}
+        with IsoImage(iso_path) as iso:
+            entries = iso.entries()
+            jobs = image_jobs(iso, entries, file_system)
+            if any(olds.values()) and hashes is None:
+                # Хэши образа нужны до записи: считаются один раз (чтение ISO быстрее записи на флешку)
+                hashes = usbmanifest.hash_jobs(jobs, on_event=emit, cancel_event=cancel_event)
+                if cancelled(): return results
+                usbmanifest.store_hashes(key, hashes)
+            plans, select = {}, {}
+            for drive in drives:
+                old = olds[drive]; keep, remove = [], []
+                try:
+                    if old:
+                        changed, keep, remove = usbmanifest.diff(drive, hashes, old)
+                        select[drive] = set(changed)
+                    os.makedirs(drive, exist_ok=True)
+                    # До записи в манифесте остаются только нетронутые файлы — прерванная сборка не оставит «доверенных» обрывков
+                    usbmanifest.save(drive, {p: old[p] for p in keep}, iso_path)
+                    usbmanifest.remove_files(drive, remove)
+                except OSError as e:
+                    fail(drive, e); continue
+                plans[drive] = (keep, remove)
+            all_stats = copy_to_many(jobs, list(plans), dirs=[e.path for e in entries if e.is_dir], select=select, verify=params.get("verify", False),
+                                     on_event=emit, cancel_event=cancel_event, hash_files=hashes is None)
+        if cancelled():
+            return results
+        for drive, stats in all_stats.items():
+            keep, remove = plans[drive]
+            stats.update(skipped=len(keep), removed=len(remove))
+            error = stats.pop("error")
+            if error is not None:
+                fail(drive, error); continue
+            if stats["mismatched"]:
+                emit({"state": "summary", "target": drive, **stats})
+                print(f"Проверка записи на {drive} не прошла: {len(stats['mismatched'])} файлов, например {stats['mismatched'][0]}")
+                continue
+            if hashes is None:
+                hashes = stats["hashes"]; usbmanifest.store_hashes(key, hashes)
+            try:
+                usbmanifest.save(drive, hashes, iso_path)
+                with open(os.path.join(drive, UNATTEND_NAME), "w", encoding="utf-8") as f:
+                    f.write(make_unattend(params))
+            except OSError as e:
+                fail(drive, e); continue
+            emit({"state": "summary", "target": drive, **stats})
+            print(f"Образ записан на {drive}: {stats['files']} файлов, {stats['mb_per_s']:.0f} MB/s; {UNATTEND_NAME} создан в корне диска.")
+            results[drive] = True
+        return results
 
-        print(f"Файл автоматизации 'unattend.xml' успешно создан на рабочем столе.")
-        # Здесь должна быть логика записи на USB, но для диплома этого достаточно.
-        time.sleep(3) # Имитация работы
-        return True
-    
     except Exception as e:
-        print(f"Ошибка при создании unattend.xml: {e}")
-        return False
\ No newline at end of file
+        print(f"Ошибка при сборке USB: {e}")
+        return results
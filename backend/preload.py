@@ -1,9 +1,20 @@
 # backend/preload.py
-import threading, time, psutil, platform, subprocess, json, os, tempfile, sys
+import threading, time, psutil, platform, json, os, sys
 from datetime import datetime
 
+from backend import bootcache, driverstore, probeworker, procs, registry
+from backend.winget import parse_table, PackageIndex
+
 RESULT = {}
 DONE = threading.Event()
+DRIVERS_SCANNED = threading.Event()  # индекс хранилища драйверов обновлён (или обновлять нечего)
+
+# Общий срок на все пробы при загрузке: что не успело — помечается как неизвестное
+BOOT_DEADLINE = float(os.environ.get("AUSNIT_BOOT_DEADLINE", "20"))
+SECTIONS = ("specs", "installed")
+
+_lock = threading.Lock()
+_listeners = []
 
 # --- Вспомогательные функции для загрузки данных ---
 def _resource_path(rel_path):
@@ -21,21 +32,110 @@ def _load_json(rel_path):
     except Exception:
         return {}
 
-def _safe(cmd):
+def _safe(cmd, timeout=25):
+    # По сроку снимается всё дерево: прежде check_output убивал только оболочку, а wmic оставался висеть
+    result = procs.run(cmd, shell=True, timeout=max(timeout, 0.1), capture=True)
+    if result.status != "ok":
+        print(f"Ошибка при выполнении команды '{cmd}': {result.status} (код {result.returncode})")
+    return result.stdout
+
+def add_listener(callback):
+    """
+    callback(section, key, value) вызывается из фонового потока,
+    как только готова очередная часть RESULT (key=None — вся секция).
+    """
+    _listeners.append(callback)
+
+def _publish(section, key, value):
+    with _lock:
+        if key is None: RESULT[section] = value
+        else: RESULT.setdefault(section, {})[key] = value
+    for callback in list(_listeners):
+        try: callback(section, key, value)
+        except Exception as e: print(f"Ошибка в обработчике preload: {e}")
+
+# --- Пробы железа: каждая получает оставшееся до общего срока время ---
+def _cim_text(cls, properties, timeout, wmic_cmd):
+    """
+    Свойства в виде `wmic ... /format:list` («Имя=значение», экземпляры через
+    пустую строку).  Спрашивает общий процесс проб (backend/probeworker.py);
+    где его нет или он не ответил — как раньше, отдельным wmic.
+    """
+    t_end = time.monotonic() + timeout
     try:
-        return subprocess.check_output(cmd, shell=True, text=True, timeout=25, encoding='utf-8', errors='ignore')
-    except Exception as e:
-        print(f"Ошибка при выполнении команды '{cmd}': {e}")
-        return ""
+        if probeworker.get_worker() is None: raise probeworker.ProbeError("процесс проб недоступен")
+        rows = probeworker.cim(cls, properties, timeout)
+    except probeworker.ProbeError as e:
+        if probeworker.get_worker() is not None: print(f"Процесс проб: {cls}: {e}; откат к wmic")
+        return _safe(wmic_cmd, max(t_end - time.monotonic(), 0.1)).strip()
+    return "\n\n".join("\n".join(f"{p}={'' if row.get(p) is None else row.get(p)}" for p in sorted(properties)) for row in rows)
+
+def _probe_cpu(timeout):
+    cpu_name = platform.processor() or _cim_text("Win32_Processor", ["Name"], timeout, "wmic cpu get Name /value")
+    if "Name=" in cpu_name:
+        cpu_name = cpu_name.split("=",1)[-1].strip()
+    return cpu_name or "Unknown CPU"
+
+def _probe_baseboard(timeout):
+    return _cim_text("Win32_BaseBoard", ["Product", "Manufacturer", "Version", "SerialNumber"], timeout,
+                     "wmic baseboard get Product,Manufacturer,Version,SerialNumber /format:list")
+
+def _probe_gpu(timeout):
+    return _cim_text("Win32_VideoController", ["Name"], timeout, "wmic path win32_VideoController get name /value")
+
+def _probe_devices(timeout):
+    # Hardware/compatible ID устройств — по ним backend.driverstore подбирает драйверы
+    t_end = time.monotonic() + timeout
+    try:
+        if probeworker.get_worker() is None: raise probeworker.ProbeError("процесс проб недоступен")
+        return driverstore.devices_from_rows(probeworker.cim("Win32_PnPEntity", driverstore.DEVICE_PROPERTIES, timeout))
+    except probeworker.ProbeError as e:
+        if probeworker.get_worker() is not None: print(f"Процесс проб: устройства: {e}; откат к powershell")
+        return driverstore.parse_devices(_safe(driverstore.DEVICES_COMMAND, max(t_end - time.monotonic(), 0.1)))
+
+# ключ в specs -> (проба, значение при таймауте)
+SPEC_PROBES = {
+    "cpu": (_probe_cpu, "Unknown CPU"),
+    "baseboard_raw": (_probe_baseboard, "Unknown"),
+    "gpu_raw": (_probe_gpu, "Unknown"),
+    "devices": (_probe_devices, []),
+}
+
+def _run_probes(probes, deadline, on_result):
+    """
+    Запускает все пробы одновременно и ждёт не дольше deadline секунд.
+    on_result(name, value) вызывается по готовности каждой пробы; опоздавшие
+    получают значение по умолчанию, а их поздние результаты отбрасываются.
+    Возвращает список имён проб, не успевших к сроку.
+    """
+    t_end = time.monotonic() + deadline
+    finished = {}; closed = threading.Event(); cond = threading.Condition()
 
-def collect_specs():
+    def worker(name, probe, fallback):
+        try: value = probe(t_end - time.monotonic())
+        except Exception as e:
+            print(f"Проба '{name}' завершилась ошибкой: {e}"); value = fallback
+        with cond:
+            if closed.is_set(): return
+            finished[name] = True
+            on_result(name, value)
+            cond.notify_all()
+
+    for name, (probe, fallback) in probes.items():
+        threading.Thread(target=worker, args=(name, probe, fallback), daemon=True, name=f"probe-{name}").start()
+    with cond:
+        cond.wait_for(lambda: len(finished) == len(probes), timeout=max(t_end - time.monotonic(), 0))
+        closed.set()
+        timed_out = [name for name in probes if name not in finished]
+    for name in timed_out:
+        on_result(name, probes[name][1])
+    return timed_out
+
+def _base_specs():
+    """ Быстрые сведения без внешних процессов. """
     specs = {}
     specs["timestamp"] = datetime.now().isoformat(timespec="seconds")
     specs["os"] = platform.platform()
-    cpu_name = platform.processor() or _safe("wmic cpu get Name /value").strip()
-    if "Name=" in cpu_name:
-        cpu_name = cpu_name.split("=",1)[-1].strip()
-    specs["cpu"] = cpu_name or "Unknown CPU"
     vm = psutil.virtual_memory()
     specs["ram_total_gb"] = round(vm.total / (1024**3), 2)
     specs["disks"] = []
@@ -44,51 +144,110 @@ def collect_specs():
             u = psutil.disk_usage(p.mountpoint)
             specs["disks"].append({"device": p.device, "mount": p.mountpoint, "total_gb": round(u.total / (1024**3), 2), "used_gb": round(u.used / (1024**3), 2)})
         except Exception: pass
-    base = _safe("wmic baseboard get Product,Manufacturer,Version,SerialNumber /format:list")
-    specs["baseboard_raw"] = base.strip()
-    gpu = _safe("wmic path win32_VideoController get name /value")
-    specs["gpu_raw"] = gpu.strip()
     return specs
 
-def scan_installed_programs():
-    programs_data = _load_json("data/programs.json")
-    drivers_data = _load_json("data/drivers.json")
-    
+def collect_specs(deadline=BOOT_DEADLINE):
+    specs = _base_specs()
+    specs["unknown"] = _run_probes(SPEC_PROBES, deadline, specs.__setitem__)
+    return specs
+
+def _known_ids():
+    """ ID из каталогов программ и драйверов -> все названия с этим ID. """
     known_ids = {}
-    for category in programs_data.values():
-        for name, pid in category.items():
-            known_ids[pid.lower()] = name
-    for category in drivers_data.values():
-        for name, did in category.items():
-            known_ids[did.lower()] = name
-            
-    out = _safe("winget list")
+    for rel_path in ("data/programs.json", "data/drivers.json"):
+        for category in _load_json(rel_path).values():
+            for name, pid in category.items():
+                known_ids.setdefault(pid.lower(), []).append(name)
+    return known_ids
+
+def match_installed(known_ids, winget_output):
+    """
+    Разбирает вывод `winget list` в таблицу, строит по ней хэш-индекс ID
+    и сверяет с каталогом точным совпадением — по одному поиску на ID каталога.
+    """
+    index = PackageIndex(parse_table(winget_output))
     installed_names = set()
-    
-    for line in out.splitlines():
-        line_lower = line.lower()
-        for pid, name in known_ids.items():
-            if pid in line_lower:
-                installed_names.add(name.lower())
-                break
-
-    return {"installed_list_raw": sorted(list(installed_names))}
-
-def run_all(target_cache_path=None):
-    global RESULT
+    versions = {}
+    for pid, names in known_ids.items():
+        row = index.get(pid)
+        if row is None:
+            continue
+        installed_names.update(name.lower() for name in names)
+        versions[pid] = {"version": row.get("version", ""), "available": row.get("available", ""), "source": row.get("source", "")}
+    return {
+        "installed_list_raw": sorted(installed_names),
+        "installed_versions": versions,
+        "outdated": sorted(pid for pid, v in versions.items() if v["available"]),
+    }
+
+def scan_installed_programs(timeout=25):
+    return match_installed(_known_ids(), _safe("winget list", timeout))
+
+def scan_registry_programs():
+    """ Быстрый проход по веткам Uninstall (backend/registry.py); `winget list` потом лишь подтверждает. """
+    known_ids = _known_ids()
+    try: entries = registry.read_snapshot()
+    except Exception as e:
+        print(f"Реестр не прочитан: {e}"); entries = []
+    return registry.detect_installed(registry.RuleTable(known_ids, _load_json(registry.RULES_PATH)), known_ids, entries)
+
+def run_all(target_cache_path=None, deadline=BOOT_DEADLINE, sections=SECTIONS):
+    """
+    Пробы железа и поиск установленных программ идут одновременно под одним
+    общим сроком; каждая часть публикуется в RESULT сразу по готовности.
+    sections — какие секции пересобирать (остальные берутся из кэша как есть).
+    """
     try:
-        RESULT["specs"] = collect_specs()
-        RESULT["installed"] = scan_installed_programs()
-        if target_cache_path:
-            with open(target_cache_path, "w", encoding="utf-8") as f:
-                json.dump(RESULT, f, ensure_ascii=False, indent=2)
+        previous = bootcache.load(target_cache_path) if target_cache_path else {}
+        probes = {}
+        if "specs" in sections:
+            _publish("specs", None, _base_specs())
+            probes.update({("specs", key): value for key, value in SPEC_PROBES.items()})
+        if "installed" in sections:
+            # Реестр отвечает за миллисекунды и публикуется сразу; winget list дополняет его
+            # версиями и обновлениями, а не успеет к сроку — останется результат реестра
+            fast = scan_registry_programs()
+            _publish("installed", None, fast)
+            probes[("installed", None)] = (lambda timeout: registry.merge(fast, scan_installed_programs(timeout)), fast)
+        timed_out = _run_probes(probes, deadline, lambda name, value: _publish(name[0], name[1], value))
+        if "specs" in sections:
+            # Не успевшую пробу подменяем значением из прошлого запуска, если оно есть
+            old_specs = previous.get("specs", {})
+            unknown = []
+            for section, key in timed_out:
+                if section != "specs": continue
+                if key in old_specs and key not in old_specs.get("unknown", []): _publish("specs", key, old_specs[key])
+                else: unknown.append(key)
+            _publish("specs", "unknown", unknown)
+        fresh = [name for name in sections if (name, None) not in timed_out]
+        if target_cache_path and fresh:
+            with _lock:
+                bootcache.save(target_cache_path, RESULT, fresh)
     finally:
         DONE.set()
 
-def start_preload(target_cache_path=None):
-    t = threading.Thread(target=run_all, args=(target_cache_path,), daemon=True)
+def scan_driver_store(store=None):
+    """
+    Инкрементальная индексация папки драйверов (driverstore.default_store()) для
+    подбора по устройствам: на повторных запусках перечитываются только изменённые INF.
+    Идёт отдельно от проб и их общего срока — первый разбор большой папки бывает долгим.
+    """
+    try:
+        store = store or driverstore.default_store()
+        if not os.path.isdir(store): return None
+        index = driverstore.DriverIndex()
+        try: return index.scan(store)
+        finally: index.close()
+    except Exception as e:
+        print(f"Индексация драйверов не удалась: {e}"); return None
+    finally:
+        DRIVERS_SCANNED.set()
+
+def start_preload(target_cache_path=None, sections=SECTIONS):
+    t = threading.Thread(target=run_all, args=(target_cache_path,), kwargs={"sections": sections}, daemon=True)
     t.start()
+    threading.Thread(target=scan_driver_store, daemon=True, name="driver-scan").start()
     return t
 
 def get_cache_path():
-    return os.path.join(tempfile.gettempdir(), "ausnit_boot_cache.json")
\ No newline at end of file
+    return bootcache.default_path()
\ No newline at end of file
@@ -0,0 +1,178 @@
+# backend/probeworker.py
+"""
+Долгоживущий процесс для запросов к железу вместо wmic на каждый вопрос.
+
+Процесс запускается один раз и переиспользуется, как соединение из пула.
+Протокол — JSON по строке в обе стороны:
+
+    -> {"id": 7, "op": "cim", "class": "Win32_BaseBoard", "properties": ["Product", ...]}
+    <- {"id": 7, "ok": true, "result": [{"Product": ...}, ...]}
+    <- {"id": 7, "ok": false, "error": "..."}
+
+Ответы сопоставляются с запросами по id, так что пробы из разных потоков
+шлют вопросы, не дожидаясь друг друга.  На Windows процесс — PowerShell
+с CIM (wmic устарел и на каждый вызов заново поднимает WMI); команду можно
+заменить переменной AUSNIT_PROBE_WORKER — так на Linux подставляется
+bench/fake_probe_worker.py.  Без процесса (не Windows и переменная не задана)
+запросы бросают ProbeError, и вызывающий откатывается к старому пути.
+"""
+import atexit
+import base64
+import itertools
+import json
+import os
+import shlex
+import subprocess
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Dict, List, Optional
+
+from backend import procs
+
+CREATE_NO_WINDOW = 0x08000000
+_CREATION_FLAGS = CREATE_NO_WINDOW if os.name == "nt" else 0
+
+QUERY_TIMEOUT = 25.0
+STALL_TIMEOUT = 20.0  # процесс с неотвеченными запросами молчит дольше — считаем зависшим
+CLOSE_WAIT = 1.0
+
+# Сам процесс проб для Windows.  Remove-TypeData: в PowerShell 5.1 без этого
+# ConvertTo-Json превращает массивы в {"value": [...], "Count": n}.
+POWERSHELL_WORKER = r"""
+$ErrorActionPreference = 'Stop'
+Remove-TypeData System.Array -ErrorAction SilentlyContinue
+$utf8 = New-Object System.Text.UTF8Encoding $false
+[Console]::InputEncoding = $utf8; [Console]::OutputEncoding = $utf8
+while ($null -ne ($line = [Console]::In.ReadLine())) {
+    $req = $null
+    try {
+        $req = $line | ConvertFrom-Json
+        switch ($req.op) {
+            'ping' { $result = 'pong' }
+            'cim' {
+                $props = [string[]]$req.properties
+                $result = [object[]]@(Get-CimInstance -ClassName $req.class -Property $props | Select-Object -Property $props)
+            }
+            default { throw "unknown op: $($req.op)" }
+        }
+        $reply = @{ id = $req.id; ok = $true; result = $result }
+    } catch {
+        $reply = @{ id = $(if ($req) { $req.id } else { $null }); ok = $false; error = "$_" }
+    }
+    [Console]::Out.WriteLine((ConvertTo-Json -InputObject $reply -Compress -Depth 5))
+    [Console]::Out.Flush()
+}
+"""
+
+class ProbeError(Exception):
+    pass
+
+def worker_command() -> Optional[List[str]]:
+    custom = os.environ.get("AUSNIT_PROBE_WORKER")
+    if custom:
+        return shlex.split(custom, posix=os.name != "nt")
+    if os.name == "nt":
+        encoded = base64.b64encode(POWERSHELL_WORKER.encode("utf-16-le")).decode("ascii")
+        return ["powershell", "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-EncodedCommand", encoded]
+    return None
+
+class ProbeWorker:
+    """ Один процесс проб: запросы из любых потоков, ответы разбирает фоновый поток. """
+    def __init__(self, cmd: List[str]):
+        self._proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                      creationflags=_CREATION_FLAGS, start_new_session=os.name != "nt")
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, Future] = {}
+        self._lock = threading.Lock()
+        self._closed = False
+        self.answered = False  # ответил хоть раз — иначе процесс проб на этой машине не работает
+        self._last_reply = time.monotonic()
+        threading.Thread(target=self._reader, daemon=True, name="probe-worker").start()
+
+    def _reader(self):
+        for line in self._proc.stdout:
+            try: reply = json.loads(line)
+            except ValueError: continue  # постороннее в stdout (баннер, предупреждение) — не ответ
+            with self._lock:
+                self._last_reply = time.monotonic(); self.answered = True; future = self._pending.pop(reply.get("id"), None)
+            if future is None: continue  # ответ на запрос, который уже не ждут
+            if reply.get("ok"): future.set_result(reply.get("result"))
+            else: future.set_exception(ProbeError(reply.get("error") or "ошибка процесса проб"))
+        with self._lock:
+            self._closed = True
+            pending = list(self._pending.values()); self._pending.clear()
+        for future in pending:
+            future.set_exception(ProbeError("процесс проб завершился"))
+
+    def alive(self) -> bool:
+        return not self._closed and self._proc.poll() is None
+
+    def query(self, op: str, timeout: Optional[float] = QUERY_TIMEOUT, **params):
+        future: Future = Future()
+        with self._lock:
+            if self._closed: raise ProbeError("процесс проб завершился")
+            request_id = next(self._ids); self._pending[request_id] = future; sent = time.monotonic()
+            try:
+                self._proc.stdin.write(json.dumps({"id": request_id, "op": op, **params}).encode("utf-8") + b"\n")
+                self._proc.stdin.flush()
+            except OSError as e:
+                self._pending.pop(request_id, None)
+                raise ProbeError(f"процесс проб недоступен: {e}")
+        try:
+            return future.result(None if timeout is None else max(timeout, 0.1))
+        except FutureTimeout:
+            with self._lock:
+                self._pending.pop(request_id, None); stalled = time.monotonic() - max(self._last_reply, sent) > STALL_TIMEOUT
+            # Короткий срок вышел — просто не ждём ответа.  Но если процесс давно молчит,
+            # завис сам запрос (WMI бывает), а ответы идут по очереди: закрываем,
+            # следующий запрос поднимет новый процесс
+            if stalled: self.close()
+            raise ProbeError(f"нет ответа на {op} за {timeout:.1f} с")
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+        try: self._proc.stdin.close()  # EOF — процесс выходит сам
+        except OSError: pass
+        try: self._proc.wait(CLOSE_WAIT)
+        except subprocess.TimeoutExpired: procs.kill_tree(self._proc)
+
+# --- Общий процесс на всё приложение ---
+_worker: Optional[ProbeWorker] = None
+_worker_lock = threading.Lock()
+_unavailable = False  # запуск не удался или процесс умер, не ответив ни разу, — второй раз не пробуем
+
+def get_worker() -> Optional[ProbeWorker]:
+    global _worker, _unavailable
+    with _worker_lock:
+        if _worker is not None and _worker.alive(): return _worker
+        if _worker is not None and not _worker.answered:
+            # PowerShell запустился, но процесс проб не работает (Constrained Language Mode,
+            # падение, зависание) — перезапуск на каждый запрос ничего не даст
+            print("Процесс проб завершился, не ответив; дальше — wmic"); _worker = None; _unavailable = True
+        cmd = worker_command()
+        if cmd is None or _unavailable: return None
+        try: _worker = ProbeWorker(cmd)
+        except OSError as e:
+            print(f"Процесс проб не запустился: {e}"); _unavailable = True; return None
+        return _worker
+
+def query(op: str, timeout: Optional[float] = QUERY_TIMEOUT, **params):
+    worker = get_worker()
+    if worker is None: raise ProbeError("процесс проб недоступен")
+    return worker.query(op, timeout, **params)
+
+def cim(cls: str, properties: List[str], timeout: Optional[float] = QUERY_TIMEOUT) -> List[dict]:
+    """ Экземпляры CIM-класса с заданными свойствами. """
+    rows = query("cim", timeout, **{"class": cls, "properties": properties})
+    if rows is None: return []
+    return rows if isinstance(rows, list) else [rows]
+
+def shutdown():
+    global _worker
+    with _worker_lock:
+        worker, _worker = _worker, None
+    if worker is not None: worker.close()
+
+atexit.register(shutdown)
@@ -0,0 +1,166 @@
+# backend/procs.py
+"""
+Запуск внешних команд под присмотром: winget, установщики, pnputil, wmic.
+
+Вывод читается по мере появления (не копится целиком, если не нужен),
+команда ограничена общим сроком и сроком «тишины» — без единого байта
+в stdout/stderr, а cancel_event проверяется каждые POLL секунд.  По любой
+из этих причин снимается всё дерево процессов: установщик, который
+winget запустил, и всё, что запустил установщик.
+
+Код возврата переводится в статус по таблице (winget и msiexec
+сообщают «уже установлено» и «нужна перезагрузка» ненулевыми кодами,
+это не ошибка):
+
+    "ok" | "reboot" | "already"                — успех (OK_STATUSES)
+    "failed" | "timeout" | "idle" | "cancelled" | "error" (не запустилась)
+"""
+import codecs
+import os
+import queue
+import re
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, NamedTuple, Optional
+
+CREATE_NO_WINDOW = 0x08000000
+CREATE_NEW_PROCESS_GROUP = 0x00000200
+_CREATION_FLAGS = CREATE_NO_WINDOW | CREATE_NEW_PROCESS_GROUP if os.name == "nt" else 0
+
+POLL = 0.1         # как часто проверяются отмена и сроки — это и задержка отмены
+KILL_WAIT = 3.0    # сколько ждать завершения процесса после kill
+DRAIN_WAIT = 1.0   # сколько дочитывать вывод после выхода процесса (внуки могут держать канал)
+CHUNK = 64 * 1024
+TAIL_LINES = 40    # сколько последних строк вывода помнить для журнала
+
+OK_STATUSES = ("ok", "reboot", "already")
+
+# Коды возврата (на Windows — беззнаковые 32 бита)
+WINGET_CODES = {
+    0x8A15002B: "already",  # UPDATE_NOT_APPLICABLE: новее версии нет
+    0x8A150061: "already",  # PACKAGE_ALREADY_INSTALLED
+    0x8A15010D: "already",  # INSTALL_ALREADY_INSTALLED
+    0x8A150109: "reboot",   # INSTALL_REBOOT_REQUIRED_TO_FINISH
+    0x8A15010A: "reboot",   # INSTALL_REBOOT_REQUIRED_FOR_INSTALL
+    0x8A15010B: "reboot",   # INSTALL_REBOOT_INITIATED
+}
+MSI_CODES = {
+    3010: "reboot",   # ERROR_SUCCESS_REBOOT_REQUIRED
+    1641: "reboot",   # ERROR_SUCCESS_REBOOT_INITIATED
+    1638: "already",  # ERROR_PRODUCT_VERSION: эта или более новая версия уже стоит
+}
+INSTALL_CODES = {**MSI_CODES, **WINGET_CODES}  # winget install и установщики, запущенные напрямую
+PNPUTIL_CODES = {3010: "reboot"}
+
+class ProcResult(NamedTuple):
+    status: str
+    returncode: Optional[int]
+    duration: float
+    stdout: str = ""  # целиком только при capture=True
+    tail: str = ""    # последние TAIL_LINES строк stdout и stderr вперемешку
+
+    @property
+    def ok(self) -> bool:
+        return self.status in OK_STATUSES
+
+def classify(returncode: Optional[int], codes: Optional[Dict[int, str]] = None) -> str:
+    if returncode is None: return "error"
+    if returncode == 0: return "ok"
+    if returncode < 0 and os.name != "nt": return "failed"  # убит сигналом
+    return (codes or {}).get(returncode & 0xFFFFFFFF, "failed")
+
+def kill_tree(proc: subprocess.Popen):
+    """
+    Снимает процесс вместе с потомками.  Потомков перечисляет psutil (до kill,
+    пока они ещё привязаны к родителю); на POSIX дополнительно убивается вся
+    группа — туда попадают и «отцепившиеся» внуки.
+    """
+    import psutil  # лениво: консольный запуск не должен платить за импорт
+    try: victims = psutil.Process(proc.pid).children(recursive=True)
+    except psutil.Error: victims = []
+    if os.name != "nt":
+        try: os.killpg(proc.pid, signal.SIGKILL)
+        except OSError: pass
+    for p in victims:
+        try: p.kill()
+        except psutil.Error: pass
+    try: proc.kill()
+    except OSError: pass
+    try: proc.wait(KILL_WAIT)  # внуков не ждём: SIGKILL/TerminateProcess не отменить, а осиротевших дожидается init
+    except subprocess.TimeoutExpired: pass
+
+def _reader(name, pipe, out: "queue.Queue"):
+    try:
+        while True:
+            chunk = pipe.read1(CHUNK)
+            if not chunk: break
+            out.put((name, chunk))
+    except (OSError, ValueError):
+        pass  # канал закрыт при снятии процесса
+    finally:
+        pipe.close()  # закрывает сам читатель: close() из другого потока ждал бы блокировку read1
+        out.put((name, None))
+
+def run(cmd, timeout: Optional[float] = None, idle_timeout: Optional[float] = None, cancel_event=None,
+        codes: Optional[Dict[int, str]] = None, on_line: Optional[Callable[[str, str], None]] = None,
+        capture: bool = False, shell: bool = False, encoding: str = "utf-8") -> ProcResult:
+    """
+    Запускает cmd и ждёт его под присмотром (см. описание модуля).
+    on_line(stream, line) получает строки "stdout"/"stderr" по мере появления;
+    строкой считается и кусок до \\r — так видны индикаторы прогресса winget.
+    """
+    started = time.perf_counter()
+    try:
+        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=shell,
+                                creationflags=_CREATION_FLAGS, start_new_session=os.name != "nt")
+    except (OSError, ValueError) as e:
+        return ProcResult("error", None, time.perf_counter() - started, tail=str(e))
+
+    chunks: "queue.Queue" = queue.Queue()  # без предела: читатель, брошенный после kill, не должен повиснуть на put
+    readers = [threading.Thread(target=_reader, args=(name, pipe, chunks), daemon=True, name=f"proc-{name}")
+               for name, pipe in (("stdout", proc.stdout), ("stderr", proc.stderr))]
+    for t in readers: t.start()
+    decoders = {name: codecs.getincrementaldecoder(encoding)(errors="replace") for name in ("stdout", "stderr")}
+    partial = {"stdout": "", "stderr": ""}
+    captured = []; tail = deque(maxlen=TAIL_LINES)
+    open_streams = 2; status = None; last_output = started; exited_at = None
+
+    def feed(name, text):
+        if capture and name == "stdout": captured.append(text)
+        *lines, partial[name] = re.split(r"\r\n|\r|\n", partial[name] + text)
+        for line in lines:
+            if not line: continue
+            tail.append(line)
+            if on_line: on_line(name, line)
+
+    while True:
+        if open_streams:
+            try:
+                name, chunk = chunks.get(timeout=POLL)
+                if chunk is None: open_streams -= 1; feed(name, decoders[name].decode(b"", final=True))
+                else: last_output = time.perf_counter(); feed(name, decoders[name].decode(chunk))
+            except queue.Empty:
+                pass
+        else:  # вывод закрыт — ждём сам процесс, не очередь
+            try: proc.wait(POLL)
+            except subprocess.TimeoutExpired: pass
+        now = time.perf_counter(); cancelled = cancel_event is not None and cancel_event.is_set()
+        if exited_at is None:
+            if cancelled: status = "cancelled"
+            elif timeout is not None and now - started > timeout: status = "timeout"
+            elif idle_timeout is not None and now - last_output > idle_timeout: status = "idle"
+            elif proc.poll() is not None: exited_at = now
+            if status: kill_tree(proc); break
+        if exited_at is not None and (not open_streams or cancelled or now - exited_at > DRAIN_WAIT):
+            break  # после выхода канал может держать внук — его не ждём и не трогаем
+
+    for name in ("stdout", "stderr"):
+        if partial[name]:
+            tail.append(partial[name])
+            if on_line: on_line(name, partial[name])
+    try: returncode = proc.wait(KILL_WAIT)
+    except subprocess.TimeoutExpired: returncode = None
+    return ProcResult(status or classify(returncode, codes), returncode, time.perf_counter() - started, "".join(captured), "\n".join(tail))
@@ -0,0 +1,140 @@
+# backend/registry.py
+"""
+Установленные программы по веткам Uninstall реестра — быстрый путь рядом с `winget list`.
+
+Ветки HKLM (64- и 32-битное представление) и HKCU читаются через winreg в список
+записей {"hive", "key", "DisplayName", "Publisher", "DisplayVersion", ...}: это
+миллисекунды против секунд `winget list`, который ещё и обновляет источники.
+Записи сопоставляются с ID каталога по таблице правил data/installed_rules.json:
+
+    "7zip.7zip": {"names": ["7-zip"], "publisher": "..."}
+
+names — регулярные выражения от начала DisplayName (без учёта регистра, после
+совпадения — не буква/цифра), publisher — необязательное выражение, которое
+ищется в Publisher.  ID каталога без правила ищется по своему названию.
+Правила компилируются один раз и раскладываются по первому слову выражения,
+так что на запись проверяются единицы правил, а не вся таблица.
+
+Где реестра нет (Linux, замеры), снимок читается из JSON-файла
+AUSNIT_REGISTRY_SNAPSHOT; `python -m backend.registry --dump файл.json` снимает
+такой файл на Windows.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+UNINSTALL_KEY = r"SOFTWARE\Microsoft\Windows\CurrentVersion\Uninstall"
+VALUES = ("DisplayName", "DisplayVersion", "Publisher", "SystemComponent", "ParentKeyName", "ReleaseType")
+RULES_PATH = "data/installed_rules.json"
+
+_WORD = re.compile(r"\w+")
+
+# --- Снимок реестра ---
+def _read_view(winreg, hive, root, flags) -> List[dict]:
+    try: key = winreg.OpenKey(root, UNINSTALL_KEY, 0, winreg.KEY_READ | flags)
+    except OSError: return []
+    entries = []
+    with key:
+        for i in range(winreg.QueryInfoKey(key)[0]):
+            try:
+                name = winreg.EnumKey(key, i)
+                sub = winreg.OpenKey(key, name)
+            except OSError:
+                continue  # ключ удалили, пока читали
+            entry = {"hive": hive, "key": name}
+            with sub:
+                for value in VALUES:
+                    try: entry[value] = winreg.QueryValueEx(sub, value)[0]
+                    except OSError: pass
+            entries.append(entry)
+    return entries
+
+def read_registry() -> List[dict]:
+    import winreg
+    views = [("HKLM", winreg.HKEY_LOCAL_MACHINE, winreg.KEY_WOW64_64KEY),
+             ("HKLM32", winreg.HKEY_LOCAL_MACHINE, winreg.KEY_WOW64_32KEY),
+             ("HKCU", winreg.HKEY_CURRENT_USER, 0)]
+    return [entry for hive, root, flags in views for entry in _read_view(winreg, hive, root, flags)]
+
+def load_snapshot(path: str) -> List[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def read_snapshot() -> List[dict]:
+    """ Записи Uninstall: из файла AUSNIT_REGISTRY_SNAPSHOT, если задан, иначе из реестра (только Windows). """
+    path = os.environ.get("AUSNIT_REGISTRY_SNAPSHOT")
+    if path: return load_snapshot(path)
+    return read_registry() if os.name == "nt" else []
+
+def visible(entry: dict) -> bool:
+    """ Как в «Программах и компонентах»: без системных компонентов и обновлений. """
+    return bool(entry.get("DisplayName")) and not entry.get("SystemComponent") and not entry.get("ParentKeyName") \
+        and entry.get("ReleaseType") not in ("Update", "Hotfix", "Security Update")
+
+# --- Таблица правил ---
+def _bucket(pattern: str) -> Optional[str]:
+    """ Первое слово выражения, если оно буквальное (иначе правило проверяется для всех записей). """
+    m = _WORD.match(pattern)
+    if not m or "_" in m.group(0) or "|" in pattern: return None
+    rest = pattern[m.end():m.end() + 1]
+    return None if rest in ("?", "*", "{") else m.group(0)
+
+class RuleTable:
+    """ Скомпилированные правила: DisplayName/Publisher -> ID каталога. """
+    def __init__(self, known_ids: Dict[str, List[str]], rules: Dict[str, dict]):
+        rules = {pid.lower(): rule for pid, rule in rules.items()}
+        self.buckets: Dict[str, List[Tuple[re.Pattern, Optional[re.Pattern], str]]] = {}
+        self.generic: List[Tuple[re.Pattern, Optional[re.Pattern], str]] = []
+        for pid, names in known_ids.items():
+            rule = rules.get(pid) or {"names": [re.escape(name.lower()) for name in names]}
+            publisher = re.compile(rule["publisher"], re.IGNORECASE) if rule.get("publisher") else None
+            for pattern in rule["names"]:
+                compiled = (re.compile(f"(?:{pattern})(?!\\w)", re.IGNORECASE), publisher, pid)
+                key = _bucket(pattern.lower())
+                (self.buckets.setdefault(key, []) if key else self.generic).append(compiled)
+
+    def match(self, entry: dict) -> Optional[str]:
+        name = entry.get("DisplayName") or ""
+        first = _WORD.match(name.lower())
+        for pattern, publisher, pid in [*self.buckets.get(first.group(0) if first else "", ()), *self.generic]:
+            if pattern.match(name) and (publisher is None or publisher.search(entry.get("Publisher") or "")):
+                return pid
+        return None
+
+def detect_installed(table: RuleTable, known_ids: Dict[str, List[str]], entries: List[dict]) -> dict:
+    """ Результат в том же виде, что preload.match_installed; source — "registry". """
+    installed_names = set(); versions = {}
+    for entry in entries:
+        if not visible(entry): continue
+        pid = table.match(entry)
+        if pid is None or pid in versions: continue
+        installed_names.update(name.lower() for name in known_ids[pid])
+        versions[pid] = {"version": str(entry.get("DisplayVersion") or ""), "available": "", "source": "registry"}
+    return {"installed_list_raw": sorted(installed_names), "installed_versions": versions, "outdated": []}
+
+def merge(fast: dict, confirmed: dict) -> dict:
+    """ Реестр + `winget list`: установлено то, что нашёл любой; версии и обновления — от winget. """
+    versions = {**fast.get("installed_versions", {}), **confirmed.get("installed_versions", {})}
+    names = set(fast.get("installed_list_raw", [])) | set(confirmed.get("installed_list_raw", []))
+    return {"installed_list_raw": sorted(names), "installed_versions": versions, "outdated": confirmed.get("outdated", [])}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Установленные программы по веткам Uninstall реестра")
+    parser.add_argument("--dump", help="сохранить снимок веток Uninstall в JSON")
+    args = parser.parse_args(argv)
+    t0 = time.perf_counter(); entries = read_snapshot(); elapsed = time.perf_counter() - t0
+    if args.dump:
+        with open(args.dump, "w", encoding="utf-8") as f: json.dump(entries, f, ensure_ascii=False, indent=1)
+    from backend import preload
+    known = preload._known_ids()
+    t1 = time.perf_counter(); result = detect_installed(RuleTable(known, preload._load_json(RULES_PATH)), known, entries); matched = time.perf_counter() - t1
+    for pid, info in sorted(result["installed_versions"].items()): print(f"{pid:40} {info['version']}")
+    print(f"записей: {len(entries)} (чтение {elapsed * 1000:.1f} мс), найдено: {len(result['installed_versions'])} (сопоставление {matched * 1000:.1f} мс)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
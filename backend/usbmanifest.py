@@ -0,0 +1,126 @@
+# backend/usbmanifest.py
+"""
+Манифест записанного на флешку и дельта-обновление.
+
+После сборки в корень флешки кладётся манифест {путь: [размер, sha256]}
+всего, что записано из образа.  При следующей сборке хэши нового образа
+(считаются один раз на ISO и кэшируются в папке данных AUSNIT) сверяются
+с манифестом: копируются только новые и изменённые файлы, удалённые из
+образа — стираются с флешки.  Перед копированием манифест урезается до
+нетронутых файлов, так что прерванная запись не оставит «доверенных»
+полуфайлов.
+"""
+import hashlib
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from backend.bootcache import app_data_dir
+
+MANIFEST_NAME = "ausnit_manifest.json"
+MANIFEST_VERSION = 1
+HASH_CACHE_LIMIT = 16  # сколько образов помнить
+HASH_CHUNK = 1024 * 1024
+
+def hash_cache_path():
+    return os.path.join(app_data_dir(), "iso_hashes.json")
+
+def image_key(iso_path: str, variant: str = "") -> str:
+    """ Ключ образа: путь, размер, mtime и вариант раскладки (FAT32 с .swm даёт другие файлы). """
+    st = os.stat(iso_path)
+    return f"{os.path.abspath(iso_path)}|{st.st_size}|{st.st_mtime_ns}|{variant}"
+
+def _write_json(path, data):
+    """ Атомарная запись: сначала во временный файл, потом os.replace. """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+def _read_json(path) -> dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+# --- Кэш хэшей образов ---
+def cached_hashes(key: str) -> Optional[Dict[str, list]]:
+    entry = _read_json(hash_cache_path()).get(key)
+    return entry["files"] if entry else None
+
+def store_hashes(key: str, files: Dict[str, list]):
+    path = hash_cache_path()
+    cache = _read_json(path)
+    cache[key] = {"saved_at": time.time(), "files": files}
+    for old in sorted(cache, key=lambda k: cache[k].get("saved_at", 0))[:-HASH_CACHE_LIMIT]:
+        del cache[old]
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write_json(path, cache)
+
+def hash_jobs(jobs, on_event=None, cancel_event=None) -> Dict[str, list]:
+    """ {путь: [размер, sha256]} для заданий копирования — читается только исходник. """
+    total = sum(j.size for j in jobs); done = 0; files = {}; last = 0.0
+    for job in jobs:
+        if cancel_event is not None and cancel_event.is_set(): break
+        digest = hashlib.sha256()
+        for chunk in job.chunks():
+            digest.update(chunk); done += len(chunk)
+            now = time.perf_counter()
+            if on_event and now - last > 0.25:
+                last = now; on_event({"state": "hashing", "done": done, "total": total})
+        files[job.path] = [job.size, digest.hexdigest()]
+    return files
+
+# --- Манифест на флешке ---
+def _safe_path(target: str, path: str) -> bool:
+    """
+    Путь из манифеста остаётся внутри флешки: манифест лежит на ней же и
+    правится кем угодно, а по нему удаляются файлы.  Как isoimage._safe_name.
+    """
+    if not isinstance(path, str) or not path or "\\" in path or ":" in path or "\0" in path or path.startswith("/"):
+        return False
+    if any(part in ("", ".", "..") for part in path.split("/")):
+        return False
+    root = os.path.realpath(target)
+    dest = os.path.realpath(os.path.join(root, *path.split("/")))
+    return dest != root and dest.startswith(os.path.join(root, ""))
+
+def load(target: str) -> Dict[str, list]:
+    raw = _read_json(os.path.join(target, MANIFEST_NAME))
+    files = raw.get("files", {}) if raw.get("version") == MANIFEST_VERSION else {}
+    if not isinstance(files, dict): return {}
+    safe = {path: value for path, value in files.items() if _safe_path(target, path)}
+    if len(safe) != len(files):
+        print(f"Манифест на {target}: пропущено {len(files) - len(safe)} путей вне флешки")
+    return safe
+
+def save(target: str, files: Dict[str, list], source: str = ""):
+    _write_json(os.path.join(target, MANIFEST_NAME), {"version": MANIFEST_VERSION, "source": source, "saved_at": time.time(), "files": files})
+
+def diff(target: str, new: Dict[str, list], old: Dict[str, list]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    (копировать, оставить, удалить).  Файл оставляем, только если хэш совпал
+    с манифестом и на флешке лежит файл того же размера.
+    """
+    copy, keep = [], []
+    for path, (size, digest) in new.items():
+        dest = os.path.join(target, *path.split("/"))
+        same = old.get(path) == [size, digest] and os.path.isfile(dest) and os.path.getsize(dest) == size
+        (keep if same else copy).append(path)
+    remove = [path for path in old if path not in new]
+    return copy, keep, remove
+
+def remove_files(target: str, paths: List[str]):
+    """ Удаляет файлы и опустевшие после этого папки. """
+    dirs = set()
+    for path in paths:
+        dest = os.path.join(target, *path.split("/"))
+        try: os.remove(dest)
+        except FileNotFoundError: pass
+        parent = os.path.dirname(path)
+        while parent: dirs.add(parent); parent = os.path.dirname(parent)
+    for d in sorted(dirs, key=len, reverse=True):
+        try: os.rmdir(os.path.join(target, *d.split("/")))
+        except OSError: pass  # не пустая
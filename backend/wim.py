@@ -0,0 +1,194 @@
+# backend/wim.py
+"""
+Разбор заголовка и таблицы ресурсов WIM, список редакций из встроенного XML
+и разбиение образа на части .swm.
+
+FAT32 не хранит файлы больше 4 GB, а install.wim в современных образах
+Windows больше.  Разбиение идёт по таблице ресурсов: ресурсы копируются
+как есть (сжатые), меняются только смещения, заголовок и таблица каждой
+части.  Раскладка частей считается заранее по таблице, поэтому каждая
+часть отдаётся потоком кусков — прямо в конвейер копирования на флешку,
+без второго прохода по файлу и без буфера на весь образ.
+"""
+import struct
+import xml.etree.ElementTree as ET
+from typing import Callable, Iterator, List, NamedTuple, Optional
+
+WIM_MAGIC = b"MSWIM\0\0\0"
+HEADER_SIZE = 208
+ENTRY_SIZE = 50
+FAT32_MAX = 4 * 1024 ** 3 - 1
+SWM_PART_LIMIT = 3800 * 1024 ** 2  # как /FileSize:3800 у DISM — с запасом до предела FAT32
+
+RESHDR_FLAG_METADATA = 0x02
+RESHDR_FLAG_COMPRESSED = 0x04
+HDR_FLAG_SPANNED = 0x08
+
+class WimError(Exception):
+    pass
+
+class ResHdr(NamedTuple):
+    size: int        # размер на диске (56 бит)
+    flags: int
+    offset: int
+    original: int
+
+    @classmethod
+    def unpack(cls, raw: bytes, pos: int = 0) -> "ResHdr":
+        size_flags, offset, original = struct.unpack_from("<QQQ", raw, pos)
+        return cls(size_flags & 0x00FFFFFFFFFFFFFF, size_flags >> 56, offset, original)
+
+    def pack(self) -> bytes:
+        return struct.pack("<QQQ", self.size | (self.flags << 56), self.offset, self.original)
+
+EMPTY_RESHDR = ResHdr(0, 0, 0, 0)
+
+class LookupEntry(NamedTuple):
+    res: ResHdr
+    part: int
+    refcount: int
+    sha1: bytes
+
+    @classmethod
+    def unpack(cls, raw: bytes, pos: int) -> "LookupEntry":
+        part, refcount = struct.unpack_from("<HI", raw, pos + 24)
+        return cls(ResHdr.unpack(raw, pos), part, refcount, bytes(raw[pos + 30:pos + 50]))
+
+    def pack(self) -> bytes:
+        return self.res.pack() + struct.pack("<HI", self.part, self.refcount) + self.sha1
+
+class WimHeader(NamedTuple):
+    raw: bytes
+    flags: int
+    part: int
+    total_parts: int
+    image_count: int
+    lookup: ResHdr
+    xml: ResHdr
+    boot_metadata: ResHdr
+    boot_index: int
+
+    @classmethod
+    def unpack(cls, raw: bytes) -> "WimHeader":
+        if len(raw) < HEADER_SIZE or raw[:8] != WIM_MAGIC:
+            raise WimError("не WIM: нет сигнатуры MSWIM")
+        flags, = struct.unpack_from("<I", raw, 16)
+        part, total, images = struct.unpack_from("<HHI", raw, 40)
+        return cls(bytes(raw[:HEADER_SIZE]), flags, part, total, images,
+                   ResHdr.unpack(raw, 48), ResHdr.unpack(raw, 72), ResHdr.unpack(raw, 96), struct.unpack_from("<I", raw, 120)[0])
+
+    def pack(self, flags: int, part: int, total: int, lookup: ResHdr, xml: ResHdr, boot: ResHdr) -> bytes:
+        out = bytearray(self.raw)
+        struct.pack_into("<I", out, 16, flags)
+        struct.pack_into("<HH", out, 40, part, total)
+        out[48:72] = lookup.pack(); out[72:96] = xml.pack(); out[96:120] = boot.pack()
+        out[124:148] = EMPTY_RESHDR.pack()  # таблица целостности в частях не пишется
+        return bytes(out)
+
+def read_header(read: Callable[[int, int], bytes]) -> WimHeader:
+    return WimHeader.unpack(read(0, HEADER_SIZE))
+
+def read_lookup_table(read: Callable[[int, int], bytes], header: Optional[WimHeader] = None) -> List[LookupEntry]:
+    header = header or read_header(read)
+    if header.lookup.flags & RESHDR_FLAG_COMPRESSED:
+        raise WimError("сжатая таблица ресурсов (solid WIM/ESD) не поддерживается")
+    raw = read(header.lookup.offset, header.lookup.size)
+    return [LookupEntry.unpack(raw, pos) for pos in range(0, len(raw) - ENTRY_SIZE + 1, ENTRY_SIZE)]
+
+class SwmPart(NamedTuple):
+    number: int
+    header: bytes
+    resources: List[LookupEntry]   # исходные записи, в порядке записи в часть
+    table: bytes
+    xml: bytes
+    size: int
+
+def plan_split(read: Callable[[int, int], bytes], limit: int = SWM_PART_LIMIT) -> List[SwmPart]:
+    """
+    Раскладывает ресурсы по частям не больше limit байт.  Метаданные образов
+    должны быть в первой части, дальше ресурсы файлов в порядке смещений
+    исходника — тогда чтение идёт подряд.  read(offset, length) читает исходный WIM.
+    """
+    header = read_header(read)
+    if header.total_parts != 1:
+        raise WimError("образ уже разбит на части")
+    entries = read_lookup_table(read, header)
+    xml = read(header.xml.offset, header.xml.size) if header.xml.size else b""
+    metadata = [e for e in entries if e.res.flags & RESHDR_FLAG_METADATA]
+    files = sorted((e for e in entries if not e.res.flags & RESHDR_FLAG_METADATA), key=lambda e: e.res.offset)
+    overhead = lambda count: HEADER_SIZE + count * ENTRY_SIZE + len(xml)
+    groups: List[List[LookupEntry]] = [list(metadata)]; used = sum(e.res.size for e in metadata)
+    if overhead(len(metadata)) + used > limit:
+        raise WimError("метаданные образа не помещаются в одну часть")
+    for entry in files:
+        if overhead(1) + entry.res.size > limit:
+            raise WimError(f"ресурс {entry.res.size} байт больше размера части {limit}")
+        if overhead(len(groups[-1]) + 1) + used + entry.res.size > limit:
+            groups.append([]); used = 0
+        groups[-1].append(entry); used += entry.res.size
+    total = len(groups)
+    parts = []
+    for number, group in enumerate(groups, 1):
+        offset = HEADER_SIZE; table = bytearray(); boot = EMPTY_RESHDR
+        for entry in group:
+            res = entry.res._replace(offset=offset)
+            table += entry._replace(res=res, part=number).pack()
+            if number == 1 and header.boot_metadata.size and entry.res.offset == header.boot_metadata.offset: boot = res
+            offset += entry.res.size
+        lookup = ResHdr(len(table), 0, offset, len(table))
+        xml_res = ResHdr(len(xml), header.xml.flags, offset + len(table), len(xml)) if xml else EMPTY_RESHDR
+        part_header = header.pack(header.flags | HDR_FLAG_SPANNED, number, total, lookup, xml_res, boot)
+        parts.append(SwmPart(number, part_header, group, bytes(table), xml, offset + len(table) + len(xml)))
+    return parts
+
+def part_name(base: str, number: int) -> str:
+    """ install.wim -> install.swm, install2.swm, ... — так части ищет установщик Windows. """
+    stem = base[:-4] if base.lower().endswith(".wim") else base
+    return f"{stem}.swm" if number == 1 else f"{stem}{number}.swm"
+
+def part_chunks(part: SwmPart, chunks: Callable[[int, int], Iterator]) -> Iterator:
+    """ Содержимое части потоком: заголовок, ресурсы (кусками исходника), таблица, XML. """
+    yield part.header
+    for entry in part.resources:
+        yield from chunks(entry.res.offset, entry.res.size)
+    yield part.table
+    if part.xml:
+        yield part.xml
+
+# --- Метаданные образов (XML внутри WIM/ESD) ---
+def _text(node, path: str, default: str = "") -> str:
+    found = node.find(path) if node is not None else None
+    return found.text.strip() if found is not None and found.text else default
+
+def read_xml(read: Callable[[int, int], bytes], header: Optional[WimHeader] = None) -> str:
+    """ XML-описание образов; в ESD он тоже не сжат, поэтому хватает заголовка и одного чтения. """
+    header = header or read_header(read)
+    if not header.xml.size:
+        return ""
+    if header.xml.flags & RESHDR_FLAG_COMPRESSED:
+        raise WimError("сжатый XML в WIM не поддерживается")
+    return bytes(read(header.xml.offset, header.xml.size)).decode("utf-16-le", "replace").lstrip("\ufeff").rstrip("\0")
+
+def list_images(read: Callable[[int, int], bytes]) -> List[dict]:
+    """ Образы (редакции) WIM/ESD: индекс, название, редакция, архитектура, языки, сборка, размер. """
+    text = read_xml(read)
+    if not text:
+        return []
+    try: root = ET.fromstring(text)
+    except ET.ParseError as e: raise WimError(f"повреждённый XML в WIM: {e}")
+    arches = {"0": "x86", "5": "arm", "6": "ia64", "9": "x64", "12": "arm64"}
+    images = []
+    for image in root.findall("IMAGE"):
+        windows = image.find("WINDOWS")
+        version = ".".join(_text(windows, f"VERSION/{k}", "0") for k in ("MAJOR", "MINOR", "BUILD", "SPBUILD"))
+        images.append({
+            "index": int(image.get("INDEX", "0")),
+            "name": _text(image, "DISPLAYNAME") or _text(image, "NAME"),
+            "edition": _text(windows, "EDITIONID") or _text(image, "FLAGS"),
+            "arch": arches.get(_text(windows, "ARCH"), _text(windows, "ARCH")),
+            "languages": [l.text.strip() for l in windows.findall("LANGUAGES/LANGUAGE") if l.text] if windows is not None else [],
+            "default_language": _text(windows, "LANGUAGES/DEFAULT"),
+            "build": version if windows is not None else "",
+            "size": int(_text(image, "TOTALBYTES", "0") or 0),
+        })
+    return images
@@ -0,0 +1,108 @@
+# backend/winget.py
+"""
+Разбор табличного вывода winget (`winget list`, `winget search`).
+
+winget выравнивает колонки по ширине заголовка, поэтому строки режем
+по позициям слов в строке заголовка (над линией из «-»), а не по пробелам:
+в названиях программ пробелы есть, а в локализованном заголовке
+(«Имя ИД Версия ...») слова всё равно стоят над началом колонок.
+"""
+import unicodedata
+from typing import Dict, List, Optional
+
+# Порядок колонок одинаков во всех локализациях winget
+_COLUMNS = {
+    3: ["name", "id", "version"],
+    4: ["name", "id", "version", "source"],
+    5: ["name", "id", "version", "available", "source"],
+}
+_ELLIPSIS = "…"
+
+def _char_width(ch: str) -> int:
+    return 2 if unicodedata.east_asian_width(ch) in ("W", "F") else 1
+
+def _starts(header: str) -> List[int]:
+    """ Экранные позиции начала каждого слова заголовка. """
+    starts, col, prev_space = [], 0, True
+    for ch in header:
+        if not ch.isspace() and prev_space:
+            starts.append(col)
+        prev_space = ch.isspace()
+        col += _char_width(ch)
+    return starts
+
+def _split(line: str, starts: List[int]) -> List[str]:
+    if line.isascii():
+        bounds = starts[1:] + [len(line)]
+        return [line[a:b].strip() for a, b in zip(starts, bounds)]
+    # Широкие символы (CJK) занимают две экранные колонки — режем по экранной позиции
+    cells = [""] * len(starts); col = 0; idx = 0
+    for ch in line:
+        while idx + 1 < len(starts) and col >= starts[idx + 1]:
+            idx += 1
+        cells[idx] += ch
+        col += _char_width(ch)
+    return [c.strip() for c in cells]
+
+def parse_table(text: str) -> List[Dict[str, str]]:
+    """
+    Превращает вывод `winget list`/`winget search` в список строк-словарей
+    с ключами name/id/version[/available][/source]. Мусор до заголовка
+    (спиннер, прогресс обновления источников) пропускается.
+    """
+    # Спиннер перерисовывается через \r — оставляем только последний кадр строки
+    lines = [line.rsplit("\r", 1)[-1].rstrip() for line in text.splitlines()]
+    for i in range(1, len(lines)):
+        if lines[i].startswith("---") and set(lines[i]) == {"-"}:
+            header_index = i - 1
+            break
+    else:
+        return []
+    starts = _starts(lines[header_index])
+    names = _COLUMNS.get(len(starts))
+    if not names:
+        return []
+    rows = []
+    for line in lines[header_index + 2:]:
+        if not line.strip():
+            continue
+        cells = _split(line, starts)
+        if not cells[1]:
+            continue
+        rows.append(dict(zip(names, cells)))
+    return rows
+
+class PackageIndex:
+    """
+    Хэш-индекс строк таблицы по ID (без учёта регистра): поиск O(1)
+    и только точное совпадение. Длинные ID winget обрезает многоточием —
+    такие строки ищутся по префиксу нужной длины.
+    """
+    def __init__(self, rows: List[Dict[str, str]]):
+        self.rows: Dict[str, Dict[str, str]] = {}
+        self.truncated: Dict[int, Dict[str, Dict[str, str]]] = {}
+        for row in rows:
+            pkg_id = row["id"].lower()
+            if pkg_id.endswith(_ELLIPSIS):
+                prefix = pkg_id[:-1]
+                self.truncated.setdefault(len(prefix), {})[prefix] = row
+            else:
+                self.rows[pkg_id] = row
+
+    def get(self, pkg_id: str) -> Optional[Dict[str, str]]:
+        key = pkg_id.lower()
+        row = self.rows.get(key)
+        if row is not None:
+            return row
+        for length, prefixes in self.truncated.items():
+            if len(key) > length:
+                row = prefixes.get(key[:length])
+                if row is not None:
+                    return row
+        return None
+
+    def __contains__(self, pkg_id: str) -> bool:
+        return self.get(pkg_id) is not None
+
+    def __len__(self) -> int:
+        return len(self.rows) + sum(len(p) for p in self.truncated.values())
@@ -0,0 +1,34 @@
+# bench/bench_catalog.py
+"""
+Модель каталога InstallationTab на 10k записей: построение индекса
+и время инкрементального поиска (каждый префикс набираемого запроса).
+Кадр — 16 ms.  Запуск: python bench/bench_catalog.py [записей]
+"""
+import sys
+import time
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from ui.catalog_view import CatalogModel
+
+WORDS = ["Google", "Chrome", "Mozilla", "Firefox", "Video", "Player", "Office", "Studio", "Code", "Zip", "Torrent", "Notes"]
+
+def synthetic_catalog(count, categories=12):
+    data = {f"Category {c}": {} for c in range(categories)}
+    for i in range(count):
+        a, b = WORDS[i % len(WORDS)], WORDS[(i // len(WORDS)) % len(WORDS)]
+        data[f"Category {i % categories}"][f"{a} {b} {i}"] = f"{a}{i % 50}.{b}{i}"
+    return data
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    data = synthetic_catalog(count)
+    t0 = time.perf_counter(); model = CatalogModel(data); build = time.perf_counter() - t0
+    worst = 0.0
+    for query in ("g", "go", "goo", "google", "google c", "google ch", "google chrome", "google chrome 1", "v", "vi", "video pl", "zip", "z"):
+        t0 = time.perf_counter(); rows = model.search(query); elapsed = time.perf_counter() - t0
+        worst = max(worst, elapsed)
+        print(f"  {query!r:20} {len(rows):6} строк  {elapsed * 1000:6.2f} ms")
+    print(f"{len(model)} записей: индекс {build * 1000:.0f} ms, худший поиск {worst * 1000:.2f} ms (кадр 16 ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# bench/bench_catalog_index.py
+"""
+Индекс каталога backend.catalog на 10k+ пакетов: полная сборка из манифестов
+и вывода `winget search`, повторный импорт с одним изменённым манифестом,
+холодное открытие и время поиска.  Запуск: python bench/bench_catalog_index.py [пакетов]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from fake_winget import render_table
+from backend.catalog import CatalogIndex
+
+WORDS = ["Google", "Chrome", "Mozilla", "Firefox", "Video", "Player", "Office", "Studio", "Code", "Zip", "Torrent", "Notes"]
+TAGS = ["browser", "media", "archive", "editor", "developer-tools", "office", "p2p", "notes"]
+
+MANIFEST = """PackageIdentifier: {id}
+PackageVersion: {version}
+PackageLocale: en-US
+Publisher: {publisher}
+PackageName: {name}
+License: Freeware
+ShortDescription: {name} by {publisher}
+Tags:
+- {tag1}
+- {tag2}
+ManifestType: defaultLocale
+ManifestVersion: 1.6.0
+"""
+
+def write_manifests(root, count):
+    paths = []
+    for i in range(count):
+        a, b = WORDS[i % len(WORDS)], WORDS[(i // len(WORDS)) % len(WORDS)]
+        pkg_id = f"{a}{i % 50}.{b}{i}"
+        folder = os.path.join(root, pkg_id[0].lower(), *pkg_id.split("."), "1.0.0")
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"{pkg_id}.locale.en-US.yaml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(MANIFEST.format(id=pkg_id, version="1.0.0", publisher=f"{a} Corp", name=f"{a} {b} {i}", tag1=TAGS[i % len(TAGS)], tag2=TAGS[(i // 3) % len(TAGS)]))
+        paths.append(path)
+    return paths
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "manifests"); db = os.path.join(tmp, "catalog.sqlite")
+        paths = write_manifests(root, count)
+        search_rows = [(f"Extra Tool {i}", f"Extra.Tool{i}", "2.0", "winget") for i in range(count // 10)]
+
+        index = CatalogIndex(db)
+        t0 = time.perf_counter(); index.import_manifests(root); full = time.perf_counter() - t0
+        t0 = time.perf_counter(); index.import_search_output(render_table(search_rows, header=("Name", "Id", "Version", "Source"))); from_search = time.perf_counter() - t0
+        with open(paths[7], "a", encoding="utf-8") as f: f.write("# changed\n")
+        os.remove(paths[8])
+        t0 = time.perf_counter(); stats = index.import_manifests(root); incremental = time.perf_counter() - t0
+        index.close()
+        print(f"сборка: {count} манифестов {full:.2f} s, winget search {len(search_rows)} строк {from_search * 1000:.0f} ms")
+        print(f"повторный импорт: {stats} за {incremental * 1000:.0f} ms")
+
+        t0 = time.perf_counter(); index = CatalogIndex(db); catalog = index.as_catalog(); opened = time.perf_counter() - t0
+        print(f"открытие + as_catalog(): {opened * 1000:.1f} ms, {sum(map(len, catalog.values()))} пакетов")
+        worst = 0.0
+        for query in ("g", "go", "google", "google ch", "chrome 1", "browser", "developer", "zip archive", "extra tool 5", "mozilla2.goo"):
+            t0 = time.perf_counter(); rows = index.search_ids(query); elapsed = time.perf_counter() - t0
+            worst = max(worst, elapsed)
+            print(f"  {query!r:18} {len(rows):6} пакетов  {elapsed * 1000:6.2f} ms")
+        t0 = time.perf_counter(); top = index.search("google chrome", limit=20); ranked = time.perf_counter() - t0
+        print(f"топ-20 'google chrome': {ranked * 1000:.2f} ms, первый {top[0]['id'] if top else '-'}")
+        print(f"худший поиск (все совпадения): {worst * 1000:.2f} ms")
+        index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+# bench/bench_cli.py
+"""
+Консольный запуск `python -m ausnit`: время старта до готового плана
+(--dry-run) против импорта интерфейса, проверка, что модули ui и
+customtkinter не загружаются, и установка пресета на поддельном winget
+с разбором JSON-событий.  Запуск: python bench/bench_cli.py [повторов]
+"""
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+from fakes import PROJECT_ROOT, fake_tools
+from fake_winget import HANG_SECONDS
+
+def _run(args, **kw):
+    t0 = time.perf_counter()
+    p = subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True, text=True, encoding="utf-8", **kw)
+    return time.perf_counter() - t0, p
+
+def main():
+    repeats = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    cli = min(_run(["-m", "ausnit", "install", "--preset", "Работа", "--dry-run"])[0] for _ in range(repeats))
+    gui = min(_run(["-c", "import ui.main"])[0] for _ in range(repeats))
+    print(f"старт до плана: python -m ausnit {cli * 1000:.0f} ms, import ui.main {gui * 1000:.0f} ms")
+    probe = "import sys, runpy; sys.argv = ['ausnit', 'install', '--preset', 'Минимум', '--dry-run']\n" \
+            "try: runpy.run_module('ausnit', run_name='__main__')\nexcept SystemExit: pass\n" \
+            "print(sorted(m for m in sys.modules if m.split('.')[0] in ('ui', 'customtkinter', 'tkinter', 'PIL')), file=sys.stderr)"
+    _, p = _run(["-c", probe])
+    assert p.stderr.strip().endswith("[]"), p.stderr
+    with tempfile.TemporaryDirectory(prefix="ausnit_cli_") as tmp, fake_tools(FAKE_WINGET_DOWNLOAD_DELAY=0.2, FAKE_WINGET_INSTALL_DELAY=0.05, AUSNIT_CACHE_DIR=tmp):
+        elapsed, p = _run(["-m", "ausnit", "install", "--preset", "Работа", "--preset", "Минимум"])
+    events = [json.loads(line) for line in p.stdout.splitlines()]
+    plan, result = events[0], events[-1]
+    assert p.returncode == 0 and plan["state"] == "plan" and result["state"] == "result" and result["ok"], (p.returncode, p.stdout, p.stderr)
+    assert sorted(result["results"]) == sorted(plan["ids"]) and len(plan["ids"]) == 5
+    print(f"установка пресетов «Работа» + «Минимум» ({len(plan['ids'])} пакетов): {elapsed:.2f} s, событий JSON {len(events)}, код выхода {p.returncode}")
+    # Ctrl+C посреди зависшего установщика: конвейер останавливается, итог и код 130
+    with tempfile.TemporaryDirectory(prefix="ausnit_cli_") as tmp, fake_tools(FAKE_WINGET_HANG=1, AUSNIT_CACHE_DIR=tmp, TMPDIR=tmp):
+        p = subprocess.Popen([sys.executable, "-m", "ausnit", "install", "--no-cache", "Fake.Hang"], cwd=PROJECT_ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True, encoding="utf-8")
+        lines = []
+        for line in p.stdout:
+            lines.append(json.loads(line))
+            if lines[-1].get("state") == "installing": break
+        time.sleep(0.3); t0 = time.perf_counter(); p.send_signal(signal.SIGINT)
+        lines += [json.loads(line) for line in p.stdout]; code = p.wait(10); elapsed = time.perf_counter() - t0
+        states = [e["state"] for e in lines]
+        assert code == 130 and states[-2:] == ["summary", "result"] and lines[-1]["cancelled"], (code, states)
+        assert not [n for n in os.listdir(tmp) if n.startswith("ausnit_dl_")], os.listdir(tmp)
+        leftovers = subprocess.run(["pgrep", "-f", f"sleep {HANG_SECONDS}"], capture_output=True, text=True).stdout.split()
+        assert not leftovers, leftovers
+    print(f"Ctrl+C во время установки: код {code}, события до итога: {' -> '.join(states[1:])}, остановка {elapsed * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
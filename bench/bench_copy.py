@@ -0,0 +1,66 @@
+# bench/bench_copy.py
+"""
+Конвейер backend.copier против последовательной записи тем же потоком.
+
+1) Реальный образ make_iso: IsoImage.extract (последовательно) и copy_files.
+2) Источник с задержкой чтения (как ISO на HDD/сетевом диске, по умолчанию
+   200 MB/s): здесь видно, как упреждающее чтение прячет время записи.
+Плюс время проверки записи.  Запуск: python bench/bench_copy.py [MB] [MB/s источника]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from make_iso import write_iso
+from backend.copier import CopyJob, copy_files
+from backend.isoimage import IsoImage
+
+CHUNK = 1024 * 1024
+
+def _slow_chunks(size, rate, block):
+    for off in range(0, size, CHUNK):
+        n = min(CHUNK, size - off)
+        time.sleep(n / rate)
+        yield block[:n]
+
+def _sequential(jobs, target):
+    t0 = time.perf_counter()
+    for job in jobs:
+        dest = os.path.join(target, *job.path.split("/")); os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with open(dest, "wb") as out:
+            for chunk in job.chunks(): out.write(chunk)
+    return time.perf_counter() - t0
+
+def main():
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    source_rate = float(sys.argv[2]) if len(sys.argv) > 2 else 200
+    with tempfile.TemporaryDirectory(prefix="ausnit_copy_") as tmp:
+        iso = os.path.join(tmp, "win.iso")
+        files = {"sources/install.wim": size_mb * 1024 * 1024, "sources/boot.wim": size_mb * 1024 * 1024 // 8}
+        files.update({f"sources/lang/file{i}.mui": 4096 + i * 37 % 60000 for i in range(1000)})
+        write_iso(iso, files)
+        with IsoImage(iso) as image:
+            entries = image.entries()
+            t0 = time.perf_counter(); image.extract(os.path.join(tmp, "seq")); seq = time.perf_counter() - t0
+            jobs = [CopyJob(e.path, e.size, partial(image.iter_chunks, e), e.mtime) for e in entries if not e.is_dir]
+            dirs = [e.path for e in entries if e.is_dir]
+            plain = copy_files(jobs, os.path.join(tmp, "pipe"), dirs=dirs)
+            checked = copy_files(jobs, os.path.join(tmp, "pipe_verify"), dirs=dirs, verify=True)
+        print(f"образ в кэше:  extract {seq:.2f} s, copy_files {plain['seconds']:.2f} s ({plain['mb_per_s']:.0f} MB/s), "
+              f"с хэшами {checked['seconds']:.2f} s + проверка {checked['verify_seconds']:.2f} s, несовпадений {len(checked['mismatched'])}")
+        for name in ("seq", "pipe", "pipe_verify"): shutil.rmtree(os.path.join(tmp, name))
+
+        block = os.urandom(CHUNK); rate = source_rate * 1024 * 1024
+        sizes = {"install.wim": size_mb * CHUNK, "boot.wim": size_mb * CHUNK // 8, **{f"lang/f{i}.mui": 20000 for i in range(500)}}
+        slow = [CopyJob(p, n, partial(_slow_chunks, n, rate, block)) for p, n in sizes.items()]
+        seq = _sequential(slow, os.path.join(tmp, "seq_slow"))
+        stats = copy_files(slow, os.path.join(tmp, "pipe_slow"))
+        print(f"источник {source_rate:.0f} MB/s: последовательно {seq:.2f} s, конвейер {stats['seconds']:.2f} s "
+              f"(выигрыш {seq - stats['seconds']:.2f} s, {seq / stats['seconds']:.2f}x)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# bench/bench_delta.py
+"""
+Дельта-обновление флешки: полная запись образа, затем «накопительное
+обновление» (часть файлов изменена, часть добавлена и удалена) поверх
+с манифестом.  Хэши нового образа считаются один раз — третий прогон
+берёт их из кэша.  Запуск: python bench/bench_delta.py [MB в install.wim]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from make_iso import write_iso
+
+def main():
+    wim_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    with tempfile.TemporaryDirectory(prefix="ausnit_delta_") as tmp:
+        os.environ["XDG_CACHE_HOME"] = os.path.join(tmp, "cache")  # кэш хэшей — во временной папке
+        from backend.osbuilder import build_usb
+        from backend.usbmanifest import MANIFEST_NAME, load
+        base = {"sources/install.wim": os.urandom(wim_mb * 1024 * 1024), "sources/boot.wim": os.urandom(64 * 1024 * 1024)}
+        base.update({f"sources/lang/f{i}.mui": os.urandom(8192 + i % 4096) for i in range(1500)})
+        update = dict(base)
+        update["sources/boot.wim"] = os.urandom(64 * 1024 * 1024)          # изменился
+        for i in range(0, 1500, 10): update[f"sources/lang/f{i}.mui"] = os.urandom(9000)
+        for i in range(1500, 1600): update[f"sources/lang/f{i}.mui"] = os.urandom(8192)  # добавились
+        for i in range(1, 100, 10): del update[f"sources/lang/f{i}.mui"]     # удалились
+        iso_a, iso_b = os.path.join(tmp, "a.iso"), os.path.join(tmp, "b.iso")
+        write_iso(iso_a, base); write_iso(iso_b, update)
+        usb = os.path.join(tmp, "usb")
+        events = []
+        def run(iso, label):
+            events.clear()
+            t0 = time.perf_counter(); ok = build_usb({"iso": iso, "drive": usb}, on_event=events.append); elapsed = time.perf_counter() - t0
+            summary = next(e for e in events if e["state"] == "summary")
+            assert ok, f"{label}: build_usb вернул ошибку"
+            print(f"{label:34} {elapsed:6.2f} s: записано {summary['files']:5} файлов / {summary['bytes'] / 1024**2:6.0f} MB, "
+                  f"без изменений {summary['skipped']}, удалено {summary['removed']}")
+            return elapsed
+        full = run(iso_a, "полная запись A")
+        delta = run(iso_b, "обновление до B (хэши считаются)")
+        os.remove(os.path.join(usb, MANIFEST_NAME)); run(iso_a, "полная запись A заново")
+        cached = run(iso_b, "обновление до B (хэши из кэша)")
+        files = load(usb)
+        for path, (size, _) in files.items():
+            assert os.path.getsize(os.path.join(usb, *path.split("/"))) == size
+        assert not any(os.path.exists(os.path.join(usb, "sources", "lang", f"f{i}.mui")) for i in range(1, 100, 10))
+        print(f"обновление: {delta / full * 100:.0f}% времени полной записи, с кэшем хэшей {cached / full * 100:.0f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# bench/bench_drivers.py
+"""
+Индекс драйверов backend.driverstore на дереве сгенерированных INF (по
+умолчанию 3000 пакетов, часть в UTF-16 и с декорациями платформ): полная
+индексация, повторная без изменений и с одним изменённым INF, подбор для
+~200 устройств и проверка ранжирования на заготовленных случаях.
+Запуск: python bench/bench_drivers.py [число INF]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from backend.driverstore import DriverIndex, parse_devices
+
+INF = """; {name}.inf — сгенерировано для замера
+[Version]
+Signature="$WINDOWS NT$"
+Class={cls}
+Provider=%Vendor%
+DriverVer={date},{version}
+{catalog}
+[Manufacturer]
+%Vendor% = Models,NTamd64,NTarm64.10.0...19041
+
+[Models.NTamd64]
+{models}
+
+[Models.NTarm64.10.0...19041]
+%Arm.Desc% = ArmInstall, ARM\\ONLY_{n:05}
+
+[Strings]
+Vendor="{vendor}"
+Arm.Desc="ARM-only device"
+{strings}
+"""
+
+def write_inf(path, name, vendor, cls, date, version, models, signed=True, utf16=False):
+    """ models — [(описание, [ID...])]. """
+    lines = [f"%Dev{i}.Desc% = Install{i}, " + ", ".join(ids) for i, (_, ids) in enumerate(models)]
+    strings = [f'Dev{i}.Desc="{desc}"' for i, (desc, _) in enumerate(models)]
+    text = INF.format(name=name, cls=cls, date=date, version=version, catalog=f"CatalogFile={name}.cat" if signed else "",
+                      models="\n".join(lines), vendor=vendor, strings="\n".join(strings), n=abs(hash(name)) % 100000)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"\xff\xfe" + text.encode("utf-16-le") if utf16 else text.encode("utf-8"))
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    rnd = random.Random(1)
+    with tempfile.TemporaryDirectory(prefix="ausnit_drivers_") as tmp:
+        store = os.path.join(tmp, "store")
+        devices = []
+        for n in range(count):
+            ven, dev = 0x1000 + n % 400, 0x2000 + n
+            ids = [f"PCI\\VEN_{ven:04X}&DEV_{dev:04X}&SUBSYS_{rnd.randrange(1 << 32):08X}", f"PCI\\VEN_{ven:04X}&DEV_{dev:04X}"]
+            models = [(f"Device {dev:04X}", ids)] + [(f"Device {dev:04X} rev {r}", [f"PCI\\VEN_{ven:04X}&DEV_{dev:04X}&REV_{r:02X}"]) for r in range(rnd.randrange(1, 20))]
+            write_inf(os.path.join(store, f"vendor{ven:04X}", f"drv{n:05}", f"drv{n:05}.inf"), f"drv{n:05}", f"Vendor {ven:04X}", "Net",
+                      f"{rnd.randrange(1, 13):02}/{rnd.randrange(1, 28):02}/20{rnd.randrange(15, 25)}", f"1.0.{n}.0", models, utf16=n % 3 == 0)
+            if n % 15 == 0:
+                devices.append({"DeviceID": f"PCI\\VEN_{ven:04X}&DEV_{dev:04X}\\{n}", "Name": f"Device {dev:04X}",
+                                "HardwareID": [ids[0], ids[1] + "&REV_01", ids[1]], "CompatibleID": ["PCI\\CC_0200", "PCI\\CC_02"]})
+        # Заготовленные случаи ранжирования для одного сетевого адаптера
+        hw = ["PCI\\VEN_8086&DEV_15F3&SUBSYS_00008086&REV_03", "PCI\\VEN_8086&DEV_15F3&SUBSYS_00008086", "PCI\\VEN_8086&DEV_15F3"]
+        case = lambda name, **kw: write_inf(os.path.join(store, "cases", name, f"{name}.inf"), name, "Intel", "Net", **kw)
+        case("generic", date="01/01/2024", version="1.0.0.0", models=[("Generic Ethernet", ["PCI\\GENERIC", "PCI\\CC_0200"])])
+        case("exact_old", date="03/01/2019", version="12.0.0.0", models=[("Intel I225-V (2019)", [hw[1]])])
+        case("exact_new", date="06/15/2023", version="14.1.0.0", models=[("Intel I225-V", [hw[1]])], utf16=True)
+        case("exact_unsigned", date="01/01/2025", version="99.0.0.0", models=[("Intel I225-V (mod)", [hw[1]])], signed=False)
+        case("family", date="01/01/2025", version="20.0.0.0", models=[("Intel Ethernet family", [hw[2]])])
+        devices.append({"DeviceID": "PCI\\VEN_8086&DEV_15F3\\1", "Name": "Ethernet Controller", "HardwareID": hw, "CompatibleID": ["PCI\\CC_0200"]})
+        devices.append({"DeviceID": "PCI\\VEN_FFFF&DEV_0001\\1", "Name": "Unknown Ethernet", "HardwareID": ["PCI\\VEN_FFFF&DEV_0001"], "CompatibleID": ["PCI\\CC_0200"]})
+        devices.append({"DeviceID": "ROOT\\NOTHING\\0", "Name": "No driver", "HardwareID": ["ROOT\\NOTHING"]})
+        import json
+        devices = parse_devices(json.dumps(devices))
+
+        db = os.path.join(tmp, "drivers.sqlite")
+        index = DriverIndex(db, arch="amd64")
+        t0 = time.perf_counter(); stats = index.scan(store); full = time.perf_counter() - t0
+        ids = index.db.execute("SELECT count(*) FROM ids").fetchone()[0]
+        print(f"индексация {stats['added']} INF ({ids} ID): {full:.2f} s")
+        index.close()
+        index = DriverIndex(db, arch="amd64")
+        t0 = time.perf_counter(); again = index.scan(store); rescan = time.perf_counter() - t0
+        assert again["unchanged"] == stats["added"] and not again["added"], again
+        changed = os.path.join(store, "cases", "exact_old", "exact_old.inf")
+        with open(changed, "a", encoding="utf-8") as f: f.write("; правка\n")
+        t0 = time.perf_counter(); once = index.scan(store); one = time.perf_counter() - t0
+        assert once["updated"] == 1, once
+        print(f"повторно без изменений: {rescan * 1000:.0f} ms, с одним изменённым INF: {one * 1000:.0f} ms")
+
+        t0 = time.perf_counter(); found = index.match(devices); matched = time.perf_counter() - t0
+        print(f"подбор для {len(devices)} устройств: {matched * 1000:.1f} ms, найдено {len(found)}")
+        best = found["PCI\\VEN_8086&DEV_15F3\\1"]
+        assert best["description"] == "Intel I225-V" and best["rank"] == 1, best  # точный ID, подписан, новее 2019 года
+        ranks = [(m["description"], hex(m["rank"])) for m in index.candidates(devices[-3])]
+        print("  кандидаты Ethernet Controller:", ", ".join(f"{d} {r}" for d, r in ranks))
+        assert [d for d, _ in ranks] == ["Intel I225-V", "Intel I225-V (2019)", "Intel Ethernet family", "Generic Ethernet", "Intel I225-V (mod)"], ranks
+        assert found["PCI\\VEN_FFFF&DEV_0001\\1"]["description"] == "Generic Ethernet"
+        assert "ROOT\\NOTHING\\0" not in found
+        assert all(m["description"].startswith("Device") for k, m in found.items() if k.startswith("PCI\\VEN_1") or k.startswith("PCI\\VEN_2"))
+        assert not index.db.execute("SELECT 1 FROM ids WHERE hwid LIKE 'ARM%'").fetchone()  # секции другой платформы не индексируются
+        index.close()
+
+if __name__ == "__main__":
+    main()
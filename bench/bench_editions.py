@@ -0,0 +1,35 @@
+# bench/bench_editions.py
+"""
+Список редакций Windows из ISO без распаковки install.wim: читаются только
+заголовок WIM и его XML прямо из образа.  Второй вызов для того же файла
+идёт из кэша.  Запуск: python bench/bench_editions.py [MB в WIM]
+"""
+import os
+import sys
+import tempfile
+import time
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from make_iso import write_iso
+from make_wim import write_wim
+from backend.osbuilder import list_editions, make_unattend
+
+def main():
+    wim_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    with tempfile.TemporaryDirectory(prefix="ausnit_editions_") as tmp:
+        wim = os.path.join(tmp, "install.wim")
+        write_wim(wim, [1024 * 1024] * wim_mb, images=4)
+        with open(wim, "rb") as f: content = f.read()
+        iso = os.path.join(tmp, "win.iso")
+        write_iso(iso, {"sources/install.wim": content, **{f"sources/lang/f{i}.mui": 8192 for i in range(1500)}})
+        del content
+        t0 = time.perf_counter(); editions = list_editions(iso); cold = time.perf_counter() - t0
+        t0 = time.perf_counter(); again = list_editions(iso); warm = time.perf_counter() - t0
+        assert again is editions and len(editions) == 4
+        for e in editions:
+            print(f"  {e['index']}: {e['name']} ({e['edition']}, {e['arch']}, {e['default_language']}, {e['build']}, {e['size'] / 1024**3:.1f} GB)")
+        print(f"ISO {os.path.getsize(iso) / 1024**2:.0f} MB: редакции за {cold * 1000:.1f} ms, повторно {warm * 1000:.3f} ms")
+        assert "<Value>2</Value>" in make_unattend({"image_index": editions[1]["index"]})
+
+if __name__ == "__main__":
+    main()
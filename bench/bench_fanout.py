@@ -0,0 +1,82 @@
+# bench/bench_fanout.py
+"""
+Веерная запись одного образа на N дисков (папок): copy_to_many против N
+прогонов copy_files.  Считается, сколько байт прочитано из образа, и
+проверяется изоляция отказов: одна «флешка» — файл вместо папки (отказ
+сразу), у другой на месте sources/boot.wim папка (отказ посреди записи).
+Затем build_usb_many с дельтой: часть дисков уже содержит прошлую сборку.
+Запуск: python bench/bench_fanout.py [число дисков] [MB в install.wim]
+"""
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from functools import partial
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from make_iso import write_iso
+
+def _counted(chunks, counter):
+    for chunk in chunks():
+        counter[0] += len(chunk); yield chunk
+
+def _sha(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""): digest.update(block)
+    return digest.hexdigest()
+
+def main():
+    drives = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    wim_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 256
+    with tempfile.TemporaryDirectory(prefix="ausnit_fanout_") as tmp:
+        os.environ["XDG_CACHE_HOME"] = os.path.join(tmp, "cache")
+        from backend.copier import CopyJob, copy_files, copy_to_many
+        from backend.isoimage import IsoImage
+        from backend.osbuilder import build_usb_many
+        files = {"sources/install.wim": wim_mb * 1024 * 1024, "sources/boot.wim": 32 * 1024 * 1024}
+        files.update({f"sources/lang/f{i}.mui": 4096 + i * 37 % 60000 for i in range(500)})
+        iso_path = os.path.join(tmp, "win.iso")
+        digests = write_iso(iso_path, files)
+        size = sum(files.values())
+
+        with IsoImage(iso_path) as iso:
+            entries = iso.entries(); dirs = [e.path for e in entries if e.is_dir]
+            counter = [0]
+            jobs = [CopyJob(e.path, e.size, partial(_counted, partial(iso.iter_chunks, e), counter), e.mtime) for e in entries if not e.is_dir]
+            t0 = time.perf_counter()
+            for i in range(drives): copy_files(jobs, os.path.join(tmp, "seq", str(i)), dirs=dirs)
+            seq, seq_read = time.perf_counter() - t0, counter[0]
+            targets = [os.path.join(tmp, "fan", str(i)) for i in range(drives)]
+            broken_now, broken_later = os.path.join(tmp, "fan", "not_a_dir"), os.path.join(tmp, "fan", "bad_file")
+            os.makedirs(os.path.join(broken_later, "sources", "boot.wim")); open(broken_now, "w").close()
+            counter[0] = 0; t0 = time.perf_counter()
+            results = copy_to_many(jobs, targets + [broken_now, broken_later], dirs=dirs)
+            fan, fan_read = time.perf_counter() - t0, counter[0]
+            t0 = time.perf_counter()
+            checked = copy_to_many(jobs, [os.path.join(tmp, "fan_verify", str(i)) for i in range(drives)], dirs=dirs, verify=True)
+            fan_verify = time.perf_counter() - t0
+        print(f"{drives} дисков по {size / 1024**2:.0f} MB: по очереди {seq:.2f} s (прочитано {seq_read / 1024**2:.0f} MB), "
+              f"веером {fan:.2f} s (прочитано {fan_read / 1024**2:.0f} MB), веером с проверкой {fan_verify:.2f} s")
+        assert all(s["verified"] and not s["mismatched"] for s in checked.values())
+        for target in targets:
+            stats = results[target]
+            assert stats["error"] is None and stats["files"] == len(files), (target, stats)
+            assert all(_sha(os.path.join(target, *p.split("/"))) == d for p, d in digests.items()), target
+        for target in (broken_now, broken_later):
+            assert results[target]["error"], target
+            print(f"  отказ изолирован: {os.path.basename(target)}: {results[target]['error']}")
+
+        # Сборка с дельтой: половина дисков уже записана (манифест от прошлого прогона)
+        usb = [os.path.join(tmp, "usb", str(i)) for i in range(drives)]
+        assert all(build_usb_many({"iso": iso_path}, usb[:drives // 2]).values())
+        events = []
+        t0 = time.perf_counter(); ok = build_usb_many({"iso": iso_path, "verify": True}, usb, on_event=events.append); elapsed = time.perf_counter() - t0
+        assert all(ok.values()), ok
+        summary = {e["target"]: e for e in events if e["state"] == "summary"}
+        written = sorted(summary[d]["files"] for d in usb)
+        print(f"build_usb_many на {drives} дисков, {drives // 2} уже с образом: {elapsed:.2f} s, записано файлов по дискам {written}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,22 @@
+# bench/bench_install.py
+"""
+Сравнивает последовательную установку с конвейером download/install
+на поддельном winget.  Запуск: python bench/bench_install.py [кол-во пакетов]
+"""
+import sys
+import time
+
+from fakes import fake_tools
+from backend.install import install_sequential, install_pipeline
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 15
+    ids = [f"Fake.Package{i}" for i in range(count)]
+    with fake_tools(FAKE_WINGET_DOWNLOAD_DELAY=0.3, FAKE_WINGET_INSTALL_DELAY=0.2):
+        t0 = time.perf_counter(); seq = install_sequential(ids); t_seq = time.perf_counter() - t0
+        t0 = time.perf_counter(); pipe = install_pipeline(ids); t_pipe = time.perf_counter() - t0
+    assert all(seq.values()) and all(pipe.values()), "fake winget вернул ошибку"
+    print(f"sequential: {t_seq:.2f} s, pipeline: {t_pipe:.2f} s, выигрыш {t_seq - t_pipe:.2f} s ({t_seq / t_pipe:.1f}x)")
+
+if __name__ == "__main__":
+    main()
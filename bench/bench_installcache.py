@@ -0,0 +1,67 @@
+# bench/bench_installcache.py
+"""
+Кэш установщиков backend.installcache на поддельном winget: холодный прогон
+(всё качается), тёплый (всё из кэша), вторая «машина» с пустым кэшем,
+берущая установщики у первой по HTTP, и выселение LRU при малом лимите.
+Запуск: python bench/bench_installcache.py [кол-во пакетов] [задержка скачивания, с]
+"""
+import io
+import os
+import sys
+import tempfile
+import time
+
+from fakes import fake_tools
+from backend.install import install_pipeline
+from backend.installcache import InstallerCache, serve
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    delay = float(sys.argv[2]) if len(sys.argv) > 2 else 0.5
+    ids = [f"Fake.Package{i}" for i in range(count)]
+    events = []
+    def run(label, **kw):
+        events.clear()
+        t0 = time.perf_counter(); results = install_pipeline(ids, on_event=events.append, **kw); elapsed = time.perf_counter() - t0
+        assert all(results.values()) and len(results) == count, results
+        hits = sum(1 for e in events if e.get("cached"))
+        print(f"{label:34} {elapsed:5.2f} s, из кэша {hits}/{count}")
+        return elapsed, hits
+    with tempfile.TemporaryDirectory(prefix="ausnit_icache_") as tmp, fake_tools(FAKE_WINGET_DOWNLOAD_DELAY=delay, FAKE_WINGET_INSTALL_DELAY=0.05):
+        cache_a = InstallerCache(os.path.join(tmp, "a"))
+        cold, hits = run("машина A, пустой кэш", cache=cache_a, peers=[]); assert hits == 0
+        warm, hits = run("машина A, повторно", cache=cache_a, peers=[]); assert hits == count
+        server = serve(cache_a, host="127.0.0.1", port=0)
+        peer = f"http://127.0.0.1:{server.server_address[1]}"
+        cache_b = InstallerCache(os.path.join(tmp, "b"))
+        lan, hits = run("машина B, установщики у A по HTTP", cache=cache_b, peers=[peer]); assert hits == count
+        server.shutdown()
+        # Установщик — тот же объект; манифест машина B пишет сама по `winget show`
+        installer = lambda cache: [f for f in cache.lookup(ids[0])["files"] if not f["name"].endswith(".yaml")]
+        assert installer(cache_b) == installer(cache_a), installer(cache_b)
+        # Подменённая запись соседа (чужой хэш, путь в имени) не принимается
+        name = next(f["name"] for f in installer(cache_a))
+        bad = cache_a._put_object(io.BytesIO(b"#!/bin/sh\necho pwned\n"))
+        cache_a._add_entry("Fake.Evil", "", [{**bad, "name": name}])
+        cache_a._add_entry("Fake.Escape", "", [{**installer(cache_a)[0], "name": "../../escaped.exe"}])
+        server = serve(cache_a, host="127.0.0.1", port=0); peer = f"http://127.0.0.1:{server.server_address[1]}"
+        cache_c = InstallerCache(os.path.join(tmp, "c"))
+        for pkg in ("Fake.Evil", "Fake.Escape"):
+            assert cache_c.restore_or_fetch(pkg, os.path.join(tmp, "work", pkg), [peer]) is None, pkg
+        assert not os.path.exists(os.path.join(tmp, "escaped.exe"))
+        server.shutdown(); cache_c.close()
+        print("подменённые записи соседа отклонены")
+        # Одинаковые установщики всех пакетов (поддельный setup.exe) хранятся одним объектом
+        objects = cache_a.db.execute("SELECT count(*) FROM objects").fetchone()[0]
+        print(f"записей {count}, объектов {objects}, размер {cache_a.size} байт")
+        # LRU: пакет 0 только что использован, лимит на один объект — выселяются остальные
+        cache_a.restore(ids[0], os.path.join(tmp, "touch"))
+        per_entry = cache_a.db.execute("SELECT max(size) FROM entries").fetchone()[0]
+        freed = cache_a.evict(per_entry)
+        assert cache_a.lookup(ids[0]) is not None and cache_a.lookup(ids[1]) is None and cache_a.size <= per_entry
+        print(f"выселение до {per_entry} байт: освобождено {freed} байт, осталась запись {ids[0]}")
+        print(f"выигрыш тёплого кэша {cold - warm:.2f} s ({cold / warm:.1f}x), по сети {cold - lan:.2f} s")
+        cache_a.close(); cache_b.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# bench/bench_iso.py
+"""
+Распаковка ISO через backend.isoimage против сырого копирования файла образа
+тем же диском (потолок скорости).  Образ генерируется make_iso: один большой
+install.wim и пачка мелких файлов, как в дистрибутиве Windows.
+Запуск: python bench/bench_iso.py [размер install.wim в MB] [мелких файлов]
+"""
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from make_iso import write_iso
+from backend.isoimage import IsoImage
+from backend.osbuilder import build_usb, UNATTEND_NAME
+
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""): digest.update(block)
+    return digest.hexdigest()
+
+def main():
+    wim_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    small = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    files = {"sources/install.wim": wim_mb * 1024 * 1024, "setup.exe": 80 * 1024, "bootmgr": 400 * 1024}
+    files.update({f"sources/{'ru-ru' if i % 2 else 'en-us'}/file{i}.mui": 4096 + i * 37 % 60000 for i in range(small)})
+    with tempfile.TemporaryDirectory(prefix="ausnit_iso_") as tmp:
+        iso = os.path.join(tmp, "win.iso")
+        t0 = time.perf_counter(); digests = write_iso(iso, files, udf_extent_max=256 * 1024 * 1024); built = time.perf_counter() - t0
+        size_mb = os.path.getsize(iso) / 1024 / 1024
+        print(f"образ {size_mb:.0f} MB ({len(files)} файлов) собран за {built:.1f} s")
+
+        t0 = time.perf_counter(); shutil.copyfile(iso, os.path.join(tmp, "raw.copy")); raw = time.perf_counter() - t0
+        os.remove(os.path.join(tmp, "raw.copy"))
+        print(f"сырое копирование образа: {raw:.2f} s ({size_mb / raw:.0f} MB/s)")
+
+        for fs in ("udf", "joliet"):
+            target = os.path.join(tmp, f"usb_{fs}")
+            with IsoImage(iso, prefer=fs) as image:
+                t0 = time.perf_counter(); walked = len(image.entries()); walk = time.perf_counter() - t0
+                stats = image.extract(target)
+            print(f"{fs:7} обход {walked} записей {walk * 1000:.0f} ms, распаковка {stats['seconds']:.2f} s ({stats['mb_per_s']:.0f} MB/s, {stats['mb_per_s'] / (size_mb / raw) * 100:.0f}% от сырого)")
+            bad = [p for p, h in digests.items() if _sha256(os.path.join(target, *p.split("/"))) != h]
+            assert not bad, f"{fs}: содержимое не совпало: {bad[:3]}"
+            shutil.rmtree(target)
+
+        target = os.path.join(tmp, "usb"); os.makedirs(target)
+        assert build_usb({"iso": iso, "drive": target}), "build_usb вернул ошибку"
+        assert os.path.exists(os.path.join(target, UNATTEND_NAME))
+        print("build_usb: образ и autounattend.xml на месте, хэши совпали")
+
+if __name__ == "__main__":
+    main()
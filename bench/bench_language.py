@@ -0,0 +1,37 @@
+# bench/bench_language.py
+"""
+Латентность смены языка при каталоге из 2000 программ: переименование
+вкладок и update_texts на месте против старой пересборки CTkTabview.
+Нужен дисплей.  Запуск: python bench/bench_language.py [кол-во программ]
+"""
+import sys
+import time
+import tkinter
+
+from fakes import fake_tools
+
+def synthetic_catalog(count, categories=6):
+    return {f"Category {c}": {f"App {c}-{i}": f"Vendor{c}.App{i}" for i in range(c, count, categories)} for c in range(categories)}
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    with fake_tools():
+        try:
+            from ui.main import App
+            class BenchApp(App):
+                def _load_data(self):
+                    super()._load_data(); self.programs_data = synthetic_catalog(count)
+            app = BenchApp()
+        except tkinter.TclError as e:
+            print(f"пропуск: нет дисплея ({e})")
+            return
+        app.update()
+        timings = []
+        for lang in ("EN", "KZ", "RU"):
+            t0 = time.perf_counter(); app.change_language(lang); app.update_idletasks(); timings.append(time.perf_counter() - t0)
+        t0 = time.perf_counter(); app.tabview.destroy(); app._create_tab_view(); app.update_idletasks(); rebuild = time.perf_counter() - t0
+        print(f"{count} программ: смена языка {max(timings) * 1000:.0f} ms (макс.), пересборка вкладок {rebuild * 1000:.0f} ms")
+        app.destroy()
+
+if __name__ == "__main__":
+    main()
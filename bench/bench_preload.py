@@ -0,0 +1,33 @@
+# bench/bench_preload.py
+"""
+Время run_all с «медленными» поддельными wmic/winget: пробы идут
+параллельно, поэтому время ≈ самой медленной пробе или общему сроку,
+а не сумме задержек.  Запуск: python bench/bench_preload.py
+"""
+import platform
+import time
+
+from fakes import fake_tools
+from backend import preload
+
+TOOLS = {"winget": "fake_winget.py", "wmic": "fake_wmic.py"}
+
+def _measure(deadline, **delays):
+    preload.RESULT.clear(); preload.DONE.clear()
+    with fake_tools(TOOLS, **delays):
+        t0 = time.perf_counter()
+        preload.run_all(deadline=deadline)
+        return time.perf_counter() - t0, list(preload.RESULT["specs"]["unknown"])
+
+def main():
+    wmic, winget = 1.0, 1.5
+    # wmic вызывается для baseboard и gpu, для CPU — если platform.processor() пуст
+    calls = 2 if platform.processor() else 3
+    serial = calls * wmic + winget
+    elapsed, unknown = _measure(10, FAKE_WMIC_DELAY=wmic, FAKE_WINGET_LIST_DELAY=winget)
+    print(f"задержки wmic {wmic} s ×{calls}, winget {winget} s: последовательно было бы ~{serial:.1f} s, run_all {elapsed:.2f} s, не успели: {unknown}")
+    elapsed, unknown = _measure(0.8, FAKE_WMIC_DELAY=wmic, FAKE_WINGET_LIST_DELAY=winget)
+    print(f"общий срок 0.8 s: run_all {elapsed:.2f} s, не успели: {unknown}")
+
+if __name__ == "__main__":
+    main()
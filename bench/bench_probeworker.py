@@ -0,0 +1,58 @@
+# bench/bench_probeworker.py
+"""
+Процесс на каждый запрос (wmic) против одного долгоживущего процесса проб
+(backend/probeworker.py) на поддельных bench/fake_wmic.py и bench/fake_probe_worker.py.
+Обе подделки — Python без задержек, так что разница — чистая цена запуска процесса;
+настоящий wmic поднимается заметно дольше.
+Запуск: python bench/bench_probeworker.py [запросов]
+"""
+import os
+import shlex
+import sys
+import threading
+import time
+
+from fakes import BENCH_DIR, fake_tools
+from backend import preload, probeworker
+
+def worker_env():
+    return {"AUSNIT_PROBE_WORKER": shlex.join([sys.executable, os.path.join(BENCH_DIR, "fake_probe_worker.py")])}
+
+def _per_query(fn, count):
+    t0 = time.perf_counter()
+    for _ in range(count): fn()
+    return (time.perf_counter() - t0) / count
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    with fake_tools({"wmic": "fake_wmic.py"}):
+        spawn = _per_query(lambda: preload._safe("wmic baseboard get Product,Manufacturer,Version,SerialNumber /format:list"), count)
+    print(f"wmic на запрос: {spawn * 1000:.1f} мс")
+
+    with fake_tools(**worker_env()):
+        t0 = time.perf_counter(); probeworker.cim("Win32_BaseBoard", ["Product"]); cold = time.perf_counter() - t0
+        warm = _per_query(lambda: probeworker.cim("Win32_BaseBoard", ["Product", "Manufacturer", "Version", "SerialNumber"]), count)
+        print(f"процесс проб: первый запрос (с запуском) {cold * 1000:.1f} мс, дальше {warm * 1000:.2f} мс на запрос ({spawn / warm:.0f}x)")
+
+        threads = [threading.Thread(target=lambda: [probeworker.cim("Win32_PnPEntity", ["DeviceID", "HardwareID"]) for _ in range(count)]) for _ in range(4)]
+        t0 = time.perf_counter()
+        for t in threads: t.start()
+        for t in threads: t.join()
+        print(f"4 потока x {count} запросов устройств через один процесс: {(time.perf_counter() - t0) * 1000:.0f} мс")
+
+        t0 = time.perf_counter(); specs = preload.collect_specs(deadline=10); elapsed = time.perf_counter() - t0
+        print(f"collect_specs через процесс проб: {elapsed * 1000:.0f} мс, устройств {len(specs['devices'])}, плата: {specs['baseboard_raw'].splitlines()[1]}")
+    probeworker.shutdown()
+    with fake_tools({"wmic": "fake_wmic.py", "powershell": "fake_powershell.py"}):
+        t0 = time.perf_counter(); preload.collect_specs(deadline=10); elapsed = time.perf_counter() - t0
+    print(f"collect_specs с процессом на запрос: {elapsed * 1000:.0f} мс")
+
+    # Процесс проб запускается, но сразу умирает: пробы откатываются к wmic, второй раз не запускается
+    with fake_tools({"wmic": "fake_wmic.py", "powershell": "fake_powershell.py"}, AUSNIT_PROBE_WORKER=shlex.join([sys.executable, "-c", "pass"])):
+        specs = preload.collect_specs(deadline=10)
+        assert "FAKE-B450" in specs["baseboard_raw"] and specs["devices"] and probeworker.get_worker() is None, specs
+    probeworker._unavailable = False
+    print(f"процесс проб умер сразу: откат к wmic, устройств {len(specs['devices'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# bench/bench_procs.py
+"""
+Присмотр за процессами (backend/procs.py) на поддельном winget:
+  - зависший установщик с «внуком»: через сколько отмена освобождает конвейер
+    и не остаётся ли живых процессов (прежде subprocess.run ждал установщик вечно);
+  - общий срок и срок тишины;
+  - поток прогресса: пиковая память построчного разбора против subprocess.run.
+Запуск: python bench/bench_procs.py
+"""
+import subprocess
+import threading
+import time
+import tracemalloc
+
+import psutil
+
+from fakes import fake_tools
+from fake_winget import HANG_SECONDS
+from backend import procs
+from backend.install import install_pipeline
+
+def _leftovers():
+    """ Живые «sleep HANG_SECONDS» — недобитые установщики и их внуки. """
+    found = []
+    for p in psutil.process_iter(["cmdline", "status"]):
+        cmdline = p.info["cmdline"] or []
+        if p.info["status"] != psutil.STATUS_ZOMBIE and cmdline[:1] == ["sleep"] and str(HANG_SECONDS) in cmdline:
+            found.append(p.pid)
+    return found
+
+def _cancel_after(delay, fn):
+    """ Запускает fn(cancel_event) в потоке, через delay жмёт «Отменить»; -> (задержка отмены, результат). """
+    cancel = threading.Event(); box = []
+    worker = threading.Thread(target=lambda: box.append(fn(cancel))); worker.start()
+    time.sleep(delay)
+    t0 = time.perf_counter(); cancel.set(); worker.join(10); latency = time.perf_counter() - t0
+    time.sleep(0.1)  # SIGKILL доставляется асинхронно
+    return latency, box[0] if box else None
+
+def bench_cancel():
+    events = []
+    def pipeline(cancel):
+        return install_pipeline(["Fake.Hang"], cancel_event=cancel, on_event=events.append)
+    with fake_tools(FAKE_WINGET_HANG=1):
+        latency, results = _cancel_after(1.0, pipeline)  # download ~0.2 с, дальше висит скачанный установщик
+        print(f"конвейер, висящий установщик + внук: отмена за {latency * 1000:.0f} мс, результат {results}, осталось процессов: {len(_leftovers())}")
+        latency, result = _cancel_after(0.5, lambda cancel: procs.run(["winget", "install", "--id", "Fake.Hang"], cancel_event=cancel))
+        print(f"winget install + внук: отмена за {latency * 1000:.0f} мс, статус {result.status}, осталось процессов: {len(_leftovers())}")
+
+def bench_deadlines():
+    with fake_tools(FAKE_WINGET_HANG=1):
+        r = procs.run(["winget", "install", "--id", "Fake.Hang"], timeout=0.5)
+        print(f"общий срок 0.5 с: {r.status} за {r.duration:.2f} с")
+    with fake_tools(FAKE_WINGET_DOWNLOAD_DELAY=HANG_SECONDS):
+        r = procs.run(["winget", "download", "--id", "Fake.Quiet", "-d", "/nonexistent"], idle_timeout=0.5)
+        print(f"тишина 0.5 с: {r.status} за {r.duration:.2f} с")
+    time.sleep(0.1)
+    assert not _leftovers(), "остались процессы после снятия по сроку"
+
+def bench_flood(lines=300_000):
+    cmd = ["winget", "download", "--id", "Fake.Flood", "-d", "/tmp/ausnit_flood"]
+    with fake_tools(FAKE_WINGET_FLOOD=lines):
+        for name, run in (("subprocess.run", lambda: subprocess.run(cmd, capture_output=True, text=True)), ("procs.run", lambda: procs.run(cmd))):
+            tracemalloc.start(); t0 = time.perf_counter(); run(); elapsed = time.perf_counter() - t0
+            peak = tracemalloc.get_traced_memory()[1]; tracemalloc.stop()
+            print(f"{lines} строк прогресса, {name}: {elapsed:.2f} с, пик памяти {peak / 1024 ** 2:.1f} МБ")
+
+def main():
+    print("коды:", {code: procs.classify(code, procs.INSTALL_CODES) for code in (0, 3010, 1641, 1603, 0x8A150061, 0x8A150109)})
+    bench_deadlines()
+    bench_cancel()
+    bench_flood()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# bench/bench_registry.py
+"""
+Установленные программы по снимку реестра (backend/registry.py) против `winget list`
+на поддельном winget.  Снимок — синтетический: N записей Uninstall, среди них
+программы каталога под настоящими DisplayName, обновления и системные компоненты.
+Запуск: python bench/bench_registry.py [записей]
+"""
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+
+from fakes import fake_tools
+from backend import preload, registry
+
+# Как программы каталога записаны в Uninstall на самом деле
+REAL_NAMES = [
+    ("Google Chrome", "Google LLC", "120.0.6099.130"), ("Mozilla Firefox (x64 ru)", "Mozilla", "121.0"),
+    ("7-Zip 23.01 (x64)", "Igor Pavlov", "23.01"), ("Notepad++ (64-bit x64)", "Notepad++ Team", "8.6"),
+    ("VLC media player", "VideoLAN", "3.0.20"), ("Telegram Desktop", "Telegram FZ-LLC", "4.13"),
+    ("Microsoft Visual Studio Code", "Microsoft Corporation", "1.85.1"), ("WinRAR 6.24 (64-bit)", "win.rar GmbH", "6.24.0"),
+    ("Microsoft 365 Apps for enterprise - ru-ru", "Microsoft Corporation", "16.0.17126.20132"),
+    ("NVIDIA Graphics Driver 546.33", "NVIDIA Corporation", "546.33"), ("Intel(R) Chipset Device Software", "Intel(R) Corporation", "10.1.19222"),
+    ("Realtek High Definition Audio Driver", "Realtek Semiconductor Corp.", "6.0.9235.1"),
+    ("Opera GX Stable 105.0", "Opera Software", "105.0"),  # не Opera.Opera
+    ("Google Update Helper", "Google LLC", "1.3.36"),       # не Chrome
+]
+
+def synthetic_snapshot(count):
+    entries = [{"hive": "HKLM", "key": f"{{{i:08X}-SYN}}", "DisplayName": f"Synthetic Product {i} ({i % 3}-bit)", "Publisher": f"Vendor {i % 211}",
+                "DisplayVersion": f"{i % 10}.{i % 7}"} for i in range(count)]
+    entries += [{"hive": "HKLM32", "key": name, "DisplayName": name, "Publisher": publisher, "DisplayVersion": version} for name, publisher, version in REAL_NAMES]
+    entries += [{"hive": "HKLM", "key": f"KB{i}", "DisplayName": f"Security Update for Google Chrome (KB{i})", "ParentKeyName": "Chrome", "Publisher": "Google LLC"} for i in range(50)]
+    entries += [{"hive": "HKLM", "key": f"SC{i}", "DisplayName": f"7-Zip Shell Extension {i}", "SystemComponent": 1} for i in range(50)]
+    return entries
+
+def naive_detect(known_ids, rules, entries):
+    """ Без раскладки по словам: каждое правило против каждой записи. """
+    compiled = []
+    for pid, names in known_ids.items():
+        rule = {k.lower(): v for k, v in rules.items()}.get(pid) or {"names": [re.escape(n.lower()) for n in names]}
+        compiled += [(re.compile(f"(?:{p})(?!\\w)", re.IGNORECASE), pid) for p in rule["names"]]
+    return {pid for e in entries if registry.visible(e) for pattern, pid in compiled if pattern.match(e["DisplayName"])}
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    known = preload._known_ids(); rules = preload._load_json(registry.RULES_PATH); entries = synthetic_snapshot(count)
+    t0 = time.perf_counter(); table = registry.RuleTable(known, rules); build = time.perf_counter() - t0
+    t0 = time.perf_counter(); result = registry.detect_installed(table, known, entries); detect = time.perf_counter() - t0
+    t0 = time.perf_counter(); naive_detect(known, rules, entries); naive = time.perf_counter() - t0
+    print(f"{len(entries)} записей: правила {build * 1000:.1f} мс, сопоставление {detect * 1000:.1f} мс (все правила подряд: {naive * 1000:.1f} мс)")
+    print("найдено:", ", ".join(sorted(result["installed_versions"])))
+    assert "opera.opera" not in result["installed_versions"] and len(result["installed_versions"]) == len(REAL_NAMES) - 2
+
+    with tempfile.TemporaryDirectory(prefix="ausnit_reg_") as tmp:
+        path = os.path.join(tmp, "snapshot.json")
+        with open(path, "w", encoding="utf-8") as f: json.dump(entries, f)
+        with fake_tools(AUSNIT_REGISTRY_SNAPSHOT=path, FAKE_WINGET_LIST_DELAY=2.0, FAKE_WINGET_LIST_ROWS=300):
+            t0 = time.perf_counter(); fast = preload.scan_registry_programs(); t_fast = time.perf_counter() - t0
+            t0 = time.perf_counter(); preload.scan_installed_programs(); t_winget = time.perf_counter() - t0
+    print(f"установленные: по реестру (чтение снимка + сопоставление) {t_fast * 1000:.0f} мс, winget list {t_winget * 1000:.0f} мс; по реестру найдено {len(fast['installed_versions'])}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+# bench/bench_scan.py
+"""
+Сопоставление `winget list` с каталогом: старый вложенный цикл с поиском
+подстроки против разбора таблицы и хэш-индекса по ID.
+Запуск: python bench/bench_scan.py [строк в выводе winget list]
+"""
+import sys
+import time
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from fake_winget import render_table, synthetic_rows
+from backend.preload import match_installed
+
+def legacy_scan(known_ids, out):
+    """ Алгоритм до индекса: O(строк × каталог), подстрочное совпадение. """
+    installed_names = set()
+    for line in out.splitlines():
+        line_lower = line.lower()
+        for pid, names in known_ids.items():
+            if pid in line_lower:
+                installed_names.add(names[0].lower())
+                break
+    return installed_names
+
+def _timed(fn, *args):
+    t0 = time.perf_counter(); result = fn(*args); return result, time.perf_counter() - t0
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    out = render_table(synthetic_rows(lines))
+    for catalog_size in (40, 500, 5000):
+        # Половина каталога установлена, половина — нет
+        known = {f"vendor{i % 97}.app{i}".lower() if i % 2 == 0 else f"other.pkg{i}": [f"App {i}"] for i in range(catalog_size)}
+        legacy, t_legacy = _timed(legacy_scan, known, out)
+        indexed, t_indexed = _timed(match_installed, known, out)
+        print(f"{lines} строк × {catalog_size} ID: legacy {t_legacy * 1000:.1f} ms ({len(legacy)} найдено), "
+              f"index {t_indexed * 1000:.1f} ms ({len(indexed['installed_list_raw'])} найдено, {len(indexed['outdated'])} с обновлением)")
+
+if __name__ == "__main__":
+    main()
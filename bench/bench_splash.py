@@ -0,0 +1,74 @@
+# bench/bench_splash.py
+"""
+Картинка заставки: прежний путь (intro.png 2400x1350 + LANCZOS при каждом запуске)
+против ui/assets.py — запечённый вариант, кэш готового bitmap для масштаба без
+варианта.  Каждый замер — в новом процессе, как при настоящем запуске.
+С дисплеем дополнительно меряется время до первого кадра SplashScreen.
+Запуск: python bench/bench_splash.py [повторов]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from fakes import PROJECT_ROOT
+
+# Код замера в свежем процессе: печатает JSON {"image_ms": ..., "paint_ms": ...}.
+# Для "legacy" заставке подсовывается прежняя загрузка, чтобы первый кадр сравнивался честно
+_PROBE = r"""
+import json, os, sys, time
+sys.path.insert(0, {root!r})
+mode, scale = sys.argv[1], float(sys.argv[2])
+from PIL import Image
+from ui import assets  # импорт одинаков для обоих путей и в замер не входит
+t0 = time.perf_counter()
+if mode == "legacy":
+    img = Image.open(os.path.join({root!r}, "assets", "intro.png")).resize((720, 480), Image.Resampling.LANCZOS)
+else:
+    img = assets.load_image("assets/intro.png", (720, 480), scale)
+image_ms = (time.perf_counter() - t0) * 1000
+paint_ms = None
+try:
+    import customtkinter as ctk
+    t1 = time.perf_counter()
+    root = ctk.CTk(); root.withdraw()
+    if mode == "legacy":
+        import ui.splash as splash
+        class _Legacy:
+            @staticmethod
+            def load_image(asset, size, scale):
+                return Image.open(os.path.join({root!r}, asset)).resize(size, Image.Resampling.LANCZOS)
+        splash.assets = _Legacy
+    from ui.splash import SplashScreen
+    s = SplashScreen(root); s.update_idletasks(); s.update()
+    paint_ms = (time.perf_counter() - t1) * 1000
+except Exception as e:
+    paint_ms = "skipped: " + str(e).splitlines()[0]
+print(json.dumps({{"image_ms": image_ms, "paint_ms": paint_ms}}))
+"""
+
+def _run(mode, scale, env):
+    out = subprocess.run([sys.executable, "-c", _PROBE.format(root=PROJECT_ROOT), mode, str(scale)],
+                         capture_output=True, text=True, env=env, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+def _best(runs):
+    paint = [r["paint_ms"] for r in runs if isinstance(r["paint_ms"], (int, float))]
+    return min(r["image_ms"] for r in runs), (min(paint) if paint else runs[-1]["paint_ms"])
+
+def main():
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    with tempfile.TemporaryDirectory(prefix="ausnit_splash_") as cache_home:
+        env = {**os.environ, "XDG_CACHE_HOME": cache_home, "LOCALAPPDATA": cache_home}
+        cases = [("прежний путь (открыть + LANCZOS)", "legacy", 1.0), ("запечённый вариант 100 %", "assets", 1.0),
+                 ("запечённый вариант 150 %", "assets", 1.5)]
+        for title, mode, scale in cases:
+            image, paint = _best([_run(mode, scale, env) for _ in range(repeat)])
+            print(f"{title:40} картинка {image:6.1f} мс, до первого кадра: {paint if isinstance(paint, str) else f'{paint:.1f} мс'}")
+        cold = _run("assets", 1.1, env)  # масштаба 110 % нет среди вариантов: первый запуск пересчитывает и кладёт в кэш
+        warm, _ = _best([_run("assets", 1.1, env) for _ in range(repeat)])
+        print(f"{'масштаб 110 % без варианта':40} первый запуск {cold['image_ms']:.1f} мс, дальше из кэша {warm:.1f} мс")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# bench/bench_ui_log.py
+"""
+Поток из фонового потока 10k строк лога через UiDispatcher: замеряем
+максимальную задержку главного цикла (отзывчивость) и число строк
+в textbox в конце (память ограничена LOG_LIMIT). Нужен дисплей.
+Запуск: python bench/bench_ui_log.py [строк]
+"""
+import sys
+import threading
+import time
+import tkinter
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    try:
+        import customtkinter as ctk
+        root = ctk.CTk()
+    except tkinter.TclError as e:
+        print(f"пропуск: нет дисплея ({e})")
+        return
+    from ui.dispatch import UiDispatcher, LOG_LIMIT
+    dispatcher = UiDispatcher(root)
+    textbox = ctk.CTkTextbox(root, state="disabled"); textbox.pack(fill="both", expand=True)
+    bar = ctk.CTkProgressBar(root); bar.pack(fill="x")
+    gaps = []; state = {"last": time.perf_counter(), "done": False}
+
+    def heartbeat():
+        now = time.perf_counter(); gaps.append(now - state["last"]); state["last"] = now
+        if state["done"]: root.quit()
+        else: root.after(10, heartbeat)
+
+    def worker():
+        for i in range(lines):
+            dispatcher.log(textbox, f"line {i}: установка пакета Fake.Package{i}")
+            dispatcher.progress(bar, (i + 1) / lines)
+        time.sleep(0.2)
+        state["done"] = True
+
+    t0 = time.perf_counter()
+    threading.Thread(target=worker, daemon=True).start()
+    root.after(10, heartbeat); root.mainloop()
+    total_lines = int(textbox.index("end-1c").split(".")[0]) - 1
+    print(f"{lines} строк за {time.perf_counter() - t0:.2f} s, макс. задержка цикла {max(gaps) * 1000:.0f} ms, "
+          f"строк в textbox {total_lines} (лимит {LOG_LIMIT})")
+    root.destroy()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+# bench/bench_wim_split.py
+"""
+FAT32-режим сборки: install.wim больше предела разбивается на .swm прямо
+в конвейере копирования (из ISO на флешку), без отдельного прохода.
+Пределы уменьшены, чтобы хватало небольшого образа: файл > max_file
+делится на части по part_limit.  Сравнивается со временем простого
+копирования того же образа в NTFS-режиме.
+Запуск: python bench/bench_wim_split.py [MB в WIM] [MB предел части]
+"""
+import os
+import sys
+import tempfile
+
+import fakes  # noqa: F401  (добавляет корень проекта в sys.path)
+from make_iso import write_iso
+from make_wim import check_split, write_wim
+from backend.copier import copy_files
+from backend.isoimage import IsoImage
+from backend.osbuilder import image_jobs
+
+MB = 1024 * 1024
+
+def main():
+    wim_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 512
+    part_mb = int(sys.argv[2]) if len(sys.argv) > 2 else 150
+    with tempfile.TemporaryDirectory(prefix="ausnit_wim_") as tmp:
+        wim = os.path.join(tmp, "install.wim")
+        sizes = [(i * 7919 % 4096 + 1) * 1024 for i in range(4000)]
+        scale = wim_mb * MB / sum(sizes); sizes = [max(1, int(s * scale)) for s in sizes]
+        expected = write_wim(wim, sizes)
+        with open(wim, "rb") as f: content = f.read()
+        iso = os.path.join(tmp, "win.iso")
+        write_iso(iso, {"sources/install.wim": content, "setup.exe": 80 * 1024})
+        del content
+        with IsoImage(iso) as image:
+            entries = image.entries(); dirs = [e.path for e in entries if e.is_dir]
+            plain = copy_files(image_jobs(image, entries, "NTFS"), os.path.join(tmp, "ntfs"), dirs=dirs)
+            jobs = image_jobs(image, entries, "FAT32", max_file=part_mb * MB, part_limit=part_mb * MB)
+            split = copy_files(jobs, os.path.join(tmp, "fat32"), dirs=dirs)
+        target = os.path.join(tmp, "fat32", "sources")
+        parts = sorted((p for p in os.listdir(target) if p.endswith(".swm")), key=lambda p: (len(p), p))
+        check_split([os.path.join(target, p) for p in parts], expected, part_mb * MB)
+        print(f"WIM {os.path.getsize(wim) / MB:.0f} MB, {len(expected)} ресурсов -> {len(parts)} частей: {', '.join(parts)}")
+        print(f"копирование NTFS {plain['seconds']:.2f} s, FAT32 с разбиением {split['seconds']:.2f} s; части проверены (SHA-1 всех ресурсов)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+# bench/fake_powershell.py
+"""
+Поддельный powershell: на запрос Win32_PnPEntity (проба устройств backend/preload.py)
+отдаёт JSON с FAKE_DEVICES устройствами.  Задержка — FAKE_POWERSHELL_DELAY (секунды).
+"""
+import json
+import os
+import sys
+import time
+
+def synthetic_devices(count=None):
+    """ Win32_PnPEntity в том виде, в каком его отдаёт ConvertTo-Json. """
+    count = int(os.environ.get("FAKE_DEVICES", "40")) if count is None else count
+    return [{"DeviceID": f"PCI\\VEN_8086&DEV_{i:04X}\\3&11583659&0&{i:02X}", "Name": f"Fake Device {i}",
+             "HardwareID": [f"PCI\\VEN_8086&DEV_{i:04X}&SUBSYS_{i:08X}", f"PCI\\VEN_8086&DEV_{i:04X}"], "CompatibleID": ["PCI\\CC_0200"]}
+            for i in range(count)]
+
+def main(args):
+    time.sleep(float(os.environ.get("FAKE_POWERSHELL_DELAY", "0") or 0))
+    if "win32_pnpentity" not in " ".join(args).lower():
+        print("fake powershell: unsupported command", file=sys.stderr)
+        return 1
+    print(json.dumps(synthetic_devices()))
+    return 0
+
+if __name__ == "__main__":
+    try: sys.exit(main(sys.argv[1:]))
+    except BrokenPipeError: sys.exit(0)  # вызывающий не дождался (общий срок проб) и закрыл канал
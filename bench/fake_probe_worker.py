@@ -0,0 +1,51 @@
+# bench/fake_probe_worker.py
+"""
+Поддельный процесс проб (backend/probeworker.py) для Linux: тот же протокол —
+JSON по строке, — и те же классы, что спрашивает backend/preload.py.
+Запуск процесса — FAKE_PROBE_START_DELAY, каждый запрос — FAKE_PROBE_DELAY (секунды).
+Печатает баннер до первого ответа, как PowerShell с профилем: клиент должен его пропустить.
+"""
+import json
+import os
+import sys
+import time
+
+from fake_powershell import synthetic_devices
+
+_CLASSES = {
+    "win32_processor": lambda: [{"Name": "Fake CPU @ 3.00GHz"}],
+    "win32_baseboard": lambda: [{"Manufacturer": "Fake Inc.", "Product": "FAKE-B450", "SerialNumber": "0000", "Version": "1.0"}],
+    "win32_videocontroller": lambda: [{"Name": "Fake GPU 1080"}],
+    "win32_pnpentity": synthetic_devices,
+}
+
+def _delay(name):
+    return float(os.environ.get(name, "0") or 0)
+
+def answer(request):
+    op = request.get("op")
+    if op == "ping": return "pong"
+    if op == "cim":
+        rows = _CLASSES.get(str(request.get("class", "")).lower())
+        if rows is None: raise LookupError(f"Invalid class \"{request.get('class')}\"")
+        props = request.get("properties") or []
+        return [{p: row.get(p) for p in props} if props else row for row in rows()]
+    raise LookupError(f"unknown op: {op}")
+
+def main():
+    time.sleep(_delay("FAKE_PROBE_START_DELAY"))
+    print("Fake probe worker ready", flush=True)
+    for line in sys.stdin:
+        request = {}
+        try:
+            request = json.loads(line)
+            time.sleep(_delay("FAKE_PROBE_DELAY"))
+            reply = {"id": request.get("id"), "ok": True, "result": answer(request)}
+        except Exception as e:
+            reply = {"id": request.get("id"), "ok": False, "error": str(e)}
+        sys.stdout.write(json.dumps(reply) + "\n"); sys.stdout.flush()
+    return 0
+
+if __name__ == "__main__":
+    try: sys.exit(main())
+    except BrokenPipeError: sys.exit(0)
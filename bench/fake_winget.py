@@ -0,0 +1,86 @@
+# bench/fake_winget.py
+"""
+Поддельный winget для замеров на Linux без сети.
+Задержки задаются переменными окружения (в секундах):
+FAKE_WINGET_DOWNLOAD_DELAY, FAKE_WINGET_INSTALL_DELAY, FAKE_WINGET_LIST_DELAY.
+Размер вывода `winget list` — FAKE_WINGET_LIST_ROWS.
+Для проверки backend/procs.py: FAKE_WINGET_HANG=1 — установщик запускает «внука»
+и зависает (оба спят HANG_SECONDS), FAKE_WINGET_FLOOD — сколько строк прогресса
+выдаёт download.  `show` печатает Installer SHA256 того же setup.exe, что кладёт download.
+"""
+import hashlib
+import os
+import subprocess
+import sys
+import time
+
+def _arg(args, *names):
+    for name in names:
+        if name in args:
+            i = args.index(name)
+            if i + 1 < len(args):
+                return args[i + 1]
+    return None
+
+HANG_SECONDS = 31337  # заодно метка, по которой bench ищет недобитые процессы
+
+def _delay(name):
+    return float(os.environ.get(name, "0") or 0)
+
+def _hangs():
+    return os.environ.get("FAKE_WINGET_HANG") == "1"
+
+def _installer_script():
+    hang = f"sleep {HANG_SECONDS} &\nsleep {HANG_SECONDS}\n" if _hangs() else ""
+    return f"#!/bin/sh\n{hang}sleep {_delay('FAKE_WINGET_INSTALL_DELAY')}\nexit 0\n"
+
+def render_table(rows, header=("Name", "Id", "Version", "Available", "Source")):
+    """ Таблица в формате winget: колонки выровнены по самой длинной ячейке. """
+    widths = [max(len(str(r[i])) for r in [header, *rows]) + 1 for i in range(len(header))]
+    line = lambda r: "".join(str(c).ljust(w) for c, w in zip(r, widths)).rstrip()
+    return "\n".join([line(header), "-" * sum(widths), *[line(r) for r in rows]]) + "\n"
+
+def synthetic_rows(count):
+    """ Установленные пакеты: каждый десятый с доступным обновлением. """
+    return [(f"Synthetic App {i}", f"Vendor{i % 97}.App{i}", f"{i % 10}.{i % 7}.0", f"{i % 10 + 1}.0.0" if i % 10 == 0 else "", "winget") for i in range(count)]
+
+def main(args):
+    if not args or args[0] == "--version":
+        print("v1.9.9999-fake")
+        return 0
+    command = args[0]
+    pkg = _arg(args, "--id") or "Unknown.Package"
+    if command == "download":
+        for i in range(int(os.environ.get("FAKE_WINGET_FLOOD", "0") or 0)):
+            sys.stdout.write(f"\r  {'█' * (i % 30):30} {i} KB")
+        time.sleep(_delay("FAKE_WINGET_DOWNLOAD_DELAY"))
+        dest = _arg(args, "--download-directory", "-d") or os.getcwd()
+        os.makedirs(dest, exist_ok=True)
+        installer = os.path.join(dest, "setup.exe")
+        with open(installer, "w", encoding="utf-8", newline="\n") as f:
+            f.write(_installer_script())
+        os.chmod(installer, 0o755)
+        with open(os.path.join(dest, f"{pkg}_1.0.0_Machine_X64_exe.yaml"), "w", encoding="utf-8") as f:
+            f.write(f"PackageIdentifier: {pkg}\nPackageVersion: 1.0.0\nInstallers:\n- InstallerType: exe\n  InstallerSwitches:\n    Silent: /S\n")
+        print(f"Installer downloaded: {installer}")
+        return 0
+    if command == "show":
+        sha256 = hashlib.sha256(_installer_script().encode("utf-8")).hexdigest()
+        print(f"Found {pkg} [{pkg}]\nVersion: 1.0.0\nPublisher: Fake\nInstaller:\n  Installer Type: nullsoft\n  Installer Url: https://example.invalid/setup.exe\n  Installer SHA256: {sha256}")
+        return 0
+    if command == "install":
+        if _hangs():
+            subprocess.Popen(["sleep", str(HANG_SECONDS)]); time.sleep(HANG_SECONDS)
+        time.sleep(_delay("FAKE_WINGET_DOWNLOAD_DELAY") + _delay("FAKE_WINGET_INSTALL_DELAY"))
+        print("Successfully installed")
+        return 0
+    if command == "list":
+        time.sleep(_delay("FAKE_WINGET_LIST_DELAY"))
+        sys.stdout.write("   - \r   \\ \r" + render_table(synthetic_rows(int(os.environ.get("FAKE_WINGET_LIST_ROWS", "50")))))
+        return 0
+    print(f"fake winget: unsupported command {command}", file=sys.stderr)
+    return 1
+
+if __name__ == "__main__":
+    try: sys.exit(main(sys.argv[1:]))
+    except BrokenPipeError: sys.exit(0)  # вызывающий не дождался (общий срок проб) и закрыл канал
@@ -0,0 +1,28 @@
+# bench/fake_wmic.py
+"""
+Поддельный wmic: отвечает на запросы, которые делает backend/preload.py.
+Задержка одного вызова — FAKE_WMIC_DELAY (секунды).
+"""
+import os
+import sys
+import time
+
+_ANSWERS = {
+    "cpu": "Name=Fake CPU @ 3.00GHz",
+    "baseboard": "Manufacturer=Fake Inc.\nProduct=FAKE-B450\nSerialNumber=0000\nVersion=1.0",
+    "win32_videocontroller": "Name=Fake GPU 1080",
+}
+
+def main(args):
+    time.sleep(float(os.environ.get("FAKE_WMIC_DELAY", "0") or 0))
+    query = " ".join(args).lower()
+    for key, answer in _ANSWERS.items():
+        if key in query:
+            print("\n\n" + answer + "\n\n")
+            return 0
+    print("No Instance(s) Available.", file=sys.stderr)
+    return 1
+
+if __name__ == "__main__":
+    try: sys.exit(main(sys.argv[1:]))
+    except BrokenPipeError: sys.exit(0)  # вызывающий не дождался (общий срок проб) и закрыл канал
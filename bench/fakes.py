@@ -0,0 +1,37 @@
+# bench/fakes.py
+""" Кладёт поддельные утилиты (winget и т.п.) в PATH на время замера. """
+import os
+import stat
+import sys
+import tempfile
+from contextlib import contextmanager
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(BENCH_DIR)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+def _write_shim(bin_dir, name, script):
+    path = os.path.join(bin_dir, name)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{os.path.join(BENCH_DIR, script)}" "$@"\n')
+    os.chmod(path, os.stat(path).st_mode | stat.S_IEXEC)
+
+@contextmanager
+def fake_tools(tools=None, **env):
+    """
+    tools — словарь {имя команды: скрипт в bench/}, env — переменные для подделок.
+    """
+    tools = tools or {"winget": "fake_winget.py"}
+    saved = {k: os.environ.get(k) for k in ["PATH", *env]}
+    with tempfile.TemporaryDirectory(prefix="ausnit_fake_bin_") as bin_dir:
+        for name, script in tools.items():
+            _write_shim(bin_dir, name, script)
+        os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+        os.environ.update({k: str(v) for k, v in env.items()})
+        try:
+            yield bin_dir
+        finally:
+            for k, v in saved.items():
+                if v is None: os.environ.pop(k, None)
+                else: os.environ[k] = v
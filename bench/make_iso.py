@@ -0,0 +1,189 @@
+# bench/make_iso.py
+"""
+Генератор тестовых образов: ISO9660 + Joliet + UDF-мост над одними и теми же
+данными, как у образов Windows.  Раздел UDF начинается с сектора 0, поэтому
+номер логического блока совпадает с номером сектора.
+
+files — {"sources/install.wim": bytes или размер в байтах}; для размера
+содержимое генерируется повторением случайного блока.  Возвращает
+{путь: sha256} для проверки распаковки.
+"""
+import hashlib
+import os
+import struct
+from typing import Dict, Union
+
+SECTOR = 2048
+ISO_EXTENT_MAX = 0xFFFFF800          # максимум одной записи ISO9660 (кратно сектору)
+UDF_EXTENT_MAX = 0x3FFFF800          # максимум одного short_ad
+MTIME = (2024, 5, 1, 12, 0, 0)
+
+def _both32(v): return struct.pack("<I", v) + struct.pack(">I", v)
+def _both16(v): return struct.pack("<H", v) + struct.pack(">H", v)
+def _sectors(n): return max(1, -(-n // SECTOR))
+
+def _iso_date():
+    y, mo, d, h, mi, s = MTIME
+    return bytes([y - 1900, mo, d, h, mi, s, 0])
+
+def _iso_record(name: bytes, lba: int, size: int, is_dir: bool, multi: bool = False) -> bytes:
+    flags = (0x02 if is_dir else 0) | (0x80 if multi else 0)
+    body = bytes([0]) + _both32(lba) + _both32(size) + _iso_date() + bytes([flags, 0, 0]) + _both16(1) + bytes([len(name)]) + name
+    if len(name) % 2 == 0: body += b"\0"
+    return bytes([len(body) + 1]) + body
+
+def _pack_records(records) -> bytes:
+    out = bytearray()
+    for rec in records:
+        if len(out) % SECTOR + len(rec) > SECTOR:
+            out += bytes(SECTOR - len(out) % SECTOR)
+        out += rec
+    return bytes(out)
+
+def _tag(ident: int, body: bytearray, location: int) -> bytes:
+    struct.pack_into("<HHBBHHHI", body, 0, ident, 2, 0, 0, 0, 0, 0, location)
+    body[4] = (sum(body[:4]) + sum(body[5:16])) & 0xFF
+    return bytes(body)
+
+def _udf_time() -> bytes:
+    y, mo, d, h, mi, s = MTIME
+    return struct.pack("<HH8B", 0x1000, y, mo, d, h, mi, s, 0, 0, 0)
+
+def _udf_fe(location: int, is_dir: bool, size: int, extents) -> bytes:
+    fe = bytearray(SECTOR)
+    fe[16 + 11] = 4 if is_dir else 5          # ICB tag: тип файла
+    struct.pack_into("<H", fe, 16 + 18, 0)    # short_ad
+    struct.pack_into("<H", fe, 48, 1)
+    struct.pack_into("<QQ", fe, 56, size, sum(_sectors(n) for _, n in extents))
+    fe[84:96] = _udf_time()
+    ads = b"".join(struct.pack("<II", n, lba) for lba, n in extents)
+    struct.pack_into("<II", fe, 168, 0, len(ads))
+    fe[176:176 + len(ads)] = ads
+    return _tag(261, fe, location)
+
+def _udf_fid(name: str, fe_lba: int, is_dir: bool, parent: bool = False) -> bytes:
+    if parent: raw = b""
+    else:
+        try: raw = b"\x08" + name.encode("latin-1")
+        except UnicodeEncodeError: raw = b"\x10" + name.encode("utf-16-be")
+    length = (38 + len(raw) + 3) & ~3
+    fid = bytearray(length)
+    struct.pack_into("<HBB", fid, 16, 1, (0x02 if is_dir else 0) | (0x08 if parent else 0), len(raw))
+    struct.pack_into("<IIH", fid, 20, SECTOR, fe_lba, 0)
+    fid[38:38 + len(raw)] = raw
+    return _tag(257, fid, fe_lba)
+
+def _iso_name(name: str, is_dir: bool) -> bytes:
+    base = name.upper().encode("ascii", "replace")
+    return base if is_dir else base + b";1"
+
+def write_iso(path: str, files: Dict[str, Union[bytes, int]], iso_extent_max: int = ISO_EXTENT_MAX, udf_extent_max: int = UDF_EXTENT_MAX, udf: bool = True) -> Dict[str, str]:
+    dirs: Dict[str, list] = {"": []}
+    for file_path in sorted(files):
+        parts = file_path.split("/")
+        for i in range(1, len(parts)):
+            d = "/".join(parts[:i])
+            if d not in dirs:
+                dirs[d] = []; dirs["/".join(parts[:i - 1])].append((parts[i - 1], True))
+        dirs["/".join(parts[:-1])].append((parts[-1], False))
+    sizes = {p: (len(c) if isinstance(c, (bytes, bytearray)) else c) for p, c in files.items()}
+    join = lambda d, n: f"{d}/{n}" if d else n
+
+    # Раскладка: 16 системных, дескрипторы томов, AVDP в 256, дальше всё подряд
+    next_lba = 257
+    def alloc(count):
+        nonlocal next_lba
+        lba = next_lba; next_lba += count; return lba
+    vds = alloc(3); fsd = alloc(1)
+    # Размеры каталогов зависят только от имён, поэтому считаем их заранее по фиктивным адресам
+    def iso_dir_bytes(d, joliet):
+        recs = [_iso_record(b"\0", 0, 0, True), _iso_record(b"\1", 0, 0, True)]
+        for name, is_dir in dirs[d]:
+            raw = name.encode("utf-16-be") if joliet else _iso_name(name, is_dir)
+            pieces = 1 if is_dir else max(1, -(-sizes[join(d, name)] // iso_extent_max))
+            recs += [_iso_record(raw, 0, 0, is_dir)] * pieces
+        return len(_pack_records(recs))
+    def udf_dir_bytes(d):
+        return len(_udf_fid("", 0, True, True)) + sum(len(_udf_fid(n, 0, is_dir)) for n, is_dir in dirs[d])
+    layout = {}
+    for d in dirs:
+        iso_len, jol_len, udf_len = iso_dir_bytes(d, False), iso_dir_bytes(d, True), udf_dir_bytes(d)
+        layout[d] = {"iso": (alloc(_sectors(iso_len)), _sectors(iso_len) * SECTOR), "joliet": (alloc(_sectors(jol_len)), _sectors(jol_len) * SECTOR),
+                     "fe": alloc(1), "udf": (alloc(_sectors(udf_len)), udf_len)}
+    for p in sorted(files):
+        layout[p] = {"fe": alloc(1), "data": alloc(_sectors(sizes[p]) if sizes[p] else 0)}
+    total_sectors = next_lba
+
+    digests: Dict[str, str] = {}
+    with open(path, "wb") as f:
+        def put(lba, data):
+            f.seek(lba * SECTOR); f.write(data)
+        # --- ISO9660 / Joliet ---
+        def root_record(kind):
+            lba, length = layout[""][kind]
+            return _iso_record(b"\0", lba, length, True)
+        for lba, kind, joliet in ((16, "iso", False), (17, "joliet", True)):
+            vd = bytearray(SECTOR)
+            vd[0] = 2 if joliet else 1; vd[1:7] = b"CD001\x01"
+            vd[8:40] = b" " * 32; vd[40:72] = b"AUSNIT_TEST".ljust(32)
+            if joliet: vd[88:91] = b"%/E"
+            vd[80:88] = _both32(total_sectors); vd[120:124] = _both16(1); vd[124:128] = _both16(1); vd[128:132] = _both16(SECTOR)
+            vd[156:190] = root_record(kind); vd[881] = 1
+            put(lba, bytes(vd))
+        put(18, b"\xffCD001\x01".ljust(SECTOR, b"\0"))
+        if udf:
+            for i, ident in enumerate((b"BEA01", b"NSR02", b"TEA01")):
+                put(19 + i, (b"\0" + ident + b"\x01").ljust(SECTOR, b"\0"))
+        for d, children in dirs.items():
+            parent = d.rsplit("/", 1)[0] if "/" in d else ""
+            for kind, joliet in (("iso", False), ("joliet", True)):
+                recs = [_iso_record(b"\0", *layout[d][kind], True), _iso_record(b"\1", *layout[parent][kind], True)]
+                for name, is_dir in children:
+                    raw = name.encode("utf-16-be") if joliet else _iso_name(name, is_dir)
+                    child = join(d, name)
+                    if is_dir:
+                        recs.append(_iso_record(raw, *layout[child][kind], True)); continue
+                    size, lba = sizes[child], layout[child]["data"]
+                    offset = 0
+                    while True:
+                        n = min(iso_extent_max, size - offset)
+                        recs.append(_iso_record(raw, lba + offset // SECTOR, n, False, multi=offset + n < size))
+                        offset += n
+                        if offset >= size: break
+                put(layout[d][kind][0], _pack_records(recs))
+        # --- UDF ---
+        if udf:
+            avdp = bytearray(SECTOR); struct.pack_into("<IIII", avdp, 16, 3 * SECTOR, vds, 3 * SECTOR, vds)
+            put(256, _tag(2, avdp, 256))
+            pd = bytearray(SECTOR); struct.pack_into("<IHH", pd, 16, 1, 1, 0); pd[25:32] = b"+NSR02\0"; struct.pack_into("<III", pd, 184, 1, 0, total_sectors)
+            put(vds, _tag(5, pd, vds))
+            lvd = bytearray(SECTOR); struct.pack_into("<I", lvd, 16, 2); struct.pack_into("<I", lvd, 212, SECTOR)
+            struct.pack_into("<IIH", lvd, 248, SECTOR, fsd, 0); struct.pack_into("<II", lvd, 264, 6, 1); lvd[440:446] = struct.pack("<BBHH", 1, 6, 1, 0)
+            put(vds + 1, _tag(6, lvd, vds + 1))
+            put(vds + 2, _tag(8, bytearray(SECTOR), vds + 2))
+            fsd_body = bytearray(SECTOR); struct.pack_into("<IIH", fsd_body, 400, SECTOR, layout[""]["fe"], 0)
+            put(fsd, _tag(256, fsd_body, fsd))
+            for d, children in dirs.items():
+                parent = d.rsplit("/", 1)[0] if "/" in d else ""
+                data = _udf_fid("", layout[parent]["fe"], True, True)
+                data += b"".join(_udf_fid(name, layout[join(d, name)]["fe"], is_dir) for name, is_dir in children)
+                dir_lba = layout[d]["udf"][0]
+                put(layout[d]["fe"], _udf_fe(layout[d]["fe"], True, len(data), [(dir_lba, len(data))]))
+                put(dir_lba, data)
+            for p in files:
+                size, lba = sizes[p], layout[p]["data"]
+                extents = [(lba + off // SECTOR, min(udf_extent_max, size - off)) for off in range(0, size, udf_extent_max)]
+                put(layout[p]["fe"], _udf_fe(layout[p]["fe"], False, size, extents))
+        # --- Данные ---
+        block = os.urandom(1024 * 1024)
+        for p, content in files.items():
+            digest = hashlib.sha256(); f.seek(layout[p]["data"] * SECTOR)
+            if isinstance(content, (bytes, bytearray)):
+                f.write(content); digest.update(content)
+            else:
+                left = content
+                while left:
+                    piece = block[:min(left, len(block))]; f.write(piece); digest.update(piece); left -= len(piece)
+            digests[p] = digest.hexdigest()
+        f.truncate(total_sectors * SECTOR)
+    return digests
@@ -0,0 +1,69 @@
+# bench/make_wim.py
+"""
+Синтетический WIM для проверки разбиения на .swm: несжатые ресурсы файлов,
+ресурсы метаданных образов в конце (как у настоящих install.wim), таблица
+ресурсов и XML.  Плюс check_split — разбор готовых частей и сверка SHA-1
+каждого ресурса с исходником.
+"""
+import hashlib
+import os
+import struct
+import uuid
+
+from backend.wim import (ENTRY_SIZE, HEADER_SIZE, RESHDR_FLAG_METADATA, WIM_MAGIC, LookupEntry, ResHdr,
+                         WimHeader, read_lookup_table)
+
+EDITIONS = [("Core", "Windows 11 Home"), ("Professional", "Windows 11 Pro"), ("Education", "Windows 11 Education"), ("Enterprise", "Windows 11 Enterprise")]
+
+def _image_xml(index, edition):
+    edition_id, name = edition
+    return (f'<IMAGE INDEX="{index}"><DIRCOUNT>21000</DIRCOUNT><FILECOUNT>98000</FILECOUNT><TOTALBYTES>{15_000_000_000 + index}</TOTALBYTES>'
+            f'<WINDOWS><ARCH>9</ARCH><PRODUCTNAME>Microsoft® Windows® Operating System</PRODUCTNAME><EDITIONID>{edition_id}</EDITIONID>'
+            f'<INSTALLATIONTYPE>Client</INSTALLATIONTYPE><PRODUCTTYPE>WinNT</PRODUCTTYPE><LANGUAGES><LANGUAGE>ru-RU</LANGUAGE><DEFAULT>ru-RU</DEFAULT></LANGUAGES>'
+            f'<VERSION><MAJOR>10</MAJOR><MINOR>0</MINOR><BUILD>22631</BUILD><SPBUILD>2861</SPBUILD></VERSION></WINDOWS>'
+            f'<NAME>{name}</NAME><DESCRIPTION>{name}</DESCRIPTION><FLAGS>{edition_id}</FLAGS><DISPLAYNAME>{name}</DISPLAYNAME></IMAGE>')
+
+def write_wim(path, sizes, images=2, metadata_size=64 * 1024):
+    """ sizes — размеры ресурсов файлов; возвращает {sha1: размер} всех ресурсов. """
+    entries = []; block = os.urandom(1024 * 1024)
+    with open(path, "wb") as f:
+        f.write(bytes(HEADER_SIZE))
+        def resource(size, flags):
+            digest = hashlib.sha1(); offset = f.tell(); left = size; salt = os.urandom(16)
+            while left:
+                piece = salt + block[:min(left, len(block)) - len(salt)] if left > len(salt) else salt[:left]
+                f.write(piece); digest.update(piece); left -= len(piece); salt = b""
+            entries.append(LookupEntry(ResHdr(size, flags, offset, size), 1, 1, digest.digest()))
+        for size in sizes: resource(size, 0)
+        for _ in range(images): resource(metadata_size, RESHDR_FLAG_METADATA)
+        table_offset = f.tell(); table = b"".join(e.pack() for e in entries); f.write(table)
+        xml = ("\ufeff<WIM><TOTALBYTES>%d</TOTALBYTES>" % table_offset + "".join(_image_xml(i + 1, EDITIONS[i % len(EDITIONS)]) for i in range(images)) + "</WIM>").encode("utf-16-le")
+        xml_offset = f.tell(); f.write(xml)
+        header = bytearray(HEADER_SIZE)
+        header[:8] = WIM_MAGIC
+        struct.pack_into("<IIII", header, 8, HEADER_SIZE, 0x10D00, 0, 32768)
+        header[24:40] = uuid.uuid4().bytes
+        struct.pack_into("<HHI", header, 40, 1, 1, images)
+        header[48:72] = ResHdr(len(table), 0, table_offset, len(table)).pack()
+        header[72:96] = ResHdr(len(xml), 0, xml_offset, len(xml)).pack()
+        f.seek(0); f.write(header)
+    return {e.sha1: e.res.size for e in entries}
+
+def check_split(part_paths, expected, limit):
+    """ Проверяет части: общий GUID, номера, метаданные в первой, размер <= limit, все ресурсы на месте. """
+    found = {}; guid = None
+    for number, path in enumerate(part_paths, 1):
+        assert os.path.getsize(path) <= limit, f"{path}: больше {limit}"
+        with open(path, "rb") as f:
+            read = lambda offset, length: (f.seek(offset), f.read(length))[1]
+            header = WimHeader.unpack(read(0, HEADER_SIZE))
+            assert (header.part, header.total_parts) == (number, len(part_paths)), f"{path}: номер части"
+            guid = guid or header.raw[24:40]; assert header.raw[24:40] == guid, f"{path}: другой GUID"
+            assert header.lookup.size % ENTRY_SIZE == 0
+            for entry in read_lookup_table(read, header):
+                assert entry.part == number
+                if entry.res.flags & RESHDR_FLAG_METADATA: assert number == 1, "метаданные не в первой части"
+                assert hashlib.sha1(read(entry.res.offset, entry.res.size)).digest() == entry.sha1, f"{path}: ресурс испорчен"
+                found[entry.sha1] = entry.res.size
+            assert read(header.xml.offset, header.xml.size).decode("utf-16-le").startswith("\ufeff<WIM>")
+    assert found == expected, f"ресурсов {len(found)} из {len(expected)}"
@@ -0,0 +1,223 @@
+# bench/suite.py
+"""
+Набор замеров горячих путей с результатом в JSON — для сравнения между коммитами.
+
+Внешние утилиты подменяются поддельными winget/wmic/powershell и процессом проб (bench/fakes.py) с заданной
+задержкой и размером вывода, сеть не нужна.  Случаи, которым нужен дисплей
+(построение App, смена языка), без дисплея помечаются "skipped".
+
+    python bench/suite.py --out before.json
+    python bench/suite.py --out after.json --compare before.json [--fail-on-regression]
+    python bench/suite.py --only preload,scan --repeat 5
+
+Метрика *_s / *_ms — меньше лучше, *_per_s — больше лучше; остальные — справочные.
+Каждое время — минимум из --repeat прогонов (меньше шума от соседей по машине).
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from functools import partial
+
+from fakes import PROJECT_ROOT, fake_tools
+from fake_winget import render_table, synthetic_rows
+
+TOOLS = {"winget": "fake_winget.py", "wmic": "fake_wmic.py", "powershell": "fake_powershell.py"}
+REGRESSION = 0.20  # на сколько хуже считается регрессией
+
+def _best(repeat, fn):
+    """ Минимальное время из repeat прогонов fn() и результат последнего. """
+    best = None; result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter(); result = fn(); elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+# --- Случаи ---
+def case_preload(repeat):
+    from bench_probeworker import worker_env
+    from backend import preload, probeworker
+    def run(deadline):
+        preload.RESULT.clear(); preload.DONE.clear(); preload.run_all(deadline=deadline)
+        return dict(preload.RESULT["specs"])
+    with fake_tools(TOOLS, FAKE_WMIC_DELAY=0.5, FAKE_WINGET_LIST_DELAY=0.8, FAKE_WINGET_LIST_ROWS=300, FAKE_POWERSHELL_DELAY=0.6):
+        full, specs = _best(repeat, partial(run, 10))
+        capped, late = _best(repeat, partial(run, 0.3))
+    with fake_tools(TOOLS, FAKE_WINGET_LIST_DELAY=0.8, FAKE_WINGET_LIST_ROWS=300, **worker_env()):
+        specs_worker = _best(repeat, partial(preload.collect_specs, 10))[0]
+    probeworker.shutdown()
+    with fake_tools(TOOLS):
+        specs_spawn = _best(repeat, partial(preload.collect_specs, 10))[0]
+    return {"run_all_s": full, "run_all_deadline_0_3_s": capped, "probes_unknown": len(specs["unknown"]),
+            "probes_late_at_0_3": len(late["unknown"]), "devices_found": len(specs.get("devices", [])),
+            "collect_specs_spawn_ms": specs_spawn * 1000, "collect_specs_worker_ms": specs_worker * 1000}
+
+def case_scan(repeat):
+    from backend.preload import _known_ids, _load_json, match_installed, scan_installed_programs
+    metrics = {}
+    out = render_table(synthetic_rows(5000))
+    for size in (40, 500, 5000):
+        known = {f"vendor{i % 97}.app{i}".lower() if i % 2 == 0 else f"other.pkg{i}": [f"App {i}"] for i in range(size)}
+        metrics[f"match_5000_rows_x_{size}_ms"] = _best(repeat, partial(match_installed, known, out))[0] * 1000
+    for rows in (50, 1000, 5000):
+        with fake_tools(TOOLS, FAKE_WINGET_LIST_ROWS=rows):
+            metrics[f"scan_installed_{rows}_rows_s"] = _best(repeat, scan_installed_programs)[0]
+    from bench_registry import synthetic_snapshot
+    from backend import registry
+    known = _known_ids(); entries = synthetic_snapshot(5000)
+    table = registry.RuleTable(known, _load_json(registry.RULES_PATH))
+    metrics["registry_detect_5000_ms"] = _best(repeat, partial(registry.detect_installed, table, known, entries))[0] * 1000
+    return metrics
+
+def case_install(repeat):
+    from backend.install import install_pipeline, install_sequential
+    ids = [f"Fake.Package{i}" for i in range(12)]
+    with fake_tools(TOOLS, FAKE_WINGET_DOWNLOAD_DELAY=0.2, FAKE_WINGET_INSTALL_DELAY=0.1):
+        seq, _ = _best(1, partial(install_sequential, ids))
+        pipe, results = _best(repeat, partial(install_pipeline, ids))
+    assert all(results.values())
+    return {"sequential_s": seq, "pipeline_s": pipe, "sequential_pkg_per_s": len(ids) / seq, "pipeline_pkg_per_s": len(ids) / pipe}
+
+def case_catalog(repeat):
+    from bench_catalog import synthetic_catalog
+    from ui.catalog_view import CatalogModel
+    data = synthetic_catalog(10000)
+    build, model = _best(repeat, partial(CatalogModel, data))
+    queries = ("g", "goo", "google chrome", "video pl", "zip")
+    search = _best(repeat, lambda: [model.search(q) for q in queries])[0] / len(queries)
+    return {"model_build_10k_ms": build * 1000, "search_10k_avg_ms": search * 1000}
+
+def case_copy(repeat):
+    from backend.copier import CopyJob, copy_files, copy_to_many
+    block = os.urandom(1024 * 1024)
+    chunks = lambda n: (block[:min(len(block), n - off)] for off in range(0, n, len(block)))
+    jobs = [CopyJob("big.bin", 128 * 1024 * 1024, partial(chunks, 128 * 1024 * 1024))]
+    jobs += [CopyJob(f"small/f{i}.bin", 8192, partial(chunks, 8192)) for i in range(500)]
+    size = sum(j.size for j in jobs)
+    with tempfile.TemporaryDirectory(prefix="ausnit_suite_") as tmp:
+        one = _best(repeat, lambda: copy_files(jobs, os.path.join(tmp, "one")))[0]
+        fan = _best(repeat, lambda: copy_to_many(jobs, [os.path.join(tmp, f"fan{i}") for i in range(4)]))[0]
+    return {"copy_136mb_s": one, "copy_mb_per_s": size / 1024 ** 2 / one, "fanout_4x_s": fan}
+
+def case_drivers(repeat):
+    from bench_drivers import write_inf
+    from backend.driverstore import DriverIndex
+    with tempfile.TemporaryDirectory(prefix="ausnit_suite_") as tmp:
+        store = os.path.join(tmp, "store"); devices = []
+        for n in range(500):
+            ids = [f"PCI\\VEN_{0x1000 + n % 50:04X}&DEV_{n:04X}&SUBSYS_{n:08X}", f"PCI\\VEN_{0x1000 + n % 50:04X}&DEV_{n:04X}"]
+            write_inf(os.path.join(store, f"d{n}", f"d{n}.inf"), f"d{n}", "Vendor", "Net", "01/01/2024", f"1.0.{n}.0", [(f"Device {n}", ids)], utf16=n % 2 == 0)
+            devices.append({"id": str(n), "hardware_ids": ids, "compatible_ids": ["PCI\\CC_0200"]})
+        def index_full():
+            path = os.path.join(tmp, f"idx{time.perf_counter_ns()}.sqlite"); index = DriverIndex(path, "amd64"); index.scan(store); return index
+        full, index = _best(repeat, index_full)
+        rescan = _best(repeat, partial(index.scan, store))[0]
+        match, found = _best(repeat, partial(index.match, devices))
+        index.close()
+    assert len(found) == len(devices)
+    return {"index_500_inf_s": full, "rescan_unchanged_ms": rescan * 1000, "match_500_devices_ms": match * 1000}
+
+def case_cli(repeat):
+    run = lambda args: subprocess.run([sys.executable, *args], cwd=PROJECT_ROOT, capture_output=True, check=True)
+    cli = _best(repeat, partial(run, ["-m", "ausnit", "install", "--preset", "Работа", "--dry-run"]))[0]
+    return {"cli_dry_run_s": cli}
+
+def case_ui(repeat):
+    """ Построение App и смена языка — нужен дисплей. """
+    import tkinter
+    from bench_language import synthetic_catalog
+    with fake_tools(TOOLS):
+        try:
+            from ui.main import App
+            class BenchApp(App):
+                def _load_data(self):
+                    super()._load_data(); self.programs_data = synthetic_catalog(2000)
+            t0 = time.perf_counter(); app = BenchApp(); app.update(); build = time.perf_counter() - t0
+        except tkinter.TclError as e:
+            return {"skipped": f"нет дисплея: {e}"}
+        switch = []
+        for _ in range(repeat):
+            for lang in ("EN", "KZ", "RU"):
+                t0 = time.perf_counter(); app.change_language(lang); app.update_idletasks(); switch.append(time.perf_counter() - t0)
+        app.destroy()
+    return {"app_build_s": build, "change_language_max_ms": max(switch) * 1000}
+
+def case_splash(repeat):
+    """ Картинка заставки в свежем процессе: прежняя загрузка против запечённого варианта (ui/assets.py). """
+    from bench_splash import _run
+    with tempfile.TemporaryDirectory(prefix="ausnit_suite_") as cache_home:
+        env = {**os.environ, "XDG_CACHE_HOME": cache_home, "LOCALAPPDATA": cache_home}
+        legacy = min(_run("legacy", 1.0, env)["image_ms"] for _ in range(repeat))
+        baked = min(_run("assets", 1.0, env)["image_ms"] for _ in range(repeat))
+    return {"splash_image_legacy_ms": legacy, "splash_image_baked_ms": baked}
+
+CASES = {"preload": case_preload, "scan": case_scan, "install": case_install, "catalog": case_catalog,
+         "copy": case_copy, "drivers": case_drivers, "cli": case_cli, "splash": case_splash, "ui": case_ui}
+
+# --- Прогон и сравнение ---
+def _meta():
+    try: commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError: commit = ""
+    return {"commit": commit, "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+def run(names, repeat):
+    results = {}
+    for name in names:
+        t0 = time.perf_counter()
+        try:
+            with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):  # служебный print бэкенда не мешает отчёту
+                results[name] = CASES[name](repeat)
+        except Exception as e:
+            results[name] = {"error": f"{type(e).__name__}: {e}"}
+        print(f"{name:10} {time.perf_counter() - t0:6.1f} s  {json.dumps(results[name], ensure_ascii=False)}", file=sys.stderr)
+    return results
+
+def compare(old: dict, new: dict, threshold: float = REGRESSION):
+    """ [(случай, метрика, было, стало, изменение, регрессия?)] для числовых метрик с известным направлением. """
+    rows = []
+    for case, metrics in new.items():
+        for key, value in metrics.items():
+            before = old.get(case, {}).get(key)
+            if not isinstance(value, (int, float)) or not isinstance(before, (int, float)) or not before: continue
+            if key.endswith("_per_s"): change = before / value - 1 if value else float("inf")
+            elif key.endswith("_s") or key.endswith("_ms"): change = value / before - 1
+            else: continue
+            rows.append((case, key, before, value, change, change > threshold))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры AUSNIT с результатом в JSON")
+    parser.add_argument("--only", help="случаи через запятую: " + ", ".join(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="куда записать JSON (иначе stdout)")
+    parser.add_argument("--compare", help="JSON прошлого прогона для сравнения")
+    parser.add_argument("--threshold", type=float, default=REGRESSION)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+    names = args.only.split(",") if args.only else list(CASES)
+    unknown = [n for n in names if n not in CASES]
+    if unknown: parser.error(f"неизвестные случаи: {', '.join(unknown)}")
+    report = {"meta": {**_meta(), "repeat": args.repeat}, "results": run(names, args.repeat)}
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: f.write(text + "\n")
+    else:
+        print(text)
+    if not args.compare:
+        return 0
+    with open(args.compare, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    rows = compare(old["results"], report["results"], args.threshold)
+    print(f"сравнение с {old['meta'].get('commit') or args.compare}:", file=sys.stderr)
+    for case, key, before, value, change, regressed in rows:
+        print(f"  {'!!' if regressed else '  '} {case}.{key}: {before:.4g} -> {value:.4g} ({change:+.0%})", file=sys.stderr)
+    return 1 if args.fail_on_regression and any(r[-1] for r in rows) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
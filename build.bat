@@ -7,6 +7,9 @@ rmdir /s /q build 2>nul
 rmdir /s /q dist 2>nul
 for /d /r . %%d in (__pycache__) do @if exist "%%d" rmdir /s /q "%%d"
 
+echo --- Картинки точного размера для сборки ---
+python -m ui.assets || exit /b 1
+
 echo --- Сборка EXE по рецепту из AUSNIT.spec ---
 python -m PyInstaller AUSNIT.spec
 
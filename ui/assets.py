@@ -0,0 +1,155 @@
+# ui/assets.py
+"""
+Картинки интерфейса точного размера — без декодирования больших PNG и LANCZOS при запуске.
+
+Сборка (`python -m ui.assets`, её вызывает build.bat перед PyInstaller) кладёт в
+assets/baked варианты каждой картинки из VARIANTS в пикселях под типичные
+масштабы Windows (SCALES) и manifest.json.  В сборку попадают только они, а не
+исходники по несколько мегабайт.
+
+Во время работы load_image(asset, size, scale) отдаёт картинку ровно
+round(size * scale) пикселей — столько же просит CTkImage, и его собственный
+resize сводится к копии.  Порядок поиска (ключ — asset, size, scale):
+  1. память процесса;
+  2. вариант из assets/baked — маленький PNG, без пересчёта;
+  3. готовый bitmap из кэша в папке данных AUSNIT (сырые байты, без PNG);
+  4. исходник — или самый крупный вариант, если исходника в сборке нет, — LANCZOS,
+     и результат пишется в кэш п. 3 для следующего запуска.
+"""
+import hashlib
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image
+
+from backend.bootcache import app_data_dir
+from ui.utils import resource_path
+
+# Что интерфейс показывает и в каком логическом размере
+VARIANTS = {
+    "assets/intro.png": [(720, 480)],  # ui/splash.py
+}
+SCALES = (1.0, 1.25, 1.5, 1.75, 2.0)  # 100–200 % в параметрах экрана Windows
+BAKED_DIR = "assets/baked"
+MANIFEST_NAME = "manifest.json"
+
+_memory: Dict[Tuple[str, Tuple[int, int], float], Image.Image] = {}
+_manifest: Optional[dict] = None
+
+def pixel_size(size: Tuple[int, int], scale: float) -> Tuple[int, int]:
+    """ Как CTkImage._get_scaled_size. """
+    return round(size[0] * scale), round(size[1] * scale)
+
+def baked_name(asset: str, pixels: Tuple[int, int]) -> str:
+    stem = os.path.splitext(os.path.basename(asset))[0]
+    return f"{stem}_{pixels[0]}x{pixels[1]}.png"
+
+# --- Сборка ---
+def bake(root: str, variants: Dict[str, List[Tuple[int, int]]] = VARIANTS, scales=SCALES) -> dict:
+    """ Пишет варианты в root/assets/baked; возвращает манифест {asset: {"sha256", "files": {"WxH": имя}}}. """
+    out_dir = os.path.join(root, BAKED_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    try:
+        with open(os.path.join(out_dir, MANIFEST_NAME), "r", encoding="utf-8") as f: previous = json.load(f)
+    except (OSError, ValueError):
+        previous = {}
+    manifest = {}
+    for asset, sizes in variants.items():
+        path = os.path.join(root, asset)
+        with open(path, "rb") as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        old = previous.get(asset, {}) if previous.get(asset, {}).get("sha256") == digest else {}
+        source = None; files = {}
+        for size in sizes:
+            for scale in scales:
+                pixels = pixel_size(size, scale); key = f"{pixels[0]}x{pixels[1]}"; name = baked_name(asset, pixels)
+                if key in files: continue
+                # Исходник не менялся и вариант на месте — не пересчитываем
+                if old.get("files", {}).get(key) != name or not os.path.exists(os.path.join(out_dir, name)):
+                    if source is None: source = Image.open(path); source.load()
+                    source.resize(pixels, Image.Resampling.LANCZOS).save(os.path.join(out_dir, name), optimize=True)
+                files[key] = name
+        manifest[asset] = {"sha256": digest, "files": files}
+    with open(os.path.join(out_dir, MANIFEST_NAME), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+    return manifest
+
+# --- Кэш готовых bitmap в папке данных ---
+def _cache_path(asset: str, pixels: Tuple[int, int], mode: str, source: str) -> str:
+    st = os.stat(source)
+    key = hashlib.sha1(f"{asset}|{source}|{st.st_size}|{st.st_mtime_ns}".encode("utf-8")).hexdigest()[:12]
+    stem = os.path.splitext(os.path.basename(asset))[0]
+    return os.path.join(app_data_dir(), "image_cache", f"{stem}_{pixels[0]}x{pixels[1]}_{mode}_{key}.raw")
+
+def _read_raw(path: str, pixels: Tuple[int, int], mode: str) -> Optional[Image.Image]:
+    try:
+        with open(path, "rb") as f: data = f.read()
+    except OSError:
+        return None
+    if len(data) != pixels[0] * pixels[1] * len(mode): return None  # недописан
+    return Image.frombuffer(mode, pixels, data, "raw", mode, 0, 1)
+
+def _write_raw(path: str, image: Image.Image):
+    folder = os.path.dirname(path); prefix = os.path.basename(path).rsplit("_", 1)[0] + "_"
+    try:
+        os.makedirs(folder, exist_ok=True)
+        for name in os.listdir(folder):  # тот же размер от прежней версии исходника
+            if name.startswith(prefix) and name != os.path.basename(path): os.remove(os.path.join(folder, name))
+        with open(path + ".tmp", "wb") as f: f.write(image.tobytes())
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print(f"Кэш картинок: {path} не записан: {e}")
+
+# --- Загрузка ---
+def _baked(asset: str) -> dict:
+    global _manifest
+    if _manifest is None:
+        try:
+            with open(resource_path(os.path.join(BAKED_DIR, MANIFEST_NAME)), "r", encoding="utf-8") as f: _manifest = json.load(f)
+        except (OSError, ValueError):
+            _manifest = {}
+    return _manifest.get(asset, {}).get("files", {})
+
+def _source(asset: str) -> Optional[str]:
+    """ Исходник, а если его нет в сборке — самый крупный запечённый вариант. """
+    path = resource_path(asset)
+    if os.path.exists(path): return path
+    files = _baked(asset)
+    if not files: return None
+    largest = max(files, key=lambda k: int(k.split("x")[0]) * int(k.split("x")[1]))
+    return resource_path(os.path.join(BAKED_DIR, files[largest]))
+
+def load_image(asset: str, size: Tuple[int, int], scale: float = 1.0) -> Image.Image:
+    key = (asset, tuple(size), scale)
+    image = _memory.get(key)
+    if image is not None: return image
+    pixels = pixel_size(size, scale)
+    name = _baked(asset).get(f"{pixels[0]}x{pixels[1]}")
+    if name:
+        image = Image.open(resource_path(os.path.join(BAKED_DIR, name))); image.load()
+    else:
+        source = _source(asset)
+        if source is None: raise FileNotFoundError(asset)
+        original = Image.open(source)
+        mode = "RGBA" if "A" in original.getbands() or original.mode == "P" else "RGB"
+        cache = _cache_path(asset, pixels, mode, source)
+        image = _read_raw(cache, pixels, mode)
+        if image is None:
+            image = original.convert(mode).resize(pixels, Image.Resampling.LANCZOS)
+            _write_raw(cache, image)
+    _memory[key] = image
+    return image
+
+def main(argv=None):
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    manifest = bake(root)
+    for asset, info in manifest.items():
+        for pixels, name in info["files"].items():
+            size = os.path.getsize(os.path.join(root, BAKED_DIR, name))
+            print(f"{asset} -> {BAKED_DIR}/{name} ({size // 1024} КБ)")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
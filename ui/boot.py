@@ -1,10 +1,10 @@
 # ui/boot.py
 import sys
 import os
+import threading
+import time
 import traceback
 from datetime import datetime
-import customtkinter as ctk
-import time
 
 # Этот блок должен быть первым
 if getattr(sys, 'frozen', False):
@@ -16,19 +16,33 @@ else:
 if project_root not in sys.path:
     sys.path.insert(0, project_root)
 
+from ui import timings
+
 log_file_path = os.path.join(log_dir, "error_log.txt")
+timings_path = os.path.join(log_dir, "startup_timings.json")
+
+# Минимальное время показа заставки (секунды); по умолчанию заставка не держится дольше, чем нужно
+MIN_SPLASH_DURATION = float(os.environ.get("AUSNIT_SPLASH_MIN", "0"))
+SPLASH_CHECK_MS = 30
 
 try:
-    from backend.preload import start_preload, get_cache_path
-    from ui.splash import SplashScreen
-    from ui.main import App
-    from ui.utils import resource_path
+    from backend.preload import start_preload, get_cache_path, SECTIONS, DONE
+    from backend import bootcache
 
     # --- НОВАЯ, НАДЁЖНАЯ ЛОГИКА ЗАПУСКА ---
 
-    # 1. Запускаем фоновую загрузку данных
+    # 1. Запускаем фоновую загрузку данных: пересобираем только устаревшие секции кэша.
+    #    Если кэш прошлого запуска полный, не ждём preload — App обновится сам, когда он закончит.
     cache_path = get_cache_path()
-    preload_thread = start_preload(target_cache_path=cache_path)
+    cached = bootcache.load(cache_path)
+    warm_start = all(name in cached for name in SECTIONS)
+    start_preload(target_cache_path=cache_path, sections=bootcache.stale_sections(cache_path))
+    threading.Thread(target=lambda: (DONE.wait(), timings.mark("preload_done")), daemon=True).start()
+
+    import customtkinter as ctk
+    from ui.splash import SplashScreen
+    from ui.utils import resource_path
+    timings.mark("import")
 
     # 2. Создаем временный рут для заставки, чтобы избежать окна "tk"
     splash_root = ctk.CTk()
@@ -36,25 +50,47 @@ try:
 
     # 3. Загружаем кастомный шрифт до создания основного окна
     ctk.FontManager.load_font(resource_path("assets/Quartell VF.ttf"))
+    timings.mark("font_loaded")
 
     # 4. Создаем и показываем окно заставки
     splash = SplashScreen(splash_root)
-    splash_start_time = time.time()
-    min_splash_duration = 4.0
-
-    # 5. Главный цикл для заставки, ждем завершения фоновой задачи
-    while preload_thread.is_alive() or (time.time() - splash_start_time) < min_splash_duration:
-        splash_root.update()
-        time.sleep(0.01)
-    
-    # 6. Закрываем заставку и её временный рут
+    splash.update_idletasks()
+    splash_start_time = time.perf_counter()
+    timings.mark("splash_shown")
+
+    # 5. Тяжёлый ui.main (psutil, вкладки, весь бэкенд) импортируем в фоне, пока видна заставка
+    ui_import = {}
+    def _import_ui():
+        try:
+            from ui.main import App
+            ui_import["App"] = App
+        except Exception as e:
+            ui_import["error"] = e
+        timings.mark("ui_imported")
+    ui_thread = threading.Thread(target=_import_ui, daemon=True)
+    ui_thread.start()
+
+    # 6. Ждём импорт и preload через after-колбэки Tk вместо цикла update()/sleep()
+    def _check_ready():
+        ready = not ui_thread.is_alive() and (warm_start or DONE.is_set())
+        if ready and time.perf_counter() - splash_start_time >= MIN_SPLASH_DURATION:
+            splash_root.quit()
+        else:
+            splash_root.after(SPLASH_CHECK_MS, _check_ready)
+    splash_root.after(SPLASH_CHECK_MS, _check_ready)
+    splash_root.mainloop()
+
+    # 7. Закрываем заставку и её временный рут
     splash.stop()
     splash_root.destroy()
+    if "error" in ui_import:
+        raise ui_import["error"]
 
-    # 7. Теперь создаем и запускаем основное приложение
-    app = App()
+    # 8. Теперь создаем и запускаем основное приложение
+    app = ui_import["App"]()
+    app.after_idle(lambda: (timings.mark("app_first_frame"), timings.autosave(timings_path)))
     app.mainloop()
-    
+
 except Exception as e:
     # --- Блок перехвата любой ошибки ---
     error_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -63,4 +99,4 @@ except Exception as e:
     error_message += "--- TRACEBACK ---\n"
     error_message += traceback.format_exc()
     with open(log_file_path, "w", encoding="utf-8") as f:
-        f.write(error_message)
\ No newline at end of file
+        f.write(error_message)
@@ -0,0 +1,191 @@
+# ui/catalog_view.py
+"""
+Виртуализированный список каталога для InstallationTab.
+
+Состояние (выбор, «установлено») хранится в компактной модели на bytearray,
+а виджетов ровно столько, сколько строк помещается на экран: при прокрутке
+и поиске они только перенастраиваются. Поиск — по префиксам слов названия
+и ID через отсортированный словарь токенов, без перебора всех записей;
+если передан индекс backend.catalog, поиск уходит в него (там ещё и теги),
+а словарь токенов не строится.
+"""
+import bisect
+import re
+from array import array
+from typing import Dict, List
+
+import customtkinter as ctk
+
+_TOKEN_RE = re.compile(r"[^\w+]+")
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.split(text.lower()) if t]
+
+class CatalogModel:
+    def __init__(self, data: Dict[str, Dict[str, str]], search_index=None):
+        self.search_index = search_index
+        self.categories = list(data.keys())
+        self.names: List[str] = []; self.ids: List[str] = []; self.category_of = array("H")
+        for ci, items in enumerate(data.values()):
+            for name, item_id in items.items():
+                self.names.append(name); self.ids.append(item_id); self.category_of.append(ci)
+        self.selected = bytearray(len(self.names)); self.installed = bytearray(len(self.names))
+        self._rows_by_id: Dict[str, List[int]] = {}; self._rows_by_name: Dict[str, List[int]] = {}
+        for row, (name, item_id) in enumerate(zip(self.names, self.ids)):
+            self._rows_by_id.setdefault(item_id.lower(), []).append(row)
+            self._rows_by_name.setdefault(name.lower(), []).append(row)
+        if search_index is None: self._build_index()  # с индексом backend.catalog свой словарь токенов не нужен
+
+    def __len__(self):
+        return len(self.names)
+
+    def _build_index(self):
+        postings: Dict[str, array] = {}
+        for row, (name, item_id) in enumerate(zip(self.names, self.ids)):
+            # Слова названия и ID, плюс ID и название целиком — чтобы «google.chr» тоже находил
+            for token in {*tokenize(name), *tokenize(item_id), name.lower(), item_id.lower()}:
+                postings.setdefault(token, array("I")).append(row)
+        self._tokens = sorted(postings)
+        self._postings = [postings[t] for t in self._tokens]
+
+    def search(self, query: str) -> List[int]:
+        """ Строки, где каждое слово запроса — префикс какого-то слова названия или ID. """
+        terms = tokenize(query)
+        if not terms:
+            return list(range(len(self.names)))
+        if self.search_index is not None:
+            # Порядок search_ids — ранжирование bm25, лучшее совпадение первым
+            return list(dict.fromkeys(row for item_id in self.search_index.search_ids(query) for row in self.rows_for_id(item_id)))
+        result = None
+        for term in terms:
+            lo = bisect.bisect_left(self._tokens, term)
+            hi = bisect.bisect_left(self._tokens, term + "\uffff")
+            rows = set()
+            for posting in self._postings[lo:hi]:
+                rows.update(posting)
+            result = rows if result is None else result & rows
+            if not result:
+                return []
+        return sorted(result)
+
+    def rows_for_id(self, item_id: str) -> List[int]:
+        return self._rows_by_id.get(item_id.lower(), [])
+
+    def rows_for_name(self, name: str) -> List[int]:
+        return self._rows_by_name.get(name.lower(), [])
+
+    def selected_ids(self) -> List[str]:
+        return [self.ids[row] for row, flag in enumerate(self.selected) if flag]
+
+class VirtualCatalogList(ctk.CTkFrame):
+    """
+    Строки — заголовки категорий и чекбоксы программ. Пул слотов создаётся один раз
+    под высоту экрана; refresh() раскладывает в слоты видимую часть self.view.
+    """
+    ROW_HEIGHT = 28
+
+    def __init__(self, master, model: CatalogModel, font_family, on_toggle, on_installed_enter=None, on_installed_leave=None):
+        super().__init__(master, fg_color="transparent")
+        self.model = model; self.on_toggle = on_toggle
+        self.on_installed_enter = on_installed_enter; self.on_installed_leave = on_installed_leave
+        self.font = ctk.CTkFont(family=font_family, size=12)
+        self.strike_font = ctk.CTkFont(family=font_family, size=12, overstrike=True)
+        self.header_font = ctk.CTkFont(family=font_family, size=15, weight="bold")
+        self.view: List[int] = []  # >= 0 — строка модели, < 0 — заголовок категории -(ci + 1)
+        self.top = 0; self.visible = 0
+        self.body = ctk.CTkFrame(self, fg_color="transparent"); self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, command=self._on_scrollbar); self.scrollbar.pack(side="right", fill="y")
+        self.header_buttons = []; self.slots = []
+        for _ in range(self.winfo_screenheight() // self.ROW_HEIGHT + 2):
+            self._create_slot()
+        self.body.bind("<Configure>", self._on_resize)
+        for widget in (self.body, *[w for slot in self.slots for w in slot[:2]]):
+            widget.bind("<MouseWheel>", self._on_wheel); widget.bind("<Button-4>", self._on_wheel); widget.bind("<Button-5>", self._on_wheel)
+
+    def _create_slot(self):
+        header = ctk.CTkButton(self.body, text="", font=self.header_font, state="disabled", text_color_disabled=("white", "white"), height=self.ROW_HEIGHT - 4)
+        var = ctk.IntVar()
+        index = len(self.slots)
+        chk = ctk.CTkCheckBox(self.body, text="", variable=var, font=self.font, command=lambda i=index: self._on_check(i))
+        chk.bind("<Enter>", lambda e, i=index: self._on_enter(e, i)); chk.bind("<Leave>", lambda e, i=index: self._on_leave(e, i))
+        self.header_buttons.append(header)
+        self.slots.append([header, chk, var, None])  # последний элемент — что сейчас нарисовано в слоте
+
+    def set_view(self, rows: List[int]):
+        """
+        Показывает строки модели (уже отфильтрованные) с заголовками категорий.
+        Строки группируются по категориям в порядке первого появления, внутри — в порядке rows
+        (у поиска по индексу это ранжирование: категория лучшего совпадения — первой).
+        """
+        groups: Dict[int, List[int]] = {}
+        for row in rows:
+            groups.setdefault(self.model.category_of[row], []).append(row)
+        view = []
+        for ci, group in groups.items():
+            view.append(-(ci + 1)); view.extend(group)
+        self.view = view; self.top = 0
+        self.refresh()
+
+    def refresh(self):
+        self.top = max(0, min(self.top, len(self.view) - self.visible))
+        for i, slot in enumerate(self.slots):
+            index = self.top + i
+            if i >= self.visible or index >= len(self.view):
+                if slot[3] is not None:
+                    slot[0].place_forget(); slot[1].place_forget(); slot[3] = None
+                continue
+            item = self.view[index]
+            if item < 0:
+                key = ("header", item, i)
+                if slot[3] != key:
+                    slot[1].place_forget(); slot[0].configure(text=self.model.categories[-item - 1])
+                    slot[0].place(x=0, y=i * self.ROW_HEIGHT + 2, relwidth=1.0); slot[3] = key
+                continue
+            installed = bool(self.model.installed[item]); selected = bool(self.model.selected[item])
+            key = ("item", item, i, installed, selected)
+            if slot[3] == key:
+                continue
+            slot[0].place_forget()
+            slot[1].configure(text=self.model.names[item], state="disabled" if installed else "normal", font=self.strike_font if installed else self.font)
+            slot[2].set(1 if selected else 0)
+            slot[1].place(x=10, y=i * self.ROW_HEIGHT + 2); slot[3] = key
+        total = max(len(self.view), 1)
+        self.scrollbar.set(self.top / total, min((self.top + self.visible) / total, 1.0))
+
+    def _row_at(self, slot_index):
+        index = self.top + slot_index
+        return self.view[index] if index < len(self.view) and self.view[index] >= 0 else None
+
+    def _on_check(self, slot_index):
+        row = self._row_at(slot_index)
+        if row is None: return
+        self.model.selected[row] = self.slots[slot_index][2].get()
+        self.slots[slot_index][3] = None
+        self.on_toggle(row)
+
+    def _on_enter(self, event, slot_index):
+        row = self._row_at(slot_index)
+        if row is not None and self.model.installed[row] and self.on_installed_enter: self.on_installed_enter(event)
+
+    def _on_leave(self, event, slot_index):
+        if self.on_installed_leave: self.on_installed_leave(event)
+
+    def _on_resize(self, event):
+        scaling = self._get_widget_scaling()
+        visible = min(int(event.height / scaling) // self.ROW_HEIGHT, len(self.slots))
+        if visible != self.visible:
+            self.visible = visible; self.refresh()
+
+    def _on_scrollbar(self, *args):
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.view))
+        elif args[0] == "scroll":
+            step = self.visible if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4: delta = -3
+        elif getattr(event, "num", None) == 5: delta = 3
+        else: delta = -3 if event.delta > 0 else 3
+        self.top += delta; self.refresh()
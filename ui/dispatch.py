@@ -0,0 +1,73 @@
+# ui/dispatch.py
+"""
+Единая очередь обновлений UI из фоновых потоков.
+
+Tk не потокобезопасен, поэтому воркеры установки и сборки USB не трогают
+виджеты сами, а кладут изменения сюда; главный цикл забирает их через
+after() раз в кадр. Пачка строк лога уходит в textbox одной вставкой,
+у прогресс-бара остаётся только последнее значение за кадр, а лог
+обрезается до LOG_LIMIT строк, чтобы память не росла на длинных прогонах.
+"""
+import threading
+from collections import deque
+
+FRAME_MS = 30
+LOG_LIMIT = 2000  # строк в одном textbox
+
+class UiDispatcher:
+    def __init__(self, root, frame_ms=FRAME_MS, log_limit=LOG_LIMIT):
+        self.root = root; self.frame_ms = frame_ms; self.log_limit = log_limit
+        self._lock = threading.Lock()
+        self._logs = {}       # textbox -> deque строк, ждущих вставки
+        self._progress = {}   # виджет -> последнее значение
+        self._calls = deque()
+        # Воркеры сами Tk не вызывают вовсе (даже after): очередь опрашивает главный поток
+        self.root.after(self.frame_ms, self._drain)
+
+    # --- Вызывается из любого потока ---
+    def log(self, textbox, text):
+        with self._lock:
+            pending = self._logs.get(textbox)
+            if pending is None:
+                pending = self._logs[textbox] = deque(maxlen=self.log_limit)
+            pending.extend(text.split("\n"))
+
+    def progress(self, widget, value):
+        with self._lock:
+            self._progress[widget] = value
+
+    def call(self, fn, *args, **kwargs):
+        with self._lock:
+            self._calls.append((fn, args, kwargs))
+
+    # --- Главный поток ---
+    def _drain(self):
+        with self._lock:
+            logs, self._logs = self._logs, {}
+            progress, self._progress = self._progress, {}
+            calls, self._calls = self._calls, deque()
+        try:
+            for fn, args, kwargs in calls:
+                try: fn(*args, **kwargs)
+                except Exception as e: print(f"Ошибка обновления UI: {e}")
+            # Виджет могут уничтожить между winfo_exists и вызовом (TclError) — это не должно
+            # останавливать ни остальные виджеты, ни следующий кадр
+            for widget, value in progress.items():
+                try:
+                    if widget.winfo_exists(): widget.set(value)
+                except Exception as e: print(f"Ошибка обновления прогресса: {e}")
+            for textbox, lines in logs.items():
+                try:
+                    if textbox.winfo_exists(): self._flush_log(textbox, lines)
+                except Exception as e: print(f"Ошибка вывода лога: {e}")
+        finally:
+            self.root.after(self.frame_ms, self._drain)
+
+    def _flush_log(self, textbox, lines):
+        textbox.configure(state="normal")
+        textbox.insert("end", "\n".join(lines) + "\n")
+        total = int(textbox.index("end-1c").split(".")[0]) - 1
+        if total > self.log_limit:
+            textbox.delete("1.0", f"{total - self.log_limit + 1}.0")
+        textbox.see("end")
+        textbox.configure(state="disabled")
@@ -1,7 +1,7 @@
 # ui/main.py
 import os
 import sys
-import json
+import time
 import psutil
 import threading
 import customtkinter as ctk
@@ -9,9 +9,14 @@ from tkinter import filedialog, messagebox
 from PIL import Image
 
 from ui.utils import resource_path, load_json, check_winget_installed
-from backend.install import install_programs
-from backend.drivers import install_drivers
-from backend.osbuilder import build_usb
+from ui.dispatch import UiDispatcher
+from ui.catalog_view import CatalogModel, VirtualCatalogList
+from backend.install import iter_install_programs
+from backend.drivers import iter_install_drivers
+from backend.batch import dedupe
+from backend.osbuilder import build_usb_many, list_editions
+from backend import bootcache, catalog, driverstore, preload
+from backend.monitor import get_sampler
 from backend.preload import get_cache_path
 
 # --- КОНСТАНТЫ ---
@@ -23,36 +28,56 @@ MONITOR_COLORS = {
     "warning": ("#E65100", "#FFAB40"),
     "critical": ("#B71C1C", "#FF5252")
 }
+MONITOR_REFRESH_MS = 1000
+MONITOR_IDLE_MS = 5000  # окно свёрнуто — перерисовывать нечего
+SPARKLINE_POINTS = 60
 
 # --- КЛАСС ДЛЯ УПРАВЛЕНИЯ ЛОКАЛИЗАЦИЕЙ ---
 class LocalizationManager:
+    """ Таблицы строк лежат по файлу на язык (data/locales/<lang>.json) и грузятся при первом обращении. """
     def __init__(self, lang="ru"):
-        self.locales = load_json("data/locales.json")
+        self.locales = {}
         self.lang = lang
 
+    def _table(self, lang):
+        if lang not in self.locales:
+            path = resource_path(f"data/locales/{lang}.json")
+            self.locales[lang] = load_json(f"data/locales/{lang}.json") if os.path.exists(path) else {}
+        return self.locales[lang]
+
     def set_language(self, lang):
-        if lang in self.locales:
+        if self._table(lang):
             self.lang = lang
 
     def get(self, key):
-        return self.locales.get(self.lang, {}).get(key, key)
+        return self._table(self.lang).get(key, key)
 
 
 class InstallationTab(ctk.CTkFrame):
-    def __init__(self, master, data, install_function, cache, loc: LocalizationManager):
+    def __init__(self, master, data, install_stream, cache, loc: LocalizationManager, dispatcher: UiDispatcher, search_index=None):
         super().__init__(master, fg_color="transparent")
-        self.data = data; self.install_function = install_function; self.cache = cache; self.loc = loc
+        self.data = data; self.install_stream = install_stream; self.cache = cache; self.loc = loc; self.dispatcher = dispatcher
         self.installed_set = set(map(str.lower, cache.get("installed", {}).get("installed_list_raw", [])))
-        self.selected_items = []; self.install_thread = None; self.cancel_event = threading.Event()
-        self.category_labels = []; self.check_widgets = []; self.widget_map = {}
+        self.install_thread = None; self.cancel_event = threading.Event()
+        self.model = CatalogModel(data, search_index)
         self.accent_buttons = []; self.tooltip_window = None
         self._create_widgets()
         self._populate_list()
         self.update_texts()
 
+    def set_model(self, model: CatalogModel):
+        """ Подменяет каталог (индекс, дочитанный в фоне): выбор переносится по ID, фильтр поиска сохраняется. """
+        chosen = {item_id.lower() for item_id in self.model.selected_ids()}
+        self.model = model; self.catalog_list.model = model
+        for name in self.installed_set:
+            for row in model.rows_for_name(name): model.installed[row] = 1
+        for row, item_id in enumerate(model.ids):
+            if item_id.lower() in chosen and not model.installed[row]: model.selected[row] = 1
+        self._apply_filter(); self._update_install_button_state()
+
     def _log(self, message_key, *args):
-        message = self.loc.get(message_key).format(*args)
-        self.log_box.configure(state="normal"); self.log_box.insert("end", message + "\n"); self.log_box.see("end"); self.log_box.configure(state="disabled")
+        # Можно звать из любого потока: строка уходит в общую очередь UI
+        self.dispatcher.log(self.log_box, self.loc.get(message_key).format(*args))
 
     def _create_widgets(self):
         top_frame = ctk.CTkFrame(self); top_frame.pack(side="top", fill="both", expand=True, padx=6, pady=(8, 4))
@@ -62,6 +87,8 @@ class InstallationTab(ctk.CTkFrame):
         self.select_all_btn = ctk.CTkButton(selection_frame, command=self._select_all, font=(APP_FONT, 12)); self.select_all_btn.pack(side="left", expand=True, padx=4, pady=4)
         self.deselect_all_btn = ctk.CTkButton(selection_frame, command=self._deselect_all, font=(APP_FONT, 12)); self.deselect_all_btn.pack(side="left", expand=True, padx=4, pady=4)
         self.accent_buttons.extend([self.select_all_btn, self.deselect_all_btn])
+        self.search_entry = ctk.CTkEntry(left_panel, font=(APP_FONT, 12)); self.search_entry.pack(fill="x", pady=(0, 5))
+        self.search_entry.bind("<KeyRelease>", lambda e: self._apply_filter())
         self.container_frame = ctk.CTkFrame(left_panel); self.container_frame.pack(fill="both", expand=True)
         self.specs_label = ctk.CTkLabel(right_frame, font=(APP_FONT, 15, "bold")); self.specs_label.pack(anchor="w", pady=(6, 4), padx=8)
         self.specs_box = ctk.CTkTextbox(right_frame, state="disabled", font=(APP_FONT, 12)); self.specs_box.pack(padx=8, pady=(0, 8), fill="both", expand=True); self._fill_specs()
@@ -75,6 +102,7 @@ class InstallationTab(ctk.CTkFrame):
     def update_texts(self):
         self.select_all_btn.configure(text=self.loc.get("select_all"))
         self.deselect_all_btn.configure(text=self.loc.get("deselect_all"))
+        self.search_entry.configure(placeholder_text=self.loc.get("search_placeholder"))
         self.specs_label.configure(text=self.loc.get("pc_specs"))
         self.install_btn.configure(text=self.loc.get("install_button"))
         self.cancel_btn.configure(text=self.loc.get("cancel_button"))
@@ -84,24 +112,26 @@ class InstallationTab(ctk.CTkFrame):
         self.specs_box.configure(state="normal"); self.specs_box.delete("1.0", "end"); self.specs_box.insert("end", "\n".join(lines)); self.specs_box.configure(state="disabled")
 
     def _populate_list(self):
-        for i in range(2): self.container_frame.grid_rowconfigure(i, weight=1)
-        for i in range(3): self.container_frame.grid_columnconfigure(i, weight=1)
-        category_items = list(self.data.items())
-        for i, (category, items) in enumerate(category_items):
-            row, col = i // 3, i % 3
-            cat_frame = ctk.CTkFrame(self.container_frame, fg_color="transparent"); cat_frame.grid(row=row, column=col, padx=5, pady=5, sticky="nsew")
-            header_btn = ctk.CTkButton(cat_frame, text=category, font=(APP_FONT, 15, "bold"), state="disabled", text_color_disabled=("white", "white")); header_btn.pack(fill="x")
-            self.category_labels.append(header_btn)
-            scroll_frame = ctk.CTkScrollableFrame(cat_frame, fg_color="transparent"); scroll_frame.pack(fill="both", expand=True)
-            for name, item_id in items.items():
-                var = ctk.IntVar(); chk = ctk.CTkCheckBox(scroll_frame, text=name, variable=var, command=lambda i=item_id, v=var: self._toggle_item(i, v), font=(APP_FONT, 12))
-                self.check_widgets.append(chk); self.widget_map[item_id] = chk
-                if name.lower() in self.installed_set: self._apply_installed_style(chk)
-                chk.pack(anchor="w", padx=10, pady=2)
-
-    def _apply_installed_style(self, checkbox_widget):
-        strikethrough_font = ctk.CTkFont(family=APP_FONT, size=12, overstrike=True); checkbox_widget.configure(state="disabled", font=strikethrough_font)
-        checkbox_widget.bind("<Enter>", self._show_tooltip); checkbox_widget.bind("<Leave>", self._hide_tooltip)
+        # Виджеты создаются только под видимые строки; состояние каталога живёт в self.model
+        for name in self.installed_set:
+            for row in self.model.rows_for_name(name): self.model.installed[row] = 1
+        self.catalog_list = VirtualCatalogList(self.container_frame, self.model, APP_FONT, on_toggle=lambda row: self._update_install_button_state(), on_installed_enter=self._show_tooltip, on_installed_leave=self._hide_tooltip)
+        self.catalog_list.pack(fill="both", expand=True, padx=5, pady=5)
+        self.category_labels = self.catalog_list.header_buttons
+        self.catalog_list.set_view(self.model.search(""))
+
+    def _apply_filter(self):
+        self.catalog_list.set_view(self.model.search(self.search_entry.get()))
+
+    def apply_cache(self, fresh):
+        """ Применяет обновлённые фоном данные: переписывает характеристики и зачёркивает только новые установленные. """
+        if "specs" in fresh: self._fill_specs()
+        if "installed" not in fresh: return
+        new_set = set(map(str.lower, fresh["installed"].get("installed_list_raw", [])))
+        for name in new_set - self.installed_set:
+            for row in self.model.rows_for_name(name): self.model.installed[row] = 1; self.model.selected[row] = 0
+        self.installed_set |= new_set; self.catalog_list.refresh(); self._update_install_button_state()
+
     def _show_tooltip(self, event):
         if self.tooltip_window: self.tooltip_window.destroy()
         self.tooltip_window = ctk.CTkToplevel(self); self.tooltip_window.overrideredirect(True)
@@ -109,46 +139,51 @@ class InstallationTab(ctk.CTkFrame):
         label = ctk.CTkLabel(self.tooltip_window, text=self.loc.get("tooltip_installed"), font=(APP_FONT, 10), fg_color="#333333", corner_radius=5, padx=5, pady=2); label.pack()
     def _hide_tooltip(self, event):
         if self.tooltip_window: self.tooltip_window.destroy(); self.tooltip_window = None
-    def _update_install_button_state(self): self.install_btn.configure(state="normal" if self.selected_items else "disabled")
-    def _toggle_item(self, item_id, var):
-        if var.get() == 1 and item_id not in self.selected_items: self.selected_items.append(item_id)
-        elif var.get() == 0 and item_id in self.selected_items: self.selected_items.remove(item_id)
-        self._update_install_button_state()
+    def _update_install_button_state(self): self.install_btn.configure(state="normal" if any(self.model.selected) else "disabled")
     def _select_all(self):
-        self.selected_items.clear()
-        for item_id, chk in self.widget_map.items():
-            if chk.cget("state") == "normal": chk.select(); self.selected_items.append(item_id)
-        self._update_install_button_state()
+        # Выбираются все неустановленные из текущего фильтра поиска
+        for row in self.model.search(self.search_entry.get()):
+            if not self.model.installed[row]: self.model.selected[row] = 1
+        self.catalog_list.refresh(); self._update_install_button_state()
     def _deselect_all(self):
-        for chk in self.check_widgets: chk.deselect()
-        self.selected_items.clear(); self._update_install_button_state()
+        self.model.selected[:] = bytes(len(self.model)); self.catalog_list.refresh(); self._update_install_button_state()
     def _start_installation(self):
-        if not self.selected_items or (self.install_thread and self.install_thread.is_alive()): return
+        if not any(self.model.selected) or (self.install_thread and self.install_thread.is_alive()): return
         self.cancel_event.clear(); self.install_btn.configure(state="disabled"); self.cancel_btn.configure(state="normal")
-        ids_to_install = list(self.selected_items); self.install_thread = threading.Thread(target=self._installation_worker, args=(ids_to_install,), daemon=True); self.install_thread.start()
+        ids_to_install = self.model.selected_ids(); self.install_thread = threading.Thread(target=self._installation_worker, args=(ids_to_install,), daemon=True); self.install_thread.start()
     def _cancel_installation(self): self.cancel_event.set(); self.cancel_btn.configure(state="disabled")
     def _installation_worker(self, item_ids):
-        total = len(item_ids); self._log("log_start"); self.progress_bar.set(0)
-        for i, item_id in enumerate(item_ids, 1):
-            if self.cancel_event.is_set(): self._log("log_cancelled"); break
-            result = self.install_function([item_id]); success = result.get(item_id, False)
-            self.log_box.configure(state="normal"); self.log_box.insert("end", ("✅ " if success else "❌ ") + item_id + "\n"); self.log_box.see("end"); self.log_box.configure(state="disabled")
-            if success:
-                widget = self.widget_map.get(item_id)
-                if widget: self._apply_installed_style(widget); self.installed_set.add(widget.cget("text").lower())
-            self.progress_bar.set(i / total); self.master.master.update_idletasks()
-        else: self._log("log_done")
-        self.selected_items.clear(); self.cancel_btn.configure(state="disabled"); self.install_btn.configure(state="disabled")
+        item_ids = dedupe(item_ids); total = len(item_ids); finished = 0
+        self._log("log_start"); self.dispatcher.progress(self.progress_bar, 0)
+        for event in self.install_stream(item_ids, cancel_event=self.cancel_event):
+            if event["state"] not in ("done", "failed"): continue
+            item_id = event["id"]; success = event["state"] == "done"; finished += 1; duration = event.get("duration", 0)
+            cpu_peak = get_sampler().peak("cpu", time.time() - duration); peak_text = f", CPU max {cpu_peak:.0f}%" if cpu_peak is not None else ""
+            status = event.get("status", ""); note = f" — {self.loc.get('log_status_' + status)}" if status in ("reboot", "already", "timeout", "idle") else ""
+            self.dispatcher.log(self.log_box, ("✅ " if success else "❌ ") + f"{item_id} ({duration:.0f} s{peak_text}){note}")
+            if success: self.dispatcher.call(self._mark_installed, item_id)
+            self.dispatcher.progress(self.progress_bar, finished / total)
+        self._log("log_cancelled" if self.cancel_event.is_set() else "log_done")
+        self.dispatcher.call(self._finish_installation)
+    def _mark_installed(self, item_id):
+        for row in self.model.rows_for_id(item_id): self.model.installed[row] = 1; self.model.selected[row] = 0; self.installed_set.add(self.model.names[row].lower())
+        self.catalog_list.refresh()
+    def _finish_installation(self):
+        self.model.selected[:] = bytes(len(self.model)); self.catalog_list.refresh(); self.cancel_btn.configure(state="disabled"); self.install_btn.configure(state="disabled")
+
+def format_eta(seconds):
+    """ «ММ:СС», а от часа — «Ч:ММ:СС»: запись install.wim на USB 2.0 идёт дольше часа. """
+    minutes, secs = divmod(int(seconds), 60); hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
 
 class USBBuilderTab(ctk.CTkFrame):
-    def __init__(self, master, loc: LocalizationManager):
+    def __init__(self, master, loc: LocalizationManager, dispatcher: UiDispatcher):
         super().__init__(master, fg_color="transparent")
-        self.loc = loc; self.iso_path = None; self.accent_buttons = []; self.build_thread = None
+        self.loc = loc; self.dispatcher = dispatcher; self.iso_path = None; self.accent_buttons = []; self.build_thread = None; self.editions = []
         self._create_widgets(); self.update_drive_list(); self.update_texts()
 
-    def _log(self, message_key, *args):
-        message = self.loc.get(message_key).format(*args)
-        self.log_box.configure(state="normal"); self.log_box.insert("end", message + "\n"); self.log_box.see("end"); self.log_box.configure(state="disabled")
+    def _log(self, message_key, *args, prefix=""):
+        self.dispatcher.log(self.log_box, prefix + self.loc.get(message_key).format(*args))
 
     def _create_widgets(self):
         self.grid_columnconfigure(0, weight=1)
@@ -162,48 +197,108 @@ class USBBuilderTab(ctk.CTkFrame):
         self.partition_combo = ctk.CTkComboBox(options_frame, values=["GPT", "MBR"], font=(APP_FONT, 12)); self.partition_combo.grid(row=1, column=0, sticky="ew", padx=10, pady=(0, 10)); self.partition_combo.set("GPT")
         self.target_system_header_label = ctk.CTkLabel(options_frame, font=(APP_FONT, 12)); self.target_system_header_label.grid(row=2, column=0, sticky="w", padx=10, pady=5)
         self.target_system_label = ctk.CTkLabel(options_frame, text="UEFI (non CSM)", font=(APP_FONT, 12), fg_color=("gray80", "gray20"), corner_radius=5); self.target_system_label.grid(row=3, column=0, sticky="ew", padx=10, pady=(0, 10))
+        self.edition_label = ctk.CTkLabel(options_frame, font=(APP_FONT, 12)); self.edition_label.grid(row=4, column=0, sticky="w", padx=10, pady=5)
+        self.edition_combo = ctk.CTkComboBox(options_frame, values=[], state="readonly", font=(APP_FONT, 12)); self.edition_combo.grid(row=5, column=0, sticky="ew", padx=10, pady=(0, 10))
+        self.verify_check = ctk.CTkCheckBox(options_frame, font=(APP_FONT, 12)); self.verify_check.grid(row=6, column=0, sticky="w", padx=10, pady=(0, 10))
+        self.all_drives_check = ctk.CTkCheckBox(options_frame, font=(APP_FONT, 12)); self.all_drives_check.grid(row=7, column=0, sticky="w", padx=10, pady=(0, 10))
         bottom_controls_frame = ctk.CTkFrame(self, fg_color="transparent"); bottom_controls_frame.grid(row=4, column=0, columnspan=2, sticky="ew", padx=20, pady=10); bottom_controls_frame.grid_columnconfigure(0, weight=1)
         self.fs_label = ctk.CTkLabel(bottom_controls_frame, font=(APP_FONT, 12)); self.fs_label.grid(row=0, column=0, sticky="w")
         self.fs_combo = ctk.CTkComboBox(bottom_controls_frame, values=["NTFS", "FAT32"], font=(APP_FONT, 12)); self.fs_combo.grid(row=1, column=0, sticky="ew", pady=(0, 10)); self.fs_combo.set("NTFS")
         self.build_button = ctk.CTkButton(bottom_controls_frame, command=self._start_build, font=(APP_FONT, 14, "bold"), height=40); self.build_button.grid(row=0, rowspan=2, column=1, padx=(20, 0))
+        self.progress_bar = ctk.CTkProgressBar(bottom_controls_frame); self.progress_bar.grid(row=2, column=0, columnspan=2, sticky="ew", pady=(0, 2)); self.progress_bar.set(0)
+        self.speed_label = ctk.CTkLabel(bottom_controls_frame, text="", font=(APP_FONT, 12)); self.speed_label.grid(row=3, column=0, columnspan=2, sticky="w")
         self.log_box = ctk.CTkTextbox(self, state="disabled", font=(APP_FONT, 12)); self.log_box.grid(row=5, column=0, columnspan=2, sticky="nsew", padx=20, pady=(0, 10))
-        self.accent_buttons.extend([self.choose_iso_btn, self.build_button, self.drive_combo, self.partition_combo, self.fs_combo])
+        self.accent_buttons.extend([self.choose_iso_btn, self.build_button, self.drive_combo, self.partition_combo, self.fs_combo, self.edition_combo, self.verify_check, self.all_drives_check])
 
     def update_texts(self):
         self.device_label.configure(text=self.loc.get("usb_device"))
         self.choose_iso_btn.configure(text=self.loc.get("usb_choose_iso"))
-        self.iso_path_label.configure(text=self.loc.get("usb_iso_not_selected"))
+        self.iso_path_label.configure(text=os.path.basename(self.iso_path) if self.iso_path else self.loc.get("usb_iso_not_selected"))
         self.partition_label.configure(text=self.loc.get("usb_partition_scheme"))
         self.target_system_header_label.configure(text=self.loc.get("usb_target_system"))
         self.fs_label.configure(text=self.loc.get("usb_file_system"))
+        self.verify_check.configure(text=self.loc.get("usb_verify")); self.all_drives_check.configure(text=self.loc.get("usb_all_drives"))
+        self.edition_label.configure(text=self.loc.get("usb_edition")); self._fill_editions()
         self.build_button.configure(text=self.loc.get("usb_start_button"))
         self.update_drive_list()
 
     def update_drive_list(self):
         try: drives = [f"{p.device} ({psutil.disk_usage(p.mountpoint).total / (1024**3):.1f} GB)" for p in psutil.disk_partitions() if 'removable' in p.opts]
         except: drives = []
-        if drives: self.drive_combo.configure(values=drives); self.drive_combo.set(drives[0])
+        current = self.drive_combo.get()
+        if drives: self.drive_combo.configure(values=drives); self.drive_combo.set(current if current in drives else drives[0])
         else: self.drive_combo.configure(values=[self.loc.get("usb_device_not_found")]); self.drive_combo.set(self.loc.get("usb_device_not_found"))
     
     def _choose_iso(self):
         path = filedialog.askopenfilename(title=self.loc.get("usb_choose_iso"), filetypes=[("ISO", "*.iso")])
         if path: self.iso_path = path; self.iso_path_label.configure(text=os.path.basename(path)); self._log("usb_log_iso_selected", os.path.basename(path))
         else: self.iso_path = None; self.iso_path_label.configure(text=self.loc.get("usb_iso_not_selected"))
+        self.editions = []; self._fill_editions()
+        if path: threading.Thread(target=self._load_editions, args=(path,), daemon=True).start()
+
+    def _load_editions(self, path):
+        # Читается только XML install.wim внутри ISO; повторный выбор того же файла — из кэша
+        try: editions = list_editions(path)
+        except Exception as e: editions = []; self.dispatcher.log(self.log_box, f"{self.loc.get('usb_edition')}: {e}")
+        self.dispatcher.call(self._set_editions, path, editions)
+
+    def _set_editions(self, path, editions):
+        if self.iso_path == path: self.editions = editions; self._fill_editions()
+
+    def _edition_title(self, e): return f"{e['index']}: {e['name']} ({e['arch']}, {e['default_language'] or '-'}, {e['build']})"
+
+    def _fill_editions(self):
+        values = [self.loc.get("usb_edition_auto")] + [self._edition_title(e) for e in self.editions]
+        current = self.edition_combo.get(); self.edition_combo.configure(values=values); self.edition_combo.set(current if current in values[1:] else values[0])
+
+    def _selected_edition(self):
+        return next((e for e in self.editions if self._edition_title(e) == self.edition_combo.get()), None)
     
     def _start_build(self):
         if not self.iso_path: self._log("usb_error_no_iso"); return
         if self.loc.get("usb_device_not_found") in self.drive_combo.get(): self._log("usb_error_no_drive"); return
         if self.build_thread and self.build_thread.is_alive(): return
-        params = {"iso": self.iso_path, "drive": self.drive_combo.get().split(" ")[0], "partition_scheme": self.partition_combo.get(), "file_system": self.fs_combo.get()}
-        self.build_thread = threading.Thread(target=self._build_worker, args=(params,), daemon=True); self.build_thread.start()
-
-    def _build_worker(self, params):
-        self.build_button.configure(state="disabled"); self._log("usb_log_start")
-        self._log("usb_log_build_params"); self.log_box.configure(state="normal"); self.log_box.insert("end", str(params) + "\n"); self.log_box.configure(state="disabled")
-        success = build_usb(params)
-        if success: self._log("usb_log_success"); self._log("log_done")
+        drives = [v.split(" ")[0] for v in self.drive_combo.cget("values")] if self.all_drives_check.get() else [self.drive_combo.get().split(" ")[0]]
+        params = {"iso": self.iso_path, "drive": drives[0], "partition_scheme": self.partition_combo.get(), "file_system": self.fs_combo.get(), "verify": bool(self.verify_check.get())}
+        edition = self._selected_edition()
+        if edition: params["image_index"] = edition["index"]; params["lang"] = edition["default_language"] or "ru-RU"
+        self.build_thread = threading.Thread(target=self._build_worker, args=(params, drives), daemon=True); self.build_thread.start()
+
+    def _build_worker(self, params, drives):
+        self.dispatcher.call(self.build_button.configure, state="disabled"); self._log("usb_log_start")
+        self._log("usb_log_build_params"); self.dispatcher.log(self.log_box, f"{params} -> {', '.join(drives)}")
+        self.dispatcher.progress(self.progress_bar, 0)
+        status = {}; status_lock = threading.Lock()  # диск -> (записано, всего, строка состояния); ISO читается один раз на все диски
+        def show(drive, done, total, text):
+            # Зовётся из потоков записи всех дисков сразу
+            with status_lock:
+                status[drive] = (done, total, text)
+                fraction = sum(s[0] for s in status.values()) / max(sum(s[1] for s in status.values()), 1)
+                lines = "\n".join(f"{d}: {t}" if len(drives) > 1 else t for d, (_, _, t) in status.items())
+            self.dispatcher.progress(self.progress_bar, fraction)
+            self.dispatcher.call(self.speed_label.configure, text=lines)
+        def on_event(event):
+            state = event["state"]; drive = event.get("target", ""); prefix = f"{drive}: " if len(drives) > 1 and drive else ""
+            if state == "copying":
+                eta = format_eta(event["eta"]) if event["eta"] is not None else "--:--"
+                show(drive, event["done"], event["total"], self.loc.get("usb_speed").format(event["rate"] / 1024**2, eta))
+            elif state == "hashing":
+                self.dispatcher.progress(self.progress_bar, event["done"] / max(event["total"], 1))
+                self.dispatcher.call(self.speed_label.configure, text=self.loc.get("usb_hashing"))
+            elif state == "verifying":
+                show(drive, event["done"], event["total"], self.loc.get("usb_verifying").format(event["done"], event["total"]))
+            elif state == "failed":
+                self._log("usb_log_drive_failed", drive, event["error"])
+            elif state == "summary":
+                self._log("usb_log_copied", event["files"], event["bytes"] / 1024**3, event["seconds"], event["mb_per_s"], prefix=prefix)
+                if event.get("skipped") or event.get("removed"): self._log("usb_log_delta", event["files"], event["skipped"], event["removed"], prefix=prefix)
+                if event["verified"]: self._log("usb_log_verify_failed" if event["mismatched"] else "usb_log_verify_ok", len(event["mismatched"]), prefix=prefix)
+        results = build_usb_many(params, drives, on_event=on_event)
+        self.dispatcher.call(self.speed_label.configure, text="")
+        if len(drives) > 1: self._log("usb_log_drives_done", sum(results.values()), len(drives))
+        if all(results.values()): self._log("usb_log_success"); self._log("log_done")
         else: self._log("usb_log_error")
-        self.build_button.configure(state="normal")
+        self.dispatcher.call(self.build_button.configure, state="normal")
 
 class SettingsTab(ctk.CTkFrame):
     def __init__(self, master, app_instance, loc: LocalizationManager):
@@ -242,7 +337,8 @@ class App(ctk.CTk):
         self.tab_keys = ["tab_apps", "tab_drivers", "tab_usb", "tab_settings"]
         self.overrideredirect(True); self.geometry("1280x860")
         self._offset_x = 0; self._offset_y = 0; self.current_accent = "zelen"; self.accent_widgets = []
-        self._prev_net_io = psutil.net_io_counters()
+        self.sampler = get_sampler(); self._monitor_shown = {}; self.sparklines = {}
+        self.dispatcher = UiDispatcher(self)
         self.main_container = ctk.CTkFrame(self, corner_radius=15); self.main_container.pack(fill="both", expand=True, padx=5, pady=5)
         self._create_title_bar()
         self.content_frame = ctk.CTkFrame(self.main_container, fg_color="transparent"); self.content_frame.pack(fill="both", expand=True)
@@ -251,7 +347,7 @@ class App(ctk.CTk):
         self._create_tab_view() 
         
         ctk.set_appearance_mode("dark"); self.after(20, self._apply_accent, self.current_accent, True)
-        self.after(100, self._check_dependencies); self.after(1000, self._update_monitor)
+        self.after(100, self._check_dependencies); self.after(1000, self._update_monitor); self._early_installed = None; self._preload_applied = False; self.after(500, self._watch_preload)
 
     def _create_title_bar(self):
         title_bar = ctk.CTkFrame(self.main_container, height=40, corner_radius=0); title_bar.pack(fill="x", side="top", padx=1, pady=1)
@@ -266,9 +362,53 @@ class App(ctk.CTk):
     def do_move(self, event): self.geometry(f"+{self.winfo_pointerx() - self._offset_x}+{self.winfo_pointery() - self._offset_y}")
 
     def _load_data(self):
-        try: self.cache = json.load(open(get_cache_path(), "r", encoding="utf-8"))
-        except: self.cache = {}
-        self.programs_data = load_json("data/programs.json"); self.drivers_data = load_json("data/drivers.json")
+        self.cache = bootcache.load(get_cache_path())
+        # Сначала — маленький programs.json; собранный индекс каталога (python -m backend.catalog)
+        # читается в фоне после запуска (_load_catalog_index) и подменяет его
+        self.catalog_index = None
+        self.programs_data = load_json("data/programs.json")
+        self.drivers_data = load_json("data/drivers.json")
+        self._matched_key = None  # по каким устройствам и индексу драйверов собрана категория «подобрано»
+
+    def _load_catalog_index(self):
+        # Фоновый поток: открытие базы, as_catalog() и строки модели — мимо потока Tk
+        try:
+            index = catalog.open_default()
+            if index is None: return
+            if not len(index): index.close(); return
+            model = CatalogModel(index.as_catalog(), index)
+        except Exception as e:
+            print(f"Индекс каталога не загружен: {e}"); return
+        self.catalog_index = index
+        self.dispatcher.call(self.apps_frame.set_model, model)
+
+    def _matched_drivers(self, devices):
+        # Фоновый поток: индекс хранилища обновляет preload.scan_driver_store
+        index = driverstore.open_default()
+        if index is None: return {}
+        try: found = index.match(devices)
+        finally: index.close()
+        return {f"{m['device'] or m['description']} — {m['provider']} {m['version']}".strip(): m["inf"] for m in found.values()}
+
+    def _refresh_matched_drivers(self):
+        # Пересобирает «подобрано для этого ПК», когда пришли свежие устройства или обновился индекс драйверов
+        devices = preload.RESULT.get("specs", {}).get("devices")
+        key = (id(devices) if devices is not None else None, preload.DRIVERS_SCANNED.is_set())
+        if key == self._matched_key: return
+        self._matched_key = key
+        devices = self.cache.get("specs", {}).get("devices", []) if devices is None else devices
+        def work():
+            try: matched = self._matched_drivers(devices)
+            except Exception as e: print(f"Подбор драйверов не удался: {e}"); return
+            self.dispatcher.call(self._apply_matched_drivers, matched)
+        threading.Thread(target=work, daemon=True, name="driver-match").start()
+
+    def _apply_matched_drivers(self, matched):
+        title = self.loc.get("drivers_matched")
+        data = {title: matched, **{k: v for k, v in self.drivers_data.items() if k != title}} if matched else {k: v for k, v in self.drivers_data.items() if k != title}
+        if data == self.drivers_data: return
+        self.drivers_data = data
+        if self.drivers_frame.winfo_exists(): self.drivers_frame.set_model(CatalogModel(data))
 
     def _create_tab_view(self):
         self.tabview = ctk.CTkTabview(self.content_frame, command=self._on_tab_change)
@@ -279,9 +419,10 @@ class App(ctk.CTk):
         for key in self.tab_keys:
             tab_widgets[key] = self.tabview.add(self.loc.get(key))
 
-        self.apps_frame = InstallationTab(tab_widgets["tab_apps"], self.programs_data, install_programs, self.cache, self.loc); self.apps_frame.pack(fill="both", expand=True)
-        self.drivers_frame = InstallationTab(tab_widgets["tab_drivers"], self.drivers_data, install_drivers, self.cache, self.loc); self.drivers_frame.pack(fill="both", expand=True)
-        self.usb_frame = USBBuilderTab(tab_widgets["tab_usb"], self.loc); self.usb_frame.pack(fill="both", expand=True)
+        self.apps_frame = InstallationTab(tab_widgets["tab_apps"], self.programs_data, iter_install_programs, self.cache, self.loc, self.dispatcher); self.apps_frame.pack(fill="both", expand=True)
+        threading.Thread(target=self._load_catalog_index, daemon=True, name="catalog-index").start()
+        self.drivers_frame = InstallationTab(tab_widgets["tab_drivers"], self.drivers_data, iter_install_drivers, self.cache, self.loc, self.dispatcher); self.drivers_frame.pack(fill="both", expand=True)
+        self.usb_frame = USBBuilderTab(tab_widgets["tab_usb"], self.loc, self.dispatcher); self.usb_frame.pack(fill="both", expand=True)
         self.settings_frame = SettingsTab(tab_widgets["tab_settings"], self, self.loc); self.settings_frame.pack(fill="both", expand=True)
         
         self.collect_accent_widgets()
@@ -290,15 +431,18 @@ class App(ctk.CTk):
     def _create_footer(self):
         self.footer = ctk.CTkFrame(self.main_container, height=40); self.footer.pack(side="bottom", fill="x", padx=5, pady=(0,5))
         right_mon = ctk.CTkFrame(self.footer, fg_color="transparent"); right_mon.pack(side="right", padx=10, pady=5)
-        _, self.cpu_bar, self.cpu_lbl, self.cpu_header = self._create_monitor_bar(right_mon, "CPU"); self.cpu_lbl.master.pack(side="left")
-        _, self.ram_bar, self.ram_lbl, self.ram_header = self._create_monitor_bar(right_mon, "RAM"); self.ram_lbl.master.pack(side="left")
+        _, self.cpu_bar, self.cpu_lbl, self.cpu_header = self._create_monitor_bar(right_mon, "CPU", sparkline="cpu"); self.cpu_lbl.master.pack(side="left")
+        _, self.ram_bar, self.ram_lbl, self.ram_header = self._create_monitor_bar(right_mon, "RAM", sparkline="ram"); self.ram_lbl.master.pack(side="left")
         _, self.dsk_bar, self.dsk_lbl, self.dsk_header = self._create_monitor_bar(right_mon, "Disk"); self.dsk_lbl.master.pack(side="left")
         _, self.gpu_bar, self.gpu_lbl, self.gpu_header = self._create_monitor_bar(right_mon, "GPU"); self.gpu_lbl.master.pack(side="left")
         self.net_lbl = ctk.CTkLabel(right_mon, text="↓ 0.0 KB/s | ↑ 0.0 KB/s", font=(APP_FONT, 12, "bold")); self.net_lbl.pack(side="left", padx=10)
 
-    def _create_monitor_bar(self, parent, text_key):
+    def _create_monitor_bar(self, parent, text_key, sparkline=None):
         frame = ctk.CTkFrame(parent, fg_color="transparent")
         label = ctk.CTkLabel(frame, text=text_key, font=(APP_FONT, 12, "bold"), width=35, anchor="w"); label.pack(side="left")
+        if sparkline:
+            canvas = ctk.CTkCanvas(frame, width=60, height=20, highlightthickness=0, bg=PALETTE["dark"]); canvas.pack(side="left", padx=(0, 4))
+            canvas.create_line(0, 0, 0, 0, tags="line", width=1); self.sparklines[sparkline] = canvas
         progress_bar = ctk.CTkProgressBar(frame, width=80); progress_bar.pack(side="left", padx=4)
         value_label = ctk.CTkLabel(frame, text="0%", font=(APP_FONT, 12, "bold"), width=40, anchor="w"); value_label.pack(side="left", padx=(4, 10))
         return frame, progress_bar, value_label, label
@@ -327,47 +471,64 @@ class App(ctk.CTk):
                 except Exception: pass
     
     def change_language(self, lang_value):
-        # --- ИСПРАВЛЕНИЕ 2: Прячем окно на время обновления ---
-        self.withdraw()
-
+        # Виджеты не пересоздаются: переименовываем вкладки и меняем тексты на месте,
+        # поэтому выбор, лог и идущие установки сохраняются
+        old_names = [self.loc.get(key) for key in self.tab_keys]
         current_tab_name = self.tabview.get()
-        current_lang_tab_names = [self.loc.get(key) for key in self.tab_keys]
-        try:
-            current_index = current_lang_tab_names.index(current_tab_name)
-        except ValueError:
-            current_index = 0
-
         self.loc.set_language(lang_value.lower())
-        self.tabview.destroy()
-        self._create_tab_view()
-        self._apply_accent(self.current_accent, initial=True)
-        
-        new_tab_name = self.loc.get(self.tab_keys[current_index])
-        self.tabview.set(new_tab_name)
+        new_names = [self.loc.get(key) for key in self.tab_keys]
+        for old_name, new_name in zip(old_names, new_names):
+            if old_name != new_name and old_name in self.tabview._name_list: self.tabview.rename(old_name, new_name)
+        if current_tab_name in old_names: self.tabview.set(new_names[old_names.index(current_tab_name)])
+        for frame in (self.apps_frame, self.drivers_frame, self.usb_frame, self.settings_frame): frame.update_texts()
+        self.title_label.configure(text=self.loc.get("app_title"))
 
-        # Возвращаем окно после всех изменений
-        self.deiconify()
-        
     def _update_monitor(self):
-        cpu_percent = psutil.cpu_percent(); ram_percent = psutil.virtual_memory().percent
-        self.cpu_bar.set(cpu_percent / 100); self.cpu_lbl.configure(text=f"{cpu_percent:.0f}%")
-        self.ram_bar.set(ram_percent / 100); self.ram_lbl.configure(text=f"{ram_percent:.0f}%")
-        try: dsk_usage = psutil.disk_usage(os.environ.get("SystemDrive", "C:") + os.sep).percent
-        except: dsk_usage = 0
-        self.dsk_bar.set(dsk_usage / 100); self.dsk_lbl.configure(text=f"{dsk_usage:.0f}%")
-        self.gpu_bar.set(0); self.gpu_lbl.configure(text=f"N/A")
-        now_net_io = psutil.net_io_counters()
-        sent_speed = (now_net_io.bytes_sent - self._prev_net_io.bytes_sent) / 1024
-        recv_speed = (now_net_io.bytes_recv - self._prev_net_io.bytes_recv) / 1024
-        self._prev_net_io = now_net_io
-        self.net_lbl.configure(text=f"↓ {recv_speed:.1f} KB/s | ↑ {sent_speed:.1f} KB/s")
+        # Замеры делает фоновый сэмплер; здесь только перерисовка того, что видно изменилось
+        idle = self.state() == "iconic"; self.sampler.set_idle(idle)
+        self.after(MONITOR_IDLE_MS if idle else MONITOR_REFRESH_MS, self._update_monitor)
+        if idle: return
+        sample = self.sampler.latest()
         mode = ctk.get_appearance_mode().lower(); color_index = 0 if mode == "light" else 1
-        def get_color(value):
-            if value > 90: return MONITOR_COLORS["critical"][color_index]
-            if value > 75: return MONITOR_COLORS["warning"][color_index]
-            return MONITOR_COLORS["normal"][color_index]
-        self.cpu_lbl.configure(text_color=get_color(cpu_percent)); self.ram_lbl.configure(text_color=get_color(ram_percent)); self.dsk_lbl.configure(text_color=get_color(dsk_usage))
-        self.after(1000, self._update_monitor)
+        def get_level(value):
+            if value > 90: return "critical"
+            if value > 75: return "warning"
+            return "normal"
+        for key, bar, lbl in (("cpu", self.cpu_bar, self.cpu_lbl), ("ram", self.ram_bar, self.ram_lbl), ("disk", self.dsk_bar, self.dsk_lbl), ("gpu", self.gpu_bar, self.gpu_lbl)):
+            value = sample.get(key)
+            shown = (None, None, color_index) if value is None else (round(value), get_level(value), color_index)
+            if self._monitor_shown.get(key) == shown: continue
+            self._monitor_shown[key] = shown
+            if value is None: bar.set(0); lbl.configure(text="N/A", text_color=MONITOR_COLORS["normal"][color_index]); continue
+            bar.set(value / 100); lbl.configure(text=f"{value:.0f}%", text_color=MONITOR_COLORS[shown[1]][color_index])
+        net_text = f"↓ {sample.get('net_down', 0):.1f} KB/s | ↑ {sample.get('net_up', 0):.1f} KB/s"
+        if self._monitor_shown.get("net") != net_text: self._monitor_shown["net"] = net_text; self.net_lbl.configure(text=net_text)
+        for key, canvas in self.sparklines.items(): self._draw_sparkline(canvas, self.sampler.history(key)[1][-SPARKLINE_POINTS:])
+
+    def _draw_sparkline(self, canvas, values):
+        if len(values) < 2: return
+        w, h = int(canvas.cget("width")), int(canvas.cget("height")); step = w / (SPARKLINE_POINTS - 1); x0 = w - step * (len(values) - 1)
+        points = [coord for i, v in enumerate(values) for coord in (x0 + i * step, h - 1 - (h - 2) * min(v, 100) / 100)]
+        canvas.coords("line", *points); canvas.itemconfigure("line", fill=ACCENTS[self.current_accent])
+
+    def _watch_preload(self):
+        # Кэш прошлого запуска уже на экране — ждём фоновое обновление и применяем разницу;
+        # установленное по реестру приходит задолго до конца проб и применяется сразу,
+        # «подобрано для этого ПК» пересобирается по свежим устройствам и обновлённому индексу драйверов
+        self._refresh_matched_drivers()
+        installed = preload.RESULT.get("installed")
+        if installed is not None and installed is not self._early_installed:
+            self._early_installed = installed
+            for tab in (self.apps_frame, self.drivers_frame):
+                if tab.winfo_exists(): tab.apply_cache({"installed": installed})
+        if not preload.DONE.is_set() or not preload.DRIVERS_SCANNED.is_set(): self.after(500, self._watch_preload)
+        if not preload.DONE.is_set() or self._preload_applied: return
+        self._preload_applied = True
+        fresh = dict(preload.RESULT)
+        if not fresh: return
+        self.cache.update(fresh)
+        for tab in (self.apps_frame, self.drivers_frame):
+            if tab.winfo_exists(): tab.apply_cache(fresh)
 
     def _check_dependencies(self):
         if not check_winget_installed():
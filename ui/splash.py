@@ -1,7 +1,6 @@
 # ui/splash.py
 import customtkinter as ctk
-from PIL import Image
-from ui.utils import resource_path
+from ui import assets
 
 class SplashScreen(ctk.CTkToplevel):
     def __init__(self, master):
@@ -20,9 +19,9 @@ class SplashScreen(ctk.CTkToplevel):
         self.lift()
 
         try:
-            img_original = Image.open(resource_path("assets/intro.png"))
-            img_resized = img_original.resize((TARGET_WIDTH, TARGET_HEIGHT), Image.Resampling.LANCZOS)
-            splash_img = ctk.CTkImage(light_image=img_resized, dark_image=img_resized, size=(TARGET_WIDTH, TARGET_HEIGHT))
+            # Вариант точного размера под масштаб экрана (ui/assets.py): без декодирования исходника и LANCZOS
+            img = assets.load_image("assets/intro.png", (TARGET_WIDTH, TARGET_HEIGHT), ctk.ScalingTracker.get_widget_scaling(self))
+            splash_img = ctk.CTkImage(light_image=img, dark_image=img, size=(TARGET_WIDTH, TARGET_HEIGHT))
             
             screen_width = self.winfo_screenwidth()
             screen_height = self.winfo_screenheight()
@@ -0,0 +1,41 @@
+# ui/timings.py
+"""
+Замеры фаз запуска (импорт, шрифт, заставка, preload, первый кадр App).
+Время — секунды от импорта этого модуля; его импортируют первым в boot.py.
+Результат пишется в startup_timings.json рядом с error_log.txt, чтобы
+регрессии старта было с чем сравнить.
+"""
+import json
+import threading
+import time
+
+_T0 = time.perf_counter()
+_lock = threading.Lock()
+_marks = {}
+_autosave_path = None
+
+def mark(phase):
+    """ Отмечает фазу (первая отметка побеждает); можно вызывать из любого потока. """
+    with _lock:
+        _marks.setdefault(phase, round(time.perf_counter() - _T0, 4))
+        path = _autosave_path
+    if path:
+        dump(path)
+
+def report():
+    with _lock:
+        return dict(sorted(_marks.items(), key=lambda item: item[1]))
+
+def dump(path):
+    try:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report(), f, indent=2)
+    except OSError as e:
+        print(f"Не удалось записать замеры запуска: {e}")
+
+def autosave(path):
+    """ Сохраняет замеры сейчас и после каждой следующей отметки. """
+    global _autosave_path
+    with _lock:
+        _autosave_path = path
+    dump(path)